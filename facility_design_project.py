@@ -0,0 +1,4107 @@
+################################################################################################
+################################ FACILITY DESIGN PROJECT - 2020 ################################
+########################### Tal Eylon, Avihoo Menahem, Amihai Kalev ############################
+################################################################################################
+
+################################################################################################
+# Imports
+################################################################################################
+
+import numpy as np
+import pickle as p
+import random
+import bisect
+import heapq
+from collections import deque
+import timeit
+import os
+import zlib
+# pandas (visualization), tracemalloc, statistics and concurrent.futures (benchmarks and batch runs) are imported
+# only where they are used, so importing this module - e.g. in every worker process - costs only a NumPy import.
+
+
+################################################################################################
+# Pickle files
+################################################################################################
+
+def load_pickle(source):
+    # Load a pickle file by its name. Anything else (e.g. a list that was already loaded) is returned as is.
+    if isinstance(source, str):
+        with open(source,'rb') as infile:
+            return p.load(infile)
+    return source
+
+
+################################################################################################
+# Classes
+################################################################################################
+
+#######################
+# 1. Item
+#######################
+
+class Item:
+    def __init__(self,item_number,exit=0,side=0):
+        self.number = item_number # item catalog number
+        self.exit = exit          # Can be either False/True. True means that the item needs to be taken out of the warehouse
+        self.side = side          # 1 if the item is located on the left side of the warehouse, 2 on the right side, 
+                                  # 3 if exactly on the center (column 7)
+    
+    def __str__(self):            # Allows visual presentation of the item
+        if self.exit:
+            return str("%s to exit"%(self.number))
+        else:
+            return str("%s"%(self.number))
+
+
+#######################
+# 2. Escort
+#######################
+
+
+class Escort:
+    def __init__(self, robot_id):
+        self.robot_id = robot_id # this escort belong to this robot_id
+        self.number = 0          # escort number
+        self.exit = 0
+    
+    def contains(self):
+        return False # it isn't an item but an escort
+    
+    def __str__(self):
+        return str("0")
+
+#######################
+# 3. Robot
+#######################
+
+class Robot:
+    def __init__(self,robot_id,side):
+        self.id = robot_id                  # The robot id. Can be 1,2,... up to the number of robots (5 by default)
+        self.item_to_take = None            # will be equal to the item that the robot is on its way to
+        self.currently_taking = None        # will be equal to the item's number the robot is taking to the IO
+        self.putting_away = None            # will be equal to the item's number the robot is carrying to its slot (an inbound
+                                            # item, see OrderStream, or a re-slotted item, see Reslotter)
+        self.path = None                    # the steps the robot will take
+        self.side = None                    # The robot can exit items only on the relevant side of the warehouse
+    
+    def robot_will_take(self, item_number): # This function sets the item to take, and erases the currently taking item (if exists)
+        self.item_to_take = item_number
+        self.currently_taking = None
+    
+    def robot_is_taking(self, item_number): # This function sets the currently taking attribute, and erases the item to take item (if exists)
+        self.item_to_take = None
+        self.currently_taking = item_number
+    
+    def reset(self):                        # This function erases the attributes of the item, except its id and side.
+        self.item_to_take = None
+        self.currently_taking = None
+        self.putting_away = None
+        self.path = None
+        
+    def is_free(self):                      # checks if the robot is free to take an item.
+        return self.item_to_take == None and self.currently_taking == None and self.putting_away == None and \
+               self.path == None
+    
+    def __str__(self):                      # Allows visual presentation of the robot
+        return str("Robot %s"%(self.id))
+
+
+#######################
+# 4. Robot path
+#######################
+
+class CheckBarrier:
+    # Marks the beginning of a series of 3/5 steps: the robot waits until location_check approves its location
+    def __repr__(self):
+        return "CHECK"
+
+CHECK = CheckBarrier()
+
+
+class RobotPath:
+    # The planned steps of a robot - (from, to, with_item) steps and CHECK barriers - in a deque,
+    # so steps are pushed to the front (like a stack) and popped from the front in constant time.
+    def __init__(self, steps=()):
+        self.steps = deque(steps)
+    
+    def peek(self):                         # the next step
+        return self.steps[0]
+    
+    def pop_front(self):                    # remove the next step
+        return self.steps.popleft()
+    
+    def push_front(self, step):             # the given step becomes the next one
+        self.steps.appendleft(step)
+    
+    def at_check(self):                     # is the next step a CHECK barrier?
+        return isinstance(self.steps[0], CheckBarrier)
+    
+    def next_location(self):                # the destination of the next step (None while waiting at a CHECK)
+        return None if self.at_check() else self.steps[0][1]
+    
+    def __len__(self):
+        return len(self.steps)
+    
+    def __iter__(self):
+        return iter(self.steps)
+
+
+#######################
+# 5. Cell
+#######################
+
+
+class Cell:
+    # A cell is a view over one location of the warehouse planes - it doesn't hold any state by itself.
+    # A cell can either contain: (item,robot) (escort,robot) (escort,) (item,)
+    __slots__ = ('warehouse', 'location')
+
+    def __init__(self, warehouse, location):
+        self.warehouse = warehouse                          # the warehouse that holds the planes
+        self.location = location                            # (x,y) location of the cell
+
+    @property
+    def item(self):                                         # the item (or the escort) in the cell
+        number = self.warehouse.item_at(self.location)
+        if number == 0: # is it an escort?
+            return Escort(self.warehouse.escort_at(self.location))
+        return Item(number, number in self.warehouse.items_to_exit, self.warehouse.item_sides.get(number, 0))
+
+    @property
+    def robot(self):                                        # the robot in the cell, '' if there isn't any
+        return self.warehouse.robot_at(self.location)
+
+    def assignRobot(self, robot):
+        self.warehouse.place_robot(self.location, robot)
+
+    def assignItem(self, item):
+        self.warehouse.place_item(self.location, item)
+            
+    def __repr__(self):                                     # Allows visual presentation of the cell
+        rbt = self.robot
+        itm = self.item
+        return "[%s,%s]"%(itm,rbt)
+        
+    def __str__(self):                                      # Allows visual presentation of the cell
+        rbt = self.robot
+        itm = self.item
+        return "[%s,%s]"%(itm,rbt)
+
+
+#######################
+# 6. Distance queue
+#######################
+
+
+class DistanceQueue:
+    # The items to exit of one side of the warehouse, sorted by their distance from the I/O (closest first).
+    # It can be read like a sorted list of (item number, distance) pairs, but it is updated one item at a time
+    # instead of being rebuilt and re-sorted every time unit.
+    def __init__(self):
+        self.keys = []      # sorted list of (distance, order, item number). The order breaks ties like a stable sort
+        self.entries = {}   # A dictionary with pairs of (item number: key)
+    
+    def update(self, item_number, distance, order):
+        # Insert the item, or move it to its new place if it is already in the queue
+        self.remove(item_number)
+        key = (distance, order, item_number)
+        bisect.insort(self.keys, key)
+        self.entries[item_number] = key
+    
+    def remove(self, item_number):
+        # Remove the item from the queue, if it is there
+        key = self.entries.pop(item_number, None)
+        if key is not None:
+            del self.keys[bisect.bisect_left(self.keys, key)]
+    
+    def farthest(self):
+        # The item number with the maximum distance from the I/O
+        return self.keys[-1][2]
+    
+    def random_item(self, rng=random):
+        # A random item number of the queue
+        return rng.choice(self)[0]
+    
+    def __contains__(self, item_number):
+        return item_number in self.entries
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def __getitem__(self, i):               # pairs of: (item number,distance from I/O)
+        distance, order, item_number = self.keys[i]
+        return (item_number, distance)
+    
+    def __str__(self):                      # Allows visual presentation of the queue
+        return str([self[i] for i in range(len(self))])
+
+
+#######################
+# 7. Event log
+#######################
+
+
+class EventLog:
+    # A structured log of the simulation events. Each event is a tuple of:
+    # (time, robot_id, event type, from location, to location, item number)
+    # Only the events with a level >= the log level are recorded. They are kept in memory (records),
+    # or buffered and appended as JSON lines to a file if a filename is given.
+    # A warehouse without an event log (the default) doesn't pay anything for it.
+    DEBUG = 10 # every step of every robot
+    INFO = 20  # dispatching, collisions handling and extractions
+    LEVELS = {'step': DEBUG, 'wait': DEBUG,
+              'assign': INFO, 'release': INFO, 'new_route': INFO, 'reroute': INFO, 'escape': INFO,
+              'final': INFO, 'exit': INFO, 'exact_route': INFO, 'yield': INFO,
+              'lane': INFO, 'check_failed': DEBUG, 'order': INFO, 'inbound': INFO, 'putaway': INFO, 'stored': INFO,
+              'reslot': INFO, 'reslotted': INFO, 'reslot_cancelled': INFO, 'charge': INFO}
+    
+    def __init__(self, level=INFO, filename=None, buffer_size=10000):
+        self.level = level
+        self.debug = level <= self.DEBUG    # are the steps recorded?
+        self.filename = filename
+        self.buffer_size = buffer_size      # number of events to keep in memory before they are written to the file
+        self.records = []
+        if filename: # start a new file
+            open(filename,'w').close()
+    
+    def record(self, time, robot_id, event, from_loc=None, to_loc=None, item=None):
+        if self.LEVELS[event] < self.level:
+            return
+        self.records.append((time, robot_id, event, from_loc, to_loc, item))
+        if self.filename and len(self.records) >= self.buffer_size:
+            self.flush()
+    
+    def flush(self):
+        # Append the buffered events to the file
+        if not self.filename:
+            return
+        import json
+        with open(self.filename,'a') as outfile:
+            for time, robot_id, event, from_loc, to_loc, item in self.records:
+                outfile.write(json.dumps({'time': time, 'robot': robot_id, 'event': event,
+                                          'from': from_loc, 'to': to_loc, 'item': item})+'\n')
+        self.records = []
+
+
+#######################
+# 8. Trajectory
+#######################
+
+# One record per robot move. A fictitious move (or a planned move that wasn't applied) has moved=False.
+TRAJECTORY_DTYPE = np.dtype([('tick','<i4'), ('robot','<i2'), ('from_row','<i2'), ('from_col','<i2'),
+                             ('to_row','<i2'), ('to_col','<i2'), ('with_item','?'), ('moved','?')])
+
+
+class Trajectory:
+    # The moves of all the robots, as fixed-width records in a growing NumPy array.
+    # The records are in time order, so a range of ticks can be sliced with a binary search.
+    def __init__(self, capacity=1024):
+        self.moves = np.zeros(capacity, dtype=TRAJECTORY_DTYPE)
+        self.size = 0           # number of records
+    
+    def append(self, tick, robot_id, from_loc, to_loc, with_item=False, moved=True):
+        if self.size == len(self.moves): # double the capacity
+            self.moves = np.concatenate([self.moves, np.zeros(len(self.moves), dtype=TRAJECTORY_DTYPE)])
+        self.moves[self.size] = (tick, robot_id, from_loc[0], from_loc[1], to_loc[0], to_loc[1], with_item, moved)
+        self.size += 1
+    
+    def array(self):
+        # The records of the trajectory
+        return self.moves[:self.size]
+    
+    def __getstate__(self):
+        # only the records are pickled (see Warehouse.snapshot), not the unused capacity
+        return self.array().copy()
+    
+    def __setstate__(self, moves):
+        self.moves = np.concatenate([moves, np.zeros(max(len(moves), 1024), dtype=TRAJECTORY_DTYPE)])
+        self.size = len(moves)
+    
+    def save(self, filename):
+        # .npy - the records array, that can be memory-mapped by load_trajectory.
+        # otherwise - a compressed .npz file with one array for each column.
+        if filename.endswith('.npy'):
+            np.save(filename, self.array())
+        else:
+            np.savez_compressed(filename, **{name: self.array()[name] for name in TRAJECTORY_DTYPE.names})
+
+
+def load_trajectory(filename):
+    # Load a saved trajectory as an array of records. A .npy file is memory-mapped (zero-copy).
+    if filename.endswith('.npy'):
+        return np.load(filename, mmap_mode='r')
+    with np.load(filename) as columns:
+        moves = np.zeros(len(columns['tick']), dtype=TRAJECTORY_DTYPE)
+        for name in TRAJECTORY_DTYPE.names:
+            moves[name] = columns[name]
+    return moves
+
+
+def trajectory_of_robot(moves, robot_id):
+    # The records of one robot
+    return moves[moves['robot'] == robot_id]
+
+
+def trajectory_between(moves, first_tick, last_tick):
+    # The records of the ticks first_tick to last_tick (including). A slice, so memory-mapped records aren't copied
+    start = np.searchsorted(moves['tick'], first_tick, side='left')
+    end = np.searchsorted(moves['tick'], last_tick, side='right')
+    return moves[start:end]
+
+
+#######################
+# 9. Warehouse configuration
+#######################
+
+
+class WarehouseConfig:
+    # The geometry of the warehouse: its dimensions, the I/O point, the robots' sides and the zones around the I/O.
+    # The defaults are the 9X15 warehouse of the project, and every other size is scaled around its I/O column.
+    # The I/O point is always on the first row (row 0) of the warehouse.
+    # io_columns gives several I/O points (stations) instead - each one has its own zones (see at_station), and the
+    # first one is the I/O point of the single station functions (e.g. the final positions).
+    def __init__(self, rows=9, columns=15, io_column=None, robot_sides=None,
+                 final_positions_left=None, final_positions_right=None, costs='manhattan', cost_cache_dir=None,
+                 io_columns=None):
+        self.rows = rows                                                 # number of rows of the warehouse
+        self.columns = columns                                           # number of columns of the warehouse
+        if io_columns is None:
+            io_columns = [columns//2 if io_column is None else io_column]
+        io_columns = sorted(io_columns)
+        if any(b-a < 4 for a, b in zip(io_columns, io_columns[1:])) or not 0 <= io_columns[0] <= io_columns[-1] < columns:
+            raise ValueError("The I/O columns %s must be in the warehouse and at least 4 columns apart (their restricted "
+                             "zones must not overlap)"%(io_columns))
+        self.stations = [(0, column) for column in io_columns]           # the I/O points
+        self.io = self.stations[0]                                       # the I/O point location
+        self.robot_sides = robot_sides     # The distribution of the robots: 1 for the left side, 2 for the right side.
+                                           # None means alternating sides, starting from the left: 1,2,1,2,...
+        self.costs = costs                 # How the items to exit are ranked: 'manhattan' - row + |column - I/O column|,
+                                           # 'moves' - the robot moves of the retrieval, from the move costs table
+        self.cost_cache_dir = cost_cache_dir # where the move costs tables are saved (None - not saved)
+        
+        io = self.io[1]
+        # The restricted zone around the I/O - only one loaded robot at a time can enter it
+        self.restricted_rows = min(3, rows-1)                            # rows 0 to 3
+        self.restricted_columns = (max(io-2, 0), min(io+2, columns))     # columns io-2 to io+1
+        # The area around the I/O in which the loaded robots are compared in order to decide who proceeds
+        self.proceed_area = [(i,j) for i in range(min(6, rows)) for j in range(max(io-3, 0), min(io+4, columns))]
+        
+        # final locations for the robots on each side of the warehouse, once they have no more items to exit
+        if final_positions_left is None:
+            final_positions_left = [(rows-2,0),(min(3, rows-1),0),(0,max(io-3, 0))]
+        if final_positions_right is None:
+            final_positions_right = [(rows-1,columns-1),(0,columns-1),(0,columns-1)]
+        self.final_positions_left = final_positions_left
+        self.final_positions_right = final_positions_right
+        self.station_configs = {self.io: self}
+    
+    def at_station(self, station):
+        # The configuration of the warehouse with only the given I/O point - its restricted zone and proceed area
+        if station not in self.station_configs:
+            self.station_configs[station] = WarehouseConfig(self.rows, self.columns, station[1], self.robot_sides,
+                                                            self.final_positions_left, self.final_positions_right,
+                                                            self.costs, self.cost_cache_dir)
+        return self.station_configs[station]
+    
+    def sides(self, robots_count):
+        # The side of each robot, for the given number of robots
+        if self.robot_sides is None:
+            return [1 if k%2==0 else 2 for k in range(robots_count)]
+        if len(self.robot_sides) < robots_count:
+            raise ValueError("%s robot sides were given for %s robots"%(len(self.robot_sides),robots_count))
+        return list(self.robot_sides)
+    
+    def in_restricted_zone(self, location, station=None):
+        # TRUE if the location is in the restricted zone around the I/O (or around the given station)
+        if station is not None and station != self.io:
+            return self.at_station(station).in_restricted_zone(location)
+        return 0 <= location[0] <= self.restricted_rows and self.restricted_columns[0] <= location[1] < self.restricted_columns[1]
+
+
+#######################
+# 10. Retrieval planner
+#######################
+
+class RetrievalPlanner:
+    # An exact alternative to the manhattan/three step/five step journey: A* over the (robot, escort, item) locations
+    # of a single robot, that returns a minimum-moves plan that brings the item to the I/O.
+    # The other robots are ignored while planning; they are handled by the usual freeze/escape rules.
+    # The heuristic is the number of escort moves of the single escort puzzle (no robot), read from a table
+    # that is computed once for each warehouse size and I/O point and shared by all the planners.
+    tables = {}      # (rows, columns, io): escort moves table
+    
+    def __init__(self, time_budget=0.05, max_cells=600):
+        self.time_budget = time_budget  # seconds for each plan; None means no limit
+        self.max_cells = max_cells      # larger warehouses are not planned (the table has cells^2 entries)
+        self.planned = 0                # number of plans found
+        self.fallbacks = 0              # number of plans that didn't fit in the time budget (or the warehouse size)
+        self.expanded = 0               # number of states expanded by A*
+    
+    def escort_table(self, rows, columns, io):
+        # table[t*cells+e] is the minimum number of escort moves that bring the item in t to the I/O,
+        # when the escort is in e (both as cell numbers, row*columns+column). -1 for impossible states (t==e).
+        key = (rows, columns, io)
+        if key not in RetrievalPlanner.tables:
+            cells = rows*columns
+            neighbours = self.neighbours(rows, columns)
+            goal = io[0]*columns + io[1]
+            table = [-1]*(cells*cells)
+            queue = deque()
+            for e in range(cells): # the item is in the I/O: nothing to do
+                if e != goal:
+                    table[goal*cells+e] = 0
+                    queue.append((goal, e))
+            while queue: # breadth first search backwards from the I/O - every escort move can be undone
+                t, e = queue.popleft()
+                moves = table[t*cells+e]+1
+                for m in neighbours[e]:
+                    next_t, next_e = (e, m) if m == t else (t, m) # the escort swaps with the cell next to it
+                    if table[next_t*cells+next_e] < 0:
+                        table[next_t*cells+next_e] = moves
+                        queue.append((next_t, next_e))
+            RetrievalPlanner.tables[key] = table
+        return RetrievalPlanner.tables[key]
+    
+    def neighbours(self, rows, columns):
+        # the cells next to each cell, by cell numbers
+        return [[i*columns+j for i, j in ((r+1,c),(r-1,c),(r,c+1),(r,c-1)) if 0 <= i < rows and 0 <= j < columns]
+                for r in range(rows) for c in range(columns)]
+    
+    def plan(self, config, robot_loc, escort_loc, item_loc, blocked=()):
+        # The steps (from, to, with_item) of a minimum-moves retrieval, or None if no plan was found in time.
+        # A robot either walks to a cell next to it, or drags the item below it into its escort next to it.
+        # The robot never enters the blocked locations (e.g. the escorts of the other robots).
+        rows, columns = config.rows, config.columns
+        if rows*columns > self.max_cells:
+            self.fallbacks += 1
+            return None
+        cells = rows*columns
+        table = self.escort_table(rows, columns, config.io)
+        neighbours = self.neighbours(rows, columns)
+        goal = config.io[0]*columns + config.io[1]
+        blocked = set(i*columns+j for i, j in blocked)
+        
+        def distance(a, b): # manhattan distance between two cells
+            return abs(a//columns - b//columns) + abs(a%columns - b%columns)
+        
+        def heuristic(r, e, t):
+            # k escort moves cost one drag each, and the robot walks at least two cells between two drags.
+            # Before the first drag the robot walks next to the escort; if that drag doesn't bring the item
+            # closer, at least one more escort move (3 robot moves) is needed.
+            if t == goal:
+                return 0
+            k = table[t*cells+e]
+            best = None
+            for m in neighbours[e]:
+                after = e*cells+m if m == t else t*cells+m
+                cost = distance(r, m) + (3*k-2 if table[after] < k else 3*k+1)
+                if best is None or cost < best:
+                    best = cost
+            return best
+        
+        start = (robot_loc[0]*columns+robot_loc[1], escort_loc[0]*columns+escort_loc[1], item_loc[0]*columns+item_loc[1])
+        heap = [(heuristic(*start), 0, start)]
+        best_moves = {start: 0}
+        parent = {start: None}
+        deadline = None if self.time_budget is None else timeit.default_timer()+self.time_budget
+        expanded = 0
+        while heap:
+            f, moves, state = heapq.heappop(heap)
+            if moves > best_moves[state]: # a better way to this state was already expanded
+                continue
+            r, e, t = state
+            if t == goal:
+                steps = []
+                while parent[state]:
+                    state, step = parent[state]
+                    steps.append(step)
+                self.planned += 1
+                self.expanded += expanded
+                return steps[::-1]
+            expanded += 1
+            if deadline and expanded%256 == 0 and timeit.default_timer() > deadline:
+                break
+            successors = [((m, e, t), False) for m in neighbours[r] if m not in blocked] # walk
+            if e in neighbours[r]: # drag the item below the robot into the escort
+                successors.append(((e, r, e if t == r else t), True))
+            for next_state, with_item in successors:
+                if next_state not in best_moves or moves+1 < best_moves[next_state]:
+                    best_moves[next_state] = moves+1
+                    parent[next_state] = (state, ((r//columns, r%columns), (next_state[0]//columns, next_state[0]%columns), with_item))
+                    heapq.heappush(heap, (moves+1+heuristic(*next_state), moves+1, next_state))
+        
+        self.fallbacks += 1
+        self.expanded += expanded
+        return None
+
+
+#######################
+# 11. Move costs
+#######################
+
+# The location of the escort relative to the item: above, below, right and left of it
+APPROACHES = ((1,0), (-1,0), (0,1), (0,-1))
+# The version of the move costs formula - it's a part of the name of the saved tables, so a change of the formula
+# doesn't load tables of the old one
+MOVE_COSTS_VERSION = 1
+
+
+def move_cost_table(config, max_cells=2500):
+    # costs[row, column, approach] is the number of robot moves that bring the item in (row, column) to the I/O,
+    # when the robot stands on the item and its escort is next to it (see APPROACHES); -1 if the escort can't be there.
+    # The robot drags once for every escort move and walks two cells between the drags, so with
+    # k escort moves (from the escort moves table of RetrievalPlanner) the retrieval takes 3k-2 moves if the first
+    # escort move can be the drag of the item itself, and 3k moves if the robot has to walk before it.
+    # The table is computed once for every warehouse size and I/O point, and saved in config.cost_cache_dir (if given).
+    rows, columns = config.rows, config.columns
+    filename = None
+    if config.cost_cache_dir is not None:
+        filename = os.path.join(config.cost_cache_dir, 'move_costs_v%s_%sX%s_io%s_%s.npy'
+                                %(MOVE_COSTS_VERSION, rows, columns, config.io[0], config.io[1]))
+        if os.path.exists(filename):
+            return np.load(filename)
+    if rows*columns > max_cells:
+        raise ValueError("A move costs table for %sX%s cells is too large (the escort moves table has cells^2 entries)"
+                         %(rows,columns))
+    
+    cells = rows*columns
+    table = RetrievalPlanner().escort_table(rows, columns, config.io)
+    costs = np.full((rows, columns, len(APPROACHES)), -1, dtype=np.int32)
+    for i in range(rows):
+        for j in range(columns):
+            for a, (di, dj) in enumerate(APPROACHES):
+                if 0 <= i+di < rows and 0 <= j+dj < columns:
+                    t, e = i*columns+j, (i+di)*columns+j+dj
+                    k = table[t*cells+e]
+                    if k > 0:
+                        costs[i,j,a] = 3*k-2 if table[e*cells+t] == k-1 else 3*k
+                    else:
+                        costs[i,j,a] = 0
+    if filename:
+        np.save(filename, costs)
+    return costs
+
+
+def best_move_costs(config):
+    # costs[row, column] is the number of robot moves to retrieve the item in (row, column), with its best escort approach
+    costs = move_cost_table(config)
+    return np.where(costs >= 0, costs, np.iinfo(np.int32).max).min(axis=2)
+
+
+#######################
+# 12. Dispatchers
+#######################
+# A dispatcher decides which item a robot takes: at the beginning (first_item), once it has exited an item (next_item),
+# and when it has to give up its item because of another robot's escort (other_item). None means no item for the robot.
+# It also decides which robots give up their items and go to charge (to_charge) - none, without batteries.
+
+class SideDispatcher:
+    # The dispatch of the project: every robot takes only items of its own side of the warehouse. At the beginning
+    # the items are spread between the robots by their distances, then a robot takes the farthest item of its side,
+    # and it gives up its item for a random one.
+    def first_item(self, wh, robot_id):
+        i = 1 if robot_id%2==0 else -1              # determing its side
+        distances = wh.distances_left if wh.robot_side[robot_id] == 1 else wh.distances_right
+        if len(distances) == 0:                     # no items to exit on this side of the warehouse
+            return None
+        item = distances[(i*robot_id-1)%len(distances)][0] # take the item
+        # we take here 3 close items to the IO, and 2 far items.
+        
+        if wh.items_to_exit[item]:                  # more robots than items: the item is already taken by another robot
+            free_items = [distances[k][0] for k in reversed(range(len(distances))) if not wh.items_to_exit[distances[k][0]]]
+            if not free_items:
+                return None
+            item = free_items[0]                    # take the farthest free item
+        return item
+    
+    def next_item(self, wh, robot_id):
+        distances = wh.distances_left if wh.robot_side[robot_id] == 1 else wh.distances_right
+        if len(distances) > 0:
+            return distances.farthest()             # the chosen item - the farest
+        return None
+    
+    def other_item(self, wh, robot_id):
+        distances = wh.distances_left if wh.robot_side[robot_id] == 1 else wh.distances_right
+        if len(distances) > 0:
+            return distances.random_item(wh.rng)    # randomly choose an item
+        return None
+    
+    def to_charge(self, wh):
+        return []
+
+
+class MatchingDispatcher:
+    # Robot-to-item assignment as a minimum cost matching of all the robots and the free items, solved again every time
+    # a robot needs an item. The cost is the estimated time unit in which the robot would bring the item to the I/O:
+    # the time until it is free (the robots that take items bring them to the I/O first), plus the journey to the item
+    # and the retrieval (3 robot moves for every cell, or the move costs of the warehouse if it has them).
+    # The robot receives the item it is matched with; it may be none, if other robots would bring the items earlier.
+    # With cross_side=True the robots take items of both sides, and a robot changes side together with its item.
+    UNMATCHED = 10**9 # the cost of a forbidden assignment (an item of the other side)
+    
+    def __init__(self, cross_side=False):
+        self.cross_side = cross_side
+    
+    def first_item(self, wh, robot_id):
+        return self.match(wh, robot_id)
+    
+    def next_item(self, wh, robot_id):
+        return self.match(wh, robot_id)
+    
+    def other_item(self, wh, robot_id):
+        robot = wh.robot_at(wh.robot_locations[robot_id])
+        return self.match(wh, robot_id, exclude=robot.item_to_take or robot.currently_taking)
+    
+    def to_charge(self, wh):
+        return []
+    
+    def retrieval_costs(self, wh, locations):
+        # robot moves to bring the items in the given locations (array of (row, column)) to their nearest I/O
+        if wh.move_costs is not None:
+            return wh.move_costs[locations[:,0], locations[:,1]].astype(float)
+        return np.min([3.0*(locations[:,0] + np.abs(locations[:,1]-station[1])) for station in wh.stations], axis=0)
+    
+    def availability(self, wh, robot_id, other_robot):
+        # (location, time units) - where and when the robot will be free to take an item; None if it isn't available
+        robot_loc = wh.robot_locations[other_robot]
+        robot = wh.robot_at(robot_loc)
+        if other_robot == robot_id or robot.path is None: # the robot asks for an item, or is yet to receive one
+            return robot_loc, 0
+        item = robot.item_to_take or robot.currently_taking
+        if not item or item not in wh.item_locations: # the robot has finished its items
+            return None
+        item_loc = np.array([wh.item_locations[item]])
+        journey = 3*(abs(robot_loc[0]-item_loc[0,0]) + abs(robot_loc[1]-item_loc[0,1])) if robot.item_to_take else 0
+        return wh.station_of_item(item), journey + self.retrieval_costs(wh, item_loc)[0]
+    
+    def match(self, wh, robot_id, exclude=None):
+        items = [item for item, taken_by in wh.items_to_exit.items()
+                 if not taken_by and item != exclude and item in wh.item_locations]
+        if not items:
+            return None
+        robots, starts, ready = [], [], []
+        for other_robot in wh.robots:
+            available = self.availability(wh, robot_id, other_robot)
+            if available:
+                robots.append(other_robot)
+                starts.append(available[0])
+                ready.append(available[1])
+        starts, ready = np.array(starts), np.array(ready, dtype=float)
+        locations = np.array([wh.item_locations[item] for item in items])
+        
+        # cost[robot, item] = ready + journey + retrieval
+        journeys = 3*(np.abs(starts[:,None,0]-locations[None,:,0]) + np.abs(starts[:,None,1]-locations[None,:,1]))
+        cost = ready[:,None] + journeys + self.retrieval_costs(wh, locations)[None,:]
+        io_columns = np.array([wh.nearest_station((int(i),int(j)))[1] for i, j in locations]) # the item's I/O column
+        item_sides = np.where(locations[:,1] > io_columns, 2, 1)
+        if not self.cross_side:
+            robot_sides = np.array([wh.robot_side[robot] for robot in robots])
+            cost[robot_sides[:,None] != item_sides[None,:]] = self.UNMATCHED
+        
+        for row, column in min_cost_matching(cost):
+            if robots[row] == robot_id and cost[row, column] < self.UNMATCHED:
+                wh.robot_side[robot_id] = int(item_sides[column]) # a cross side robot moves to the side of the item
+                return items[column]
+        return None
+
+
+def min_cost_matching(cost):
+    # The (row, column) pairs of a minimum cost matching in a rows X columns cost matrix, where every row or every column
+    # (whichever are fewer) is matched. Uses scipy if it is installed, otherwise the Hungarian algorithm
+    # (shortest augmenting paths with potentials), vectorized over the columns.
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        pass
+    else:
+        return sorted(zip(*[indices.tolist() for indices in linear_sum_assignment(cost)]))
+    
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1] # the algorithm matches every row - so there must be less rows
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    u, v = np.zeros(n+1), np.zeros(m+1)        # the potentials of the rows and the columns (1 based; 0 is a dummy)
+    match = np.zeros(m+1, dtype=int)           # the row matched with each column (0 - none)
+    way = np.zeros(m+1, dtype=int)             # the previous column on the augmenting path
+    for i in range(1, n+1):                    # add the rows one by one
+        match[0] = i
+        j0 = 0
+        minv = np.full(m+1, np.inf)            # the shortest reduced distance to each column
+        used = np.zeros(m+1, dtype=bool)       # the columns on the shortest paths tree
+        while True:                            # grow the tree until it reaches a free column
+            used[j0] = True
+            i0 = match[j0]
+            free = ~used
+            free[0] = False
+            reduced = np.full(m+1, np.inf)
+            reduced[1:] = cost[i0-1] - u[i0] - v[1:]
+            better = free & (reduced < minv)
+            minv[better] = reduced[better]
+            way[better] = j0
+            candidates = np.where(free, minv, np.inf)
+            j1 = int(np.argmin(candidates))    # the closest column out of the tree
+            delta = candidates[j1]
+            u[match[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        while j0:                              # flip the matching along the augmenting path
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+    pairs = [(int(match[j])-1, j-1) for j in range(1, m+1) if match[j]]
+    if transposed:
+        pairs = [(j, i) for i, j in pairs]
+    return sorted(pairs)
+
+
+class EnergyDispatcher:
+    # Energy-aware dispatch (see EnergyModel) on top of another dispatcher (SideDispatcher by default): once a robot
+    # has exited an item, it receives the item of that dispatcher only if its charge covers the retrieval and the way
+    # back to a charging cell. Otherwise it receives the farthest item of its side that it can afford - or none, and it
+    # goes to charge (see Warehouse.final). A robot whose charge runs low on the way gives its item up and goes to
+    # charge (see Warehouse.recharge). A robot that charges receives items again once its charge has reached the
+    # resume level. The first items and the items given up on the way are those of the other dispatcher.
+    def __init__(self, base=None):
+        self.base = SideDispatcher() if base is None else base
+    
+    def first_item(self, wh, robot_id):
+        return self.base.first_item(wh, robot_id)
+    
+    def next_item(self, wh, robot_id):
+        energy = wh.energy
+        if energy is None or energy.capacity is None: # no battery to care about
+            return self.base.next_item(wh, robot_id)
+        if energy.is_charging(wh, robot_id):
+            return None
+        item = self.base.next_item(wh, robot_id)
+        if item is None or energy.can_take(wh, robot_id, item):
+            return item
+        distances = wh.distances_left if wh.robot_side[robot_id] == 1 else wh.distances_right
+        for k in reversed(range(len(distances))): # from the farthest item of the side
+            if energy.can_take(wh, robot_id, distances[k][0]):
+                return distances[k][0]
+        return None
+    
+    def other_item(self, wh, robot_id):
+        return self.base.other_item(wh, robot_id)
+    
+    def to_charge(self, wh):
+        # the robots whose charge has run low on the way
+        if not (wh.energy and wh.energy.capacity):
+            return []
+        return [robot_id for robot_id in wh.robots if wh.energy.must_charge(wh, robot_id)]
+
+
+#######################
+# 13. Reservation table
+#######################
+
+class ReservationTable:
+    # A space-time reservation table of the next time units: the cells that every robot and its escort will occupy,
+    # according to the planned paths of the robots. It is built again at the beginning of every time unit, and it lets
+    # a robot whose next cell is taken wait exactly until the cell is released, instead of the freeze/escape rules.
+    # The waiting is only reactive: the planners don't consult the table, and a robot whose cell isn't released in
+    # the horizon doesn't look for a detour - it falls back to the freeze/escape rules.
+    def __init__(self, horizon=3):
+        self.horizon = horizon   # the longest wait, in time units; the table holds the arrival after it and the unit after
+        self.cells = {}          # (location, k): ids of the robots there k time units from now (0 - now)
+    
+    def update(self, wh):
+        # reserve the planned paths of all the robots
+        self.cells = {}
+        for robot_id, robot_loc in wh.robot_locations.items():
+            self.reserve(robot_id, robot_loc, wh.escort_locations[robot_id], wh.robot_at(robot_loc).path or ())
+    
+    def reserve(self, robot_id, robot_loc, escort_loc, path):
+        # reserve the cells of the robot and its escort along its path. A robot stays where its path ends.
+        k = 0
+        self.take(robot_id, robot_loc, escort_loc, 0)
+        for step in path:
+            if k == self.horizon+2:
+                break
+            if isinstance(step, CheckBarrier): # assume the robot passes the check
+                continue
+            from_loc, to_loc, with_item = step
+            if with_item and to_loc == escort_loc: # the item is dragged into the escort
+                escort_loc = from_loc
+            robot_loc = to_loc
+            k += 1
+            self.take(robot_id, robot_loc, escort_loc, k)
+        for k in range(k+1, self.horizon+3):
+            self.take(robot_id, robot_loc, escort_loc, k)
+    
+    def take(self, robot_id, robot_loc, escort_loc, k):
+        for loc in (robot_loc, escort_loc):
+            self.cells.setdefault((loc,k), set()).add(robot_id)
+    
+    def waiting_time(self, robot_loc, location, robot_id):
+        # The number of time units the robot in robot_loc has to wait, besides the current one, before it moves to the
+        # location, so that no other robot or escort is there when it arrives and in the time unit after: 0 to horizon-1.
+        # The robots have priorities by their ids - a robot waits only for robots with smaller ids, so two robots
+        # never wait for each other. None if the location isn't released in the horizon, if it is taken by a robot
+        # with a larger id, or if another robot is planned to the robot's own location meanwhile.
+        others = lambda loc, k: self.cells.get((loc,k), set()) - {robot_id}
+        for k in range(2, self.horizon+2):
+            if any(other > robot_id for other in others(location,k-1)) or others(robot_loc,k-1):
+                return None
+            if not others(location,k) and not others(location,k+1):
+                return k-2 # the robot waits now and k-2 more time units, and arrives after k time units
+        return None
+
+
+#######################
+# 14. I/O zone scheduler
+#######################
+
+class ZoneScheduler:
+    # The loaded robots that approach the I/O compete on its approach lane - the restricted zone of the configuration.
+    # The loaded robots in the proceed area are kept in a priority queue by their distance from the I/O, that is built
+    # once every time unit. The robot at its head takes the token of the lane when it steps into the restricted zone,
+    # and keeps it while it is loaded in the zone: no other robot may step in meanwhile. A holder that hasn't got closer
+    # to the I/O for patience time units gives the token up, so a holder that is stuck doesn't lock the lane. Every
+    # grant, denial and handover of the token is counted, so the use of the I/O can be measured.
+    def __init__(self, config, station=None, patience=3):
+        self.io = config.io if station is None else station
+        self.patience = patience # time units that the holder may go without getting closer to the I/O
+        # ties are broken by the order of the proceed area
+        self.order = {location: k for k, location in enumerate(config.at_station(self.io).proceed_area)}
+        self.heap = []           # (distance from the I/O, order, robot_id) of the queue of this time unit
+        self.holder = None       # the robot_id that holds the token of the lane
+        self.last_holder = None  # the robot_id that held it last
+        self.closest = None      # the holder's shortest distance from the I/O since it took the token
+        self.stalled = 0         # time units since the holder got closer
+        self.grants = 0          # number of requests that were granted
+        self.denials = 0         # number of requests that were denied
+        self.handovers = 0       # number of times the token passed to another robot
+        self.busy = 0            # number of time units in which the token was held
+    
+    def queued(self, wh, robot_id):
+        # TRUE if the robot is loaded in the proceed area, and brings its item to this I/O
+        location = wh.robot_locations[robot_id]
+        return location in self.order and bool(wh.robot_at(location).currently_taking) and wh.station_of(robot_id) == self.io
+    
+    def tick(self, wh):
+        # release the token of a robot that isn't loaded in the restricted zone anymore, count the busy time units,
+        # and queue the loaded robots of this time unit (the robots move only at its end)
+        self.heap = [(location[0] + abs(location[1]-self.io[1]), self.order[location], robot_id)
+                     for robot_id, location in wh.robot_locations.items() if self.queued(wh, robot_id)]
+        heapq.heapify(self.heap)
+        stuck = False
+        if self.holder is not None and not self.in_lane(wh, self.holder):
+            self.holder = None
+        elif self.holder is not None: # a holder that is stuck (e.g. behind a robot that waits for the lane) gives it up
+            location = wh.robot_locations[self.holder]
+            distance = location[0] + abs(location[1]-self.io[1])
+            if distance < self.closest:
+                self.closest, self.stalled = distance, 0
+            else:
+                self.stalled += 1
+                if self.stalled > self.patience:
+                    self.holder, stuck = None, True
+        if self.holder is None and not stuck: # a robot that has become loaded in the zone takes the token (the nearest one)
+            inside = [robot_id for distance, order, robot_id in sorted(self.heap) if self.in_lane(wh, robot_id)]
+            if inside:
+                self.take(wh, inside[0])
+        if self.holder is not None:
+            self.busy += 1
+    
+    def in_lane(self, wh, robot_id):
+        # TRUE if the robot is loaded in the restricted zone
+        return self.queued(wh, robot_id) and wh.config.in_restricted_zone(wh.robot_locations[robot_id], self.io)
+    
+    def take(self, wh, robot_id):
+        # the robot takes the token of the lane
+        if self.last_holder not in (None, robot_id):
+            self.handovers += 1
+        self.holder = self.last_holder = robot_id
+        location = wh.robot_locations[robot_id]
+        self.closest, self.stalled = location[0] + abs(location[1]-self.io[1]), 0
+        wh.record_event(robot_id, 'lane', location, self.io)
+    
+    def request(self, wh, robot_id):
+        # TRUE if the robot may enter the restricted zone now: it holds the token, or the token is free and the robot
+        # is at the head of the queue (or the queue is empty)
+        while self.heap and not self.queued(wh, self.heap[0][2]): # unloaded in this time unit
+            heapq.heappop(self.heap)
+        if self.holder != robot_id and (self.holder is not None or self.heap and self.heap[0][2] != robot_id):
+            self.denials += 1
+            return False
+        self.grants += 1
+        if self.holder != robot_id:
+            self.take(wh, robot_id)
+        return True
+    
+    def utilization(self, time):
+        # the share of the time units in which the lane was held
+        return self.busy/time if time else 0.0
+
+
+#######################
+# 15. Profiler
+#######################
+
+class Profiler:
+    # Opt-in instrumentation of a run: counters of the events (see EventLog.LEVELS) of every robot, the wall-clock time
+    # of every time unit, and callbacks that are called on the events and at the start and the end of every time unit:
+    #     profiler.on('escape', callback)   ->  callback(wh, time, robot_id, event, from_loc, to_loc, item)
+    # The events of the moves ('step', 'wait' and 'check_failed') are sent only if steps=True, since there are some for
+    # every robot in every time unit. Without a profiler, the warehouse doesn't call any of it.
+    def __init__(self, steps=True):
+        self.steps = steps
+        self.hooks = {}          # event ('tick_start', 'tick_end' or one of EventLog.LEVELS): [callbacks]
+        self.counts = {}         # event: number of times
+        self.robot_counts = {}   # (robot_id, event): number of times
+        self.tick_seconds = []   # the wall-clock time of every time unit
+        self.tick_started = None
+    
+    def on(self, event, callback=None):
+        # call the callback on the event. Returns the callback; without a callback, returns a decorator that registers
+        # the decorated function: @profiler.on('exit')
+        if event not in EventLog.LEVELS and event not in ('tick_start','tick_end'):
+            raise ValueError("Unknown event %s"%(event))
+        if callback is None:
+            return lambda callback: self.on(event, callback)
+        self.hooks.setdefault(event, []).append(callback)
+        return callback
+    
+    def record(self, wh, time, robot_id, event, from_loc=None, to_loc=None, item=None):
+        self.counts[event] = self.counts.get(event, 0) + 1
+        self.robot_counts[(robot_id, event)] = self.robot_counts.get((robot_id, event), 0) + 1
+        for callback in self.hooks.get(event, ()):
+            callback(wh, time, robot_id, event, from_loc, to_loc, item)
+    
+    def tick_start(self, wh):
+        for callback in self.hooks.get('tick_start', ()):
+            callback(wh, wh.time, None, 'tick_start', None, None, None)
+        self.tick_started = timeit.default_timer()
+    
+    def tick_end(self, wh):
+        self.tick_seconds.append(timeit.default_timer() - self.tick_started)
+        for callback in self.hooks.get('tick_end', ()):
+            callback(wh, wh.time, None, 'tick_end', None, None, None)
+    
+    def summary(self):
+        # The counters and timers of the run. 'frozen' is the number of time units each robot didn't move ('wait').
+        robots = sorted(set(robot_id for robot_id, event in self.robot_counts if robot_id is not None))
+        seconds = np.array(self.tick_seconds)
+        return {'ticks': len(seconds),
+                'seconds': float(seconds.sum()),
+                'mean_tick_seconds': float(seconds.mean()) if len(seconds) else None,
+                'max_tick_seconds': float(seconds.max()) if len(seconds) else None,
+                'slowest_tick': int(seconds.argmax())+1 if len(seconds) else None,
+                'events': dict(self.counts),
+                'robot_events': {robot_id: {event: count for (robot, event), count in self.robot_counts.items()
+                                            if robot == robot_id} for robot_id in robots},
+                'frozen': {robot_id: self.robot_counts.get((robot_id, 'wait'), 0) for robot_id in robots}}
+    
+    def save(self, filename):
+        # export the summary to a pickle file
+        with open(filename,'wb') as outfile:
+            p.dump(self.summary(),outfile)
+
+
+#######################
+# 16. Order stream
+#######################
+
+class OrderStream:
+    # Retrieval and put-away orders that arrive while the warehouse works, instead of a closed list of items to exit.
+    # arrivals is an iterable (or a generator) by the order of the time units, of:
+    #     (time unit, item number)        - a retrieval order of a stored item
+    #     (time unit, item number, slot)  - a put-away order of a new (inbound) item to the slot (row, column)
+    # At every time unit main_program adds the arrived retrieval orders to the items to exit, and the robots that have
+    # no item take them. An order of an item that isn't stored (already exited, or unknown), that is already ordered or
+    # that is being put away is rejected, as is a put-away of a known item or to a slot outside the storage.
+    # An inbound item enters the warehouse on the I/O, on the slot that an exit frees there (the "999" placeholder) -
+    # the storage is full otherwise. The robot that has exited the item stores it on its way back (or, if it was
+    # pushed out, the first robot that has no item): it carries the item to its slot by escort moves.
+    # With restock=True an exited item that no inbound item is waiting for is replaced on the I/O by a new stored item
+    # (numbered after the largest item number) instead of the "999" placeholder - the storage is churned like a real
+    # one, and the new items can be ordered.
+    def __init__(self, arrivals, restock=True):
+        self.arrivals = iter(arrivals)
+        self.restock = restock
+        self.upcoming = None      # the next (time unit, item[, slot]) of the arrivals, that hasn't arrived yet
+        self.last_arrival = 0     # the time unit of the last order that has arrived
+        self.exhausted = False    # TRUE once all the arrivals have arrived
+        self.arrival_times = {}   # (item number: time unit of its order) of the open orders
+        self.latencies = []       # (time unit of the order, time units from the order to the exit) of the closed orders
+        self.inbound = deque()    # (item number, slot, time unit of its order) of the put-aways that wait for a slot on the I/O
+        self.putaways = {}        # (item number: [slot, time unit of its order, robot_id or False]) of the entered put-aways
+        self.stored = []          # (time unit of the order, time units from the order to the storage) of the closed put-aways
+        self.accepted = 0         # number of accepted orders
+        self.accepted_putaways = 0 # number of accepted put-aways
+        self.rejected = 0         # number of rejected orders and put-aways
+        self.restocked = 0        # number of new items that were stored on the I/O
+        self.next_number = None   # the number of the next new item
+
+    def __getstate__(self):
+        # a generator can't be pickled - a restored stream continues with the arrivals given to restore_warehouse
+        state = dict(self.__dict__)
+        state['arrivals'] = iter(())
+        return state
+
+    def arrive(self, time):
+        # the orders that arrive until the given time unit - (item,) of a retrieval, (item, slot) of a put-away
+        orders = []
+        while not self.exhausted:
+            if self.upcoming is None:
+                self.upcoming = next(self.arrivals, None)
+                if self.upcoming is None:
+                    self.exhausted = True
+                    break
+            if self.upcoming[0] > time:
+                break
+            orders.append(tuple(self.upcoming[1:]))
+            self.last_arrival = self.upcoming[0]
+            self.upcoming = None
+        return orders
+
+    def is_open(self):
+        # TRUE as long as orders may still arrive or wait for their exit (or storage)
+        return not self.exhausted or bool(self.arrival_times) or bool(self.inbound) or bool(self.putaways)
+
+    def close(self, item_number, time):
+        # the item of an order has exited in the given time unit
+        if item_number in self.arrival_times:
+            ordered = self.arrival_times.pop(item_number)
+            self.latencies.append((ordered, time-ordered))
+
+    def close_putaway(self, item_number, time):
+        # the inbound item has been stored in its slot in the given time unit
+        slot, ordered, robot_id = self.putaways.pop(item_number)
+        self.stored.append((ordered, time-ordered))
+
+    def new_item(self, wh):
+        # the number of a new item to store
+        if self.next_number is None:
+            self.next_number = max([int(wh.item_plane.max())] + list(wh.exited_items) + list(wh.items_to_exit))+1
+        if self.next_number == 999: # "999" is the placeholder of an exited item
+            self.next_number += 1
+        self.next_number += 1
+        return self.next_number-1
+
+    def summary(self, wh, warmup=0):
+        # Steady-state metrics of the run: the throughput (items exited, stored and both per time unit) from the first
+        # warmup time units until the last order has arrived (the drain of the open orders after it isn't a steady
+        # state), and the percentiles of the latencies (time units from the order to the exit or to the storage) of the
+        # orders after the warmup. The orders that are still open aren't counted in the latencies - they are the backlog.
+        end = self.last_arrival if self.exhausted else wh.time
+        window = max(end-warmup, 0)
+        exits = len([time for time in wh.exited_items.values() if warmup < time <= end])
+        stores = len([ordered for ordered, latency in self.stored if warmup < ordered+latency <= end])
+        
+        def latency_summary(closed):
+            latencies = np.array([latency for ordered, latency in closed if ordered > warmup])
+            percentiles = np.percentile(latencies, [50,90,95,99]) if len(latencies) else [None]*4
+            return {'mean': float(latencies.mean()) if len(latencies) else None,
+                    'max': int(latencies.max()) if len(latencies) else None,
+                    'percentiles': {q: None if value is None else float(value) for q, value in zip((50,90,95,99), percentiles)}}
+        
+        retrievals, putaways = latency_summary(self.latencies), latency_summary(self.stored)
+        return {'time_units': wh.time_units,
+                'warmup': warmup,
+                'last_arrival': self.last_arrival,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'closed': len(self.latencies),
+                'backlog': len(self.arrival_times),
+                'restocked': self.restocked,
+                'throughput': exits/window if window else 0.0,
+                'mean_latency': retrievals['mean'],
+                'max_latency': retrievals['max'],
+                'latency_percentiles': retrievals['percentiles'],
+                'accepted_putaways': self.accepted_putaways,
+                'stored': len(self.stored),
+                'putaway_backlog': len(self.inbound)+len(self.putaways),
+                'putaway_throughput': stores/window if window else 0.0,
+                'tasks_throughput': (exits+stores)/window if window else 0.0,
+                'mean_putaway_latency': putaways['mean'],
+                'max_putaway_latency': putaways['max'],
+                'putaway_latency_percentiles': putaways['percentiles']}
+
+
+#######################
+# 17. Re-slotting
+#######################
+
+class Reslotter:
+    # Background re-slotting: the robots that have nothing to do (see Warehouse.next_task) move the items with the
+    # highest demand to the cheaper cells - closer to the I/O, by the distance of calculate_distance_from_IO - instead
+    # of waiting on their final locations. The item of a cheaper cell is taken over only from an item of a lower
+    # demand (it's pushed away by the carry). demand is (item number: demand frequency) - e.g. the share of the
+    # orders of each item, see zipf_demand; the items without a demand are never moved, and give their cells away.
+    # An item is moved only if its distance shrinks by at least min_gain. The cells of the restricted zones aren't
+    # targets - the robots that bring many items from there to the I/O at once get stuck in each other's way.
+    # The re-slotting is started only while there are no items to exit, by up to max_robots robots at a time, and it
+    # is given up once an item is to be exited - the carries get in the way of the retrievals otherwise.
+    def __init__(self, demand, min_gain=2, max_robots=2, retry=10):
+        self.demand = dict(demand)
+        self.min_gain = min_gain
+        self.max_robots = max_robots
+        self.retry = retry        # time units without planning, after nothing was found to move
+        self.moves = {}           # (item number: [slot, robot_id, distance]) of the items that are being re-slotted
+        self.settled = None       # the time unit in which nothing was found to move
+        self.started = 0          # number of re-slottings that were started
+        self.finished = 0         # number of items that were placed in their new slots
+        self.cancelled = 0        # number of re-slottings that were given up
+        self.distance_cut = 0     # the sum of the distances from the I/O that the finished re-slottings have cut
+    
+    def plan(self, wh):
+        # The next (item, slot) to re-slot, or None. The items are tried from the highest demand, each one to the
+        # cheapest slot that it can take over (the nearest to the item, among the slots of the same distance).
+        if wh.items_to_exit or len(self.moves) >= self.max_robots or \
+           (self.settled is not None and wh.time < self.settled+self.retry):
+            return None
+        busy = set(wh.items_to_exit) | set(self.moves) | (set(wh.orders.putaways) if wh.orders else set())
+        targets = set(move[0] for move in self.moves.values())
+        slots = sorted(((wh.slot_cost((i,j)), (i,j)) for i in range(wh.last_row+1) for j in range(wh.last_column+1)
+                        if (i,j) not in targets and not wh.config.in_restricted_zone((i,j), wh.nearest_station((i,j)))))
+        items = sorted((item for item in wh.item_locations
+                        if self.demand.get(item, 0) > 0 and item not in busy), key=lambda item: -self.demand[item])
+        for item in items:
+            location = wh.item_locations[item]
+            cost = wh.slot_cost(location)
+            best = None
+            for slot_cost, slot in slots:
+                if slot_cost > cost-self.min_gain or (best and slot_cost > best[0]):
+                    break
+                occupant = wh.item_at(slot)
+                if occupant in busy or self.demand.get(occupant, 0) >= self.demand[item]:
+                    continue
+                distance = abs(slot[0]-location[0])+abs(slot[1]-location[1])
+                if best is None or distance < best[1]:
+                    best = (slot_cost, distance, slot)
+            if best:
+                self.settled = None
+                return item, best[2]
+        self.settled = wh.time
+        return None
+    
+    def summary(self):
+        return {'started': self.started, 'finished': self.finished, 'cancelled': self.cancelled,
+                'distance_cut': self.distance_cut}
+
+
+#######################
+# 18. Energy
+#######################
+
+class EnergyModel:
+    # The battery of every robot. Every time unit costs energy by the move of the robot in it (see
+    # Warehouse.record_move): an empty move, a loaded move (with an item - the item of a retrieval, or an item that
+    # the robot moves out of the way of its escort), or an idle time unit (waits, freezes and fictitious moves). A robot
+    # that is idle on a charging cell gains charge_rate instead, up to the capacity. A robot without charge is stalled
+    # - it can't move until it is charged (which never happens away from a charging cell).
+    # capacity=None only accounts the energy (the battery never runs out). charging are the charging cells - the final
+    # locations of the configuration by default, where the idle robots rest anyway.
+    # The robots that have exited an item keep reserve (a share of the capacity) after their next item and the way to
+    # a charging cell (see EnergyDispatcher), and a robot that charges takes items again at resume (a share).
+    KINDS = ('empty', 'loaded', 'idle')
+    
+    def __init__(self, capacity=None, empty=1.0, loaded=1.5, idle=0.1, charge_rate=2.0, charging=None, reserve=0.4,
+                 resume=0.9):
+        self.capacity = capacity
+        self.costs = {'empty': empty, 'loaded': loaded, 'idle': idle}
+        self.charge_rate = charge_rate
+        self.charging = None if charging is None else [tuple(loc) for loc in charging]
+        self.reserve = reserve
+        self.resume = resume
+        self.charge = {}          # (robot_id: its remaining energy)
+        self.used = {}            # (robot_id: {kind: energy used}) of the robot's moves
+        self.moves = {}           # (robot_id: {kind: number of moves})
+        self.charged = {}         # (robot_id: energy received on charging cells)
+        self.stalled = {}         # (robot_id: time units without charge)
+        self.lowest = {}          # (robot_id: the lowest charge of the robot)
+        self.resting = {}         # (robot_id: the charging cell that the robot was sent to rest on)
+    
+    def start(self, wh):
+        # fill the batteries of the warehouse's robots
+        if self.charging is None:
+            self.charging = list(dict.fromkeys(list(wh.config.final_positions_left)+list(wh.config.final_positions_right)))
+        self.reset(wh.robots)
+    
+    def reset(self, robot_ids):
+        # full batteries, and nothing accounted yet
+        for robot_id in robot_ids:
+            self.charge[robot_id] = self.capacity
+            self.used[robot_id] = {kind: 0.0 for kind in self.KINDS}
+            self.moves[robot_id] = {kind: 0 for kind in self.KINDS}
+            self.charged[robot_id] = 0.0
+            self.stalled[robot_id] = 0
+            self.lowest[robot_id] = self.capacity
+    
+    def kind(self, move):
+        # the kind of a move of robots_moves: (with_item, from, to) of a real move, (from, to, False) otherwise
+        if isinstance(move[0], bool):
+            return 'loaded' if move[0] else 'empty'
+        return 'idle'
+    
+    def spend(self, robot_id, move):
+        # account the move that the robot has made in this time unit
+        kind = self.kind(move)
+        cost = self.costs[kind]
+        self.moves[robot_id][kind] += 1
+        if kind == 'idle' and move[0] in self.charging: # the robot charges
+            if self.capacity is not None:
+                gained = min(self.charge_rate, self.capacity-self.charge[robot_id])
+                self.charge[robot_id] += gained
+                self.charged[robot_id] += gained
+            return
+        if self.capacity is None:
+            self.used[robot_id][kind] += cost
+            return
+        if self.charge[robot_id] <= 0:
+            self.stalled[robot_id] += 1
+            return
+        cost = min(cost, self.charge[robot_id])
+        self.used[robot_id][kind] += cost
+        self.charge[robot_id] -= cost
+        self.lowest[robot_id] = min(self.lowest[robot_id], self.charge[robot_id])
+    
+    def charger(self, wh, robot_id, location):
+        # The nearest charging cell to the location that no other robot rests on or goes to (None if there isn't any)
+        idle = set(other for other, robot in wh.robots.items()
+                   if not (robot.item_to_take or robot.currently_taking or robot.putting_away))
+        taken = set(cell for other, cell in self.resting.items() if other != robot_id and other in idle) | \
+                set(loc for other, loc in wh.robot_locations.items() if other != robot_id)
+        free = [cell for cell in self.charging
+                if cell not in taken and (cell == location or wh.item_at(cell) not in (0, 999))]
+        if not free:
+            return None
+        cell = min(free, key=lambda cell: abs(cell[0]-location[0])+abs(cell[1]-location[1]))
+        self.resting[robot_id] = cell
+        return cell
+    
+    def is_stalled(self, robot_id):
+        return self.capacity is not None and self.charge[robot_id] <= 0
+    
+    def is_charging(self, wh, robot_id):
+        # TRUE if the robot is on a charging cell and hasn't reached the resume level yet
+        return wh.robot_locations[robot_id] in self.charging and self.charge[robot_id] < self.resume*self.capacity
+    
+    def task_energy(self, wh, robot_id, item_number):
+        # Estimated energy of the next item of the robot: the escort's journey to the item, the retrieval to the I/O
+        # and the way back to the nearest charging cell - every cell costs a loaded and two empty moves (see escort_steps)
+        robot_loc = wh.robot_locations[robot_id]
+        item_loc = wh.item_locations[item_number]
+        station = wh.nearest_station(item_loc)
+        cells = abs(robot_loc[0]-item_loc[0])+abs(robot_loc[1]-item_loc[1]) + item_loc[0]+abs(item_loc[1]-station[1])
+        return cells*(self.costs['loaded']+2*self.costs['empty']) + self.charger_energy(station)
+    
+    def charger_energy(self, location):
+        # estimated energy of the way from the location to the nearest charging cell
+        cells = min(abs(loc[0]-location[0])+abs(loc[1]-location[1]) for loc in self.charging)
+        return cells*(self.costs['loaded']+2*self.costs['empty'])
+    
+    def can_take(self, wh, robot_id, item_number):
+        # TRUE if the robot's charge covers the item, with the reserve
+        return self.charge[robot_id]-self.task_energy(wh, robot_id, item_number) >= self.reserve*self.capacity
+    
+    def must_charge(self, wh, robot_id):
+        # TRUE if the robot has a task, but only enough charge to get to a charging cell (with half of the reserve)
+        robot = wh.robots[robot_id]
+        return bool(robot.item_to_take or robot.currently_taking or robot.putting_away) and \
+               self.charge[robot_id] < self.charger_energy(wh.robot_locations[robot_id])+self.reserve*self.capacity/2
+    
+    def summary(self, wh=None):
+        # The energy of the run: of every robot and in total, by the kinds of moves, and per exited item
+        total = {kind: sum(used[kind] for used in self.used.values()) for kind in self.KINDS}
+        energy = sum(total.values())
+        exited = len(wh.exited_items) if wh else 0
+        return {'capacity': self.capacity,
+                'used': total,
+                'energy': energy,
+                'moves': {kind: sum(moves[kind] for moves in self.moves.values()) for kind in self.KINDS},
+                'charged': sum(self.charged.values()),
+                'stalled': sum(self.stalled.values()),
+                'stalled_robots': sorted(robot_id for robot_id, stalled in self.stalled.items() if stalled),
+                'energy_per_item': energy/exited if exited else None,
+                'robots': {robot_id: {'used': dict(self.used[robot_id]), 'moves': dict(self.moves[robot_id]),
+                                      'charge': self.charge[robot_id], 'lowest': self.lowest[robot_id],
+                                      'charged': self.charged[robot_id], 'stalled': self.stalled[robot_id]}
+                           for robot_id in self.used}}
+
+
+def energy_of_moves(robots_moves, empty=1.0, loaded=1.5, idle=0.1, charging=()):
+    # The energy of a history of robot moves (robots_moves of a warehouse, or of an exported run) by the costs of the
+    # kinds of moves (see EnergyModel), without a battery. The idle time units on the charging cells cost nothing.
+    model = EnergyModel(None, empty, loaded, idle, charging=charging)
+    model.reset(robots_moves)
+    for robot_id, moves in robots_moves.items():
+        for move in moves:
+            model.spend(robot_id, move)
+    return model.summary()
+
+
+#######################
+# 19. Warehouse
+#########################################################################################################################
+# The main class of this program.
+# A warehouse contains rows X columns cells (9X15 by default), as defined by its configuration.
+
+
+class Warehouse:
+    
+    #########################################################################################################################
+    ############### WAREHOUSE INTIALIZATION
+    #########################################################################################################################
+    
+    def __init__(self, warehouse_filename, items_to_exit_filename, config=None, rng=None, events=None, planner=None,
+                 dispatcher=None, reservations=None, profiler=None, orders=None, reslotter=None, energy=None):
+        # The warehouse and the items to exit can be given either as pickle file names or as the loaded lists.
+        # rng is the random generator of this run (random.Random); by default the global random module is used.
+        # events is an optional EventLog of the run.
+        # planner is an optional RetrievalPlanner, that plans the journeys to the items instead of the manhattan journey,
+        # three step and five step whenever it finds a plan in its time budget.
+        # dispatcher decides which items the robots take (SideDispatcher by default).
+        # reservations is an optional ReservationTable, that makes the robots wait for taken cells instead of freezing.
+        # profiler is an optional Profiler of the run.
+        # orders is an optional OrderStream, whose orders are added to the items to exit as they arrive.
+        # reslotter is an optional Reslotter, that gives the robots without items re-slottings of popular items.
+        # energy is an optional EnergyModel, that accounts the energy of the robots' moves (and their batteries).
+        
+        self.rng = random if rng is None else rng # all the random decisions of the robots are drawn from it
+        self.observe(events, profiler)         # None means no events are recorded/profiled
+        self.planner = planner                 # None means only the manhattan/three step/five step journeys are used
+        self.dispatcher = SideDispatcher() if dispatcher is None else dispatcher
+        self.reservations = reservations       # None means the conflicts are handled only by freeze/escape
+        self.orders = orders                   # None means only the items to exit of the file are exited
+        self.reslotter = reslotter             # None means the idle robots wait on their final locations
+        self.energy = energy                   # None means the energy of the moves isn't accounted
+        self.time = 0                          # the current time unit. Updated by the main program
+        self.distances_left = DistanceQueue()  # initiate queue of distances of items from the left of the I/O
+        self.distances_right = DistanceQueue() # initiate queue of distances of items from the right of the I/O
+        self.changed_items = set()             # items that were moved/assigned/exited since the distances were last updated
+        self.robot_side = {}                   # A dictionary with pairs of (robot_id: side)
+        self.robot_positions = None            # A list of the robot positions. Will be updated every time unit
+        self.items_to_exit_positions = None    # The items that are needed to be exited positions. Will be updated every time unit
+        self.robots_moves = {}                 # history of the robot movements with pairs of (robot_id: moves)
+        self.trajectory = Trajectory()         # the same history, as fixed-width records
+        self.exited_items = {}                 # A dictionary with pairs of (item number to exit: Time of exit) 
+        
+        ############################
+        # Reading the pickle files
+        ############################
+
+        # Warehouse
+        initiated_warehouse = load_pickle(warehouse_filename)
+        
+        # Items to exit
+        items_to_exit = load_pickle(items_to_exit_filename)
+        # Dictionary of items to exit with their occupation status - the key is the item number, the value is the robot id
+        self.items_to_exit = {items_to_exit[i]: False for i in range(len(items_to_exit))}
+        # The order in which the items were added to the dictionary - breaks ties between equal distances
+        self.exit_order = {item: i for i, item in enumerate(self.items_to_exit)}
+        self.changed_items.update(self.items_to_exit)
+        
+        rows, columns = len(initiated_warehouse), len(initiated_warehouse[0]) # rows and columns of the warehouse
+        
+        ############################
+        # Configuration
+        ############################
+        if config is None:
+            config = WarehouseConfig(rows, columns)
+        elif (config.rows, config.columns) != (rows, columns):
+            raise ValueError("The warehouse is %sX%s but the configuration is for %sX%s"%(rows,columns,config.rows,config.columns))
+        self.config = config
+        self.io = config.io                    # the I/O point location (the first one, if there are several)
+        self.stations = config.stations        # all the I/O points. An item is brought to its nearest one
+        self.item_station = {}                 # (item number: I/O point) of the items that robots are taking
+        self.station_exits = {station: 0 for station in self.stations} # number of items exited at each I/O point
+        # a scheduler for each I/O point, that decides which loaded robot enters its restricted zone
+        self.zones = {station: ZoneScheduler(config, station) for station in self.stations}
+        self.zone = self.zones[self.io]
+        # the robot moves to retrieve an item from each cell to each I/O point, and to the nearest one,
+        # or None for the manhattan distance from the I/O
+        self.station_costs = None
+        self.move_costs = None
+        if config.costs != 'manhattan':
+            self.station_costs = {station: best_move_costs(config.at_station(station)) for station in self.stations}
+            self.move_costs = np.minimum.reduce([self.station_costs[station] for station in self.stations])
+        self.last_row = rows-1                 # the last row of the warehouse
+        self.last_column = columns-1           # the last column of the warehouse
+        
+        # Initiate the warehouse planes - each plane is an array of the size of the warehouse
+        self.item_plane = np.array(initiated_warehouse, dtype=np.int32)  # item number in each cell, 0 for an escort
+        self.robot_plane = np.zeros((rows,columns), dtype=np.int16)      # robot id in each cell, 0 if there isn't any robot
+        self.escort_plane = np.zeros((rows,columns), dtype=np.int16)     # the robot id that the escort belongs to, 0 if it's an item
+        self.item_sides = {}                   # A dictionary with pairs of (item number: side)
+        self.robots = {}                       # A dictionary with pairs of (robot_id: robot)
+        self.item_locations = {}               # A dictionary with pairs of (item number: (x,y)). Updated on every move
+        self.robot_locations = {}              # A dictionary with pairs of (robot_id: (x,y)). Updated on every move
+        self.escort_locations = {}             # A dictionary with pairs of (robot_id: (x,y) of its escort). Updated on every move
+        robot_id=1 # initiate a count of robots' id
+        
+        robot_side = config.sides(int(np.count_nonzero(self.item_plane == 0))) # The distribution of the robots
+        k = 0                    # initiate a counter for determining the robot side allocation
+        
+        ###################################
+        # Filling the warehouse planes
+        ###################################
+        for i in range(rows): # filling the warehouse planes
+            for j in range(columns):
+                number = initiated_warehouse[i][j]
+                if number == 0: # in case this is an escort, place the escort + robot in relation to his intended side
+                    side = robot_side[k]
+                    self.robots[robot_id] = Robot(robot_id,side) # We assume that the robot, at the beginning, is in the place of the escorts.
+                    self.robot_plane[i,j] = robot_id
+                    self.escort_plane[i,j] = robot_id
+                    self.robot_locations[robot_id] = (i,j)
+                    self.escort_locations[robot_id] = (i,j)
+                    self.robot_side[robot_id] = side # save the belonging of the robot to the relevant side of the warehouse
+                    self.robots_moves[robot_id] = []
+                    robot_id+=1
+                    k+=1
+                else:
+                    io_column = self.nearest_station((i,j))[1]
+                    if j<io_column:
+                        side=1 # item is located on the left of the warehouse
+                    elif j>io_column:
+                        side=2 # item is located on the right of the warehouse
+                    else:
+                        side=3 # item is located exactly in the middle of the warehouse (the I/O column)
+                    self.item_sides[number] = side # the side of the item, with respect to his initial location in the warehouse
+                    self.item_locations[number] = (i,j)
+        
+        # final locations for the robots on each side of the warehouse - one for each robot
+        # (a robot may change its side, see MatchingDispatcher)
+        self.robot_final_positions_left = [config.final_positions_left[i%len(config.final_positions_left)]
+                                           for i in range(max(len(self.robots), len(config.final_positions_left)))]
+        self.robot_final_positions_right = [config.final_positions_right[i%len(config.final_positions_right)]
+                                            for i in range(max(len(self.robots), len(config.final_positions_right)))]
+            
+        self.calculate_positions()                # Calculate all robots & items to exit positions in the warehouse
+        self.calculate_distance_from_IO()         # calculate distance of the items from the I/O point
+        if self.energy:
+            self.energy.start(self)               # full batteries
+        
+    
+    #########################################################################################################################
+    ############### CELLS ACCESS
+    #########################################################################################################################
+    
+    def cell(self, location):
+        # A view of the cell in the given location
+        return Cell(self, location)
+    
+    def item_at(self, location):
+        # The item number in the given location; 0 means an escort
+        return int(self.item_plane[location])
+    
+    def escort_at(self, location):
+        # The robot id that the escort in the given location belongs to
+        return int(self.escort_plane[location])
+    
+    def side_at(self, location):
+        # The side of the item in the given location
+        return self.item_sides.get(self.item_at(location), 0)
+    
+    def robot_at(self, location):
+        # The robot in the given location, '' if there isn't any
+        robot_id = int(self.robot_plane[location])
+        return self.robots[robot_id] if robot_id else ''
+    
+    def place_robot(self, location, robot):
+        # Put the robot ('' for none) in the given location and keep the robots index up to date
+        if robot == '':
+            self.robot_plane[location] = 0
+        else:
+            self.robot_plane[location] = robot.id
+            self.robot_locations[robot.id] = location
+    
+    def place_item(self, location, item):
+        # Put the item (or the escort) in the given location and keep the items and escorts indices up to date
+        previous = self.item_at(location)
+        if self.item_locations.get(previous) == location: # the previous item has left this location
+            del self.item_locations[previous]
+        
+        self.item_plane[location] = item.number
+        if item.number == 0: # an escort keeps its owner
+            self.escort_plane[location] = item.robot_id
+            self.escort_locations[item.robot_id] = location
+        else:
+            self.escort_plane[location] = 0
+            self.item_sides.setdefault(item.number, item.side)
+            if item.number != 999: # "999" is a placeholder for an exited item and isn't unique
+                self.item_locations[item.number] = location
+                self.changed_items.add(item.number)
+    
+    def to_dataframe(self):
+        # A pandas DataFrame of the cells, for visual presentation of the warehouse
+        import pandas as pd
+        rows, columns = self.item_plane.shape
+        return pd.DataFrame([[self.cell((i,j)) for j in range(columns)] for i in range(rows)])
+    
+    def observe(self, events=None, profiler=None):
+        # Set the event log and the profiler that receive the events of the warehouse
+        self.events = events
+        self.profiler = profiler
+        self.tracing = bool(events and events.debug) or bool(profiler and profiler.steps) # are the moves recorded?
+    
+    def record_event(self, robot_id, event, from_loc=None, to_loc=None, item=None, time=None):
+        # send an event of this time unit (or of the given time) to the event log and the profiler
+        time = self.time if time is None else time
+        if self.events:
+            self.events.record(time, robot_id, event, from_loc, to_loc, item)
+        if self.profiler:
+            self.profiler.record(self, time, robot_id, event, from_loc, to_loc, item)
+    
+    def snapshot(self):
+        # The full state of the simulation as compressed bytes, that can be restored by restore_warehouse:
+        # the planes, the robots and their paths, the items to exit, the exited items, the final positions and the
+        # random generator's state. The event log and the profiler aren't a part of the state - they are given again on
+        # restore.
+        state = dict(self.__dict__)
+        state['events'] = state['profiler'] = None
+        if self.rng is random: # the global random generator can't be pickled, but its state can
+            state['rng'] = ('global', random.getstate())
+        return zlib.compress(p.dumps(state, p.HIGHEST_PROTOCOL))
+    
+    #########################################################################################################################
+    ############### ASSIGNMENTS FUNCTIONS
+    #########################################################################################################################
+    
+    ################################
+    # 1. Define the path of a robot
+    ################################
+    def define_robot_path(self, robot_id, steps, overwrite=True):
+        #### Assign planned path (of steps) to a specific robot. 
+        #### If overwrite=true, overwrite the path of the robot with the received steps.
+        #### Otherwise, steps is a single step that is pushed to the front of the path.
+        
+        robot_loc = self.robot_positions[robot_id-1][0] # retrieve current robot's position
+
+        if overwrite: # should we delete the current robot's route with a new one?
+            self.robot_at(robot_loc).path = RobotPath(steps)
+            
+        else: # add the planned step to the current robot's planned steps
+            self.robot_at(robot_loc).path.push_front(steps) # inserting the step like in a stack
+    
+
+    #########################################
+    # 2. Assign an item to exit to a robot
+    #########################################
+    def assign_item(self, item_number, robot_id):
+        #### Set the robot that takes the item to exit. robot_id=False means that no robot takes it.
+        
+        if item_number not in self.items_to_exit: # a new item to exit is added at the end of the dictionary
+            self.exit_order[item_number] = len(self.exit_order)
+        if len(self.stations) > 1: # the item is brought to the I/O point that is the nearest now, until it is released
+            if robot_id and item_number not in self.item_station:
+                self.item_station[item_number] = self.nearest_station(self.find_item_location(item_number))
+            elif not robot_id:
+                self.item_station.pop(item_number, None)
+        self.items_to_exit[item_number] = robot_id
+        self.changed_items.add(item_number)       # its distance from the I/O should be updated
+        self.record_event(robot_id or None, 'assign' if robot_id else 'release', item=item_number)
+
+
+    #########################################
+    # 3. Exiting an item from the warehouse
+    #########################################
+    def exit_item(self, robot_id, current_time, station=None):
+        #### When the item has arrived to the I/O point (or to the given station), remove the item from the list of items to exit,
+        #### assign item "999" to the relevant cell and add the item along with the robot_id who took it to the list of exited items.
+        #### With an order stream, an inbound item that waits for a slot enters on the cell instead of "999" (or, if the
+        #### stream restocks, a new item is stored in it).
+        
+        station = self.io if station is None else station
+        item_number = self.item_at(station)
+        if robot_id: # if it was exited by a robot
+            robot_loc = self.robot_positions[robot_id-1][0] # retrieve current robot's position
+            if self.robot_at(robot_loc).item_to_take == item_number: # the item was brought by an exact plan
+                self.robot_at(robot_loc).item_to_take = None
+            # the robot has brought an item that it didn't take - it leaves its own item (it receives a new one)
+            other_item = self.robot_at(robot_loc).item_to_take or self.robot_at(robot_loc).currently_taking
+            if other_item and other_item != item_number and self.items_to_exit.get(other_item) == robot_id:
+                self.assign_item(other_item,False)
+        
+        self.exited_items[item_number] = current_time+1 # it takes another time unit to exit the item
+        del self.items_to_exit[item_number]
+        self.item_station.pop(item_number, None)
+        self.station_exits[station] += 1
+        self.changed_items.add(item_number)
+        if self.orders:
+            self.orders.close(item_number, current_time+1)
+        if self.orders and self.orders.restock and not self.orders.inbound: # the slot is stored again, with a new item
+            self.cell(station).assignItem(Item(self.orders.new_item(self), False, 3))
+            self.orders.restocked += 1
+        else:
+            self.cell(station).assignItem(Item(999))
+        self.record_event(robot_id or None, 'exit', to_loc=station, item=item_number, time=current_time)
+        if self.orders: # the freed slot receives an inbound item
+            self.receive_inbound(station)
+    
+
+    #########################################
+    # 4. Online orders
+    #########################################
+    def take_orders(self):
+        #### Add the orders of the order stream that have arrived until this time unit to the items to exit,
+        #### and the put-aways to the inbound items that wait for a slot on the I/O.
+        
+        arrived = False
+        for order in self.orders.arrive(self.time):
+            item_number = order[0]
+            if len(order) > 1: # a put-away
+                self.take_putaway(item_number, tuple(order[1]))
+                continue
+            if item_number in self.items_to_exit or item_number not in self.item_locations or \
+               item_number in self.orders.putaways: # ordered, not stored, or not stored yet
+                self.orders.rejected += 1
+                continue
+            if self.reslotter and item_number in self.reslotter.moves: # the item is re-slotted - it's exited instead
+                self.cancel_reslot(self.reslotter.moves[item_number][1])
+            self.orders.accepted += 1
+            self.orders.arrival_times[item_number] = self.time
+            self.exit_order[item_number] = len(self.exit_order) # a new item to exit is added at the end of the dictionary
+            self.items_to_exit[item_number] = False
+            self.changed_items.add(item_number)
+            self.record_event(None, 'order', item=item_number)
+            arrived = True
+        
+        if arrived: # the new items to exit are ranked by their distances
+            self.calculate_positions()
+            self.calculate_distance_from_IO()
+        for station in self.stations: # a slot that is free on the I/O receives an inbound item
+            self.receive_inbound(station)
+    
+    def dispatch_idle(self):
+        #### Give tasks to the robots that have none - they have finished their items before the orders arrived.
+        #### A robot on its way to its final location leaves it. A robot that re-slots an item gives it up for the orders.
+        
+        for robot_id in self.dispatcher.to_charge(self):
+            self.recharge(robot_id)
+        if all(self.items_to_exit.values()) and not self.waiting_putaways() and not self.reslotter: # nothing to do
+            return
+        for robot_id, robot in self.robots.items():
+            if self.reslotter and robot.putting_away in self.reslotter.moves and self.items_to_exit:
+                self.cancel_reslot(robot_id)
+            if not (robot.item_to_take or robot.currently_taking or robot.putting_away):
+                self.next_task(robot_id)
+    
+    def next_task(self, robot_id):
+        #### Give the robot, that has no task, an inbound item that waits for a robot, or else its next item to exit,
+        #### or else an item to re-slot. FALSE if there is nothing for it to do.
+        
+        waiting = self.waiting_putaways()
+        if waiting:
+            self.put_away(robot_id, waiting[0])
+            return True
+        if all(self.items_to_exit.values()): # no free items to exit
+            return self.reslot(robot_id)
+        self.calculate_distance_from_IO() # the items that were exited or taken in this time unit are out of the queues
+        item = self.dispatcher.next_item(self, robot_id)
+        if item is None: # no items to exit for this robot
+            return self.reslot(robot_id)
+        robot = self.robots[robot_id]
+        self.manhattan_journey_to_item(robot_id,item)
+        if robot.path and robot.path.at_check(): # the item is right next to the robot - it starts taking it
+            robot.robot_is_taking(item)
+        else:
+            robot.robot_will_take(item)
+        self.assign_item(item,robot_id)
+        return True
+    
+
+    #########################################
+    # 5. Put-aways
+    #########################################
+    def take_putaway(self, item_number, slot):
+        #### A put-away order of a new item to the slot: it waits for a free slot on the I/O
+        
+        waiting = set(item for item, slot_, ordered in self.orders.inbound)
+        if item_number in (0, 999) or item_number in self.item_locations or item_number in self.exited_items or \
+           item_number in waiting or not (0 <= slot[0] <= self.last_row and 0 <= slot[1] <= self.last_column) or \
+           slot in self.stations: # a known item, or a slot outside the storage
+            self.orders.rejected += 1
+            return
+        self.orders.accepted_putaways += 1
+        self.orders.inbound.append((item_number, slot, self.time))
+    
+    def receive_inbound(self, station):
+        #### The first inbound item enters on the station, if there is a free slot ("999") on it
+        
+        if not self.orders.inbound or self.item_at(station) != 999:
+            return None
+        item_number, slot, ordered = self.orders.inbound.popleft()
+        self.cell(station).assignItem(Item(item_number, False, 3))
+        self.orders.putaways[item_number] = [slot, ordered, False]
+        self.record_event(None, 'inbound', to_loc=station, item=item_number)
+        return item_number
+    
+    def waiting_putaways(self):
+        # the inbound items that have entered and wait for a robot to store them
+        if not self.orders:
+            return []
+        return [item for item, (slot, ordered, robot_id) in self.orders.putaways.items() if not robot_id]
+    
+    def put_away(self, robot_id, item_number):
+        #### The robot stores the inbound item: it leaves its item (if it has one) and carries the item to its slot
+        
+        robot = self.robots[robot_id]
+        previous = robot.item_to_take or robot.currently_taking
+        if previous and self.items_to_exit.get(previous) == robot_id:
+            self.assign_item(previous,False)
+        robot.item_to_take = None
+        robot.currently_taking = None
+        robot.putting_away = item_number
+        self.orders.putaways[item_number][2] = robot_id
+        self.record_event(robot_id, 'putaway', self.robot_locations[robot_id], self.orders.putaways[item_number][0],
+                          item_number)
+        self.carry_journey(robot_id)
+    
+    def carry_on(self, robot_id):
+        #### The robot has finished its planned carry: the item is stored if it is in its slot, otherwise the carry is
+        #### planned again (other robots may have moved the item or blocked the way). Then the robot takes its next task.
+        
+        robot = self.robots[robot_id]
+        item_number = robot.putting_away
+        slot = self.carry_slot(item_number)
+        if self.find_item_location(item_number) != slot:
+            self.carry_journey(robot_id)
+            return True
+        
+        robot.putting_away = None
+        self.changed_items.add(item_number)
+        if self.reslotter and item_number in self.reslotter.moves: # a re-slotted item
+            distance = self.reslotter.moves.pop(item_number)[2]
+            self.reslotter.finished += 1
+            self.reslotter.distance_cut += distance-self.slot_cost(slot)
+            self.record_event(robot_id, 'reslotted', to_loc=slot, item=item_number)
+        else:
+            self.orders.close_putaway(item_number, self.time)
+            self.record_event(robot_id, 'stored', to_loc=slot, item=item_number)
+        if not self.next_task(robot_id): # nothing to do - go to the final location
+            return self.final(robot_id)
+        return True
+    
+    def carry_slot(self, item_number):
+        # the slot that the carried item goes to - of its put-away, or of its re-slotting
+        if self.reslotter and item_number in self.reslotter.moves:
+            return self.reslotter.moves[item_number][0]
+        return self.orders.putaways[item_number][0]
+    
+
+    #########################################
+    # 6. Re-slotting
+    #########################################
+    def reslot(self, robot_id):
+        #### The robot, that has nothing else to do, carries the next item of the re-slotter to its new slot.
+        #### FALSE if there isn't any (or there isn't a re-slotter).
+        
+        if not self.reslotter:
+            return False
+        move = self.reslotter.plan(self)
+        if move is None:
+            return False
+        item_number, slot = move
+        robot = self.robots[robot_id]
+        robot.item_to_take = None
+        robot.currently_taking = None
+        robot.putting_away = item_number
+        self.reslotter.moves[item_number] = [slot, robot_id, self.slot_cost(self.item_locations[item_number])]
+        self.reslotter.started += 1
+        self.record_event(robot_id, 'reslot', self.item_locations[item_number], slot, item_number)
+        self.carry_journey(robot_id)
+        return True
+    
+    def cancel_reslot(self, robot_id):
+        #### The robot gives up its re-slotting - the item stays where it has been carried to, and the robot goes to its
+        #### final location (unless it receives another task)
+        
+        robot = self.robots[robot_id]
+        item_number = robot.putting_away
+        del self.reslotter.moves[item_number]
+        self.reslotter.cancelled += 1
+        robot.putting_away = None
+        self.changed_items.add(item_number)
+        self.record_event(robot_id, 'reslot_cancelled', to_loc=self.item_locations[item_number], item=item_number)
+        self.final(robot_id)
+        
+
+    #########################################
+    # 7. Charging
+    #########################################
+    def recharge(self, robot_id):
+        #### The robot, whose battery runs low, gives up its task (another robot takes it) and goes to charge
+        
+        robot = self.robots[robot_id]
+        item_number = robot.item_to_take or robot.currently_taking
+        if item_number and self.items_to_exit.get(item_number) == robot_id:
+            self.assign_item(item_number,False)
+        if self.reslotter and robot.putting_away in self.reslotter.moves: # the re-slotting is given up
+            del self.reslotter.moves[robot.putting_away]
+            self.reslotter.cancelled += 1
+        elif robot.putting_away: # the inbound item waits for another robot, where it is
+            self.orders.putaways[robot.putting_away][2] = False
+        robot.item_to_take = None
+        robot.currently_taking = None
+        robot.putting_away = None
+        self.record_event(robot_id, 'charge', self.robot_locations[robot_id], item=item_number)
+        self.final(robot_id)
+        
+
+    #########################################################################################################################
+    ############### POSITIONS AND LOCATIONS
+    #########################################################################################################################
+    
+    #################################################################################
+    # 1. Calculate the positions of the robots and the items that needs to be exited
+    #################################################################################
+    def calculate_positions(self):
+        #### robots positions
+        #####################
+        # retrieve robot positions with their ID, in order to preserve the robots order: 1-5
+        current_robot_positions = [(self.robot_locations[robot_id], robot_id) for robot_id in sorted(self.robot_locations)]
+        self.robot_positions = current_robot_positions          # each object is with the format: ((x,y),robot_id)
+        
+        #### items to exit positions
+        ############################
+        positions = sorted(self.item_locations[item] for item in self.items_to_exit
+                           if item in self.item_locations) # retrieve the positions of the items to exit
+        
+        self.items_to_exit_positions = positions                # each object is with the format: (x,y)
+        
+    #################################################################################
+    # 2. Distance from the IO calculator
+    #################################################################################
+    def calculate_distance_from_IO(self):
+        # The distance of every item to exit from its nearest I/O point: row + |column - I/O column|, or with move
+        # costs (config.costs='moves') the number of robot moves of the retrieval (see slot_cost).
+        # The side of the item is of that I/O point too: left up to its column (distances_left), right after it.
+        # Only the items that were moved, assigned or exited since the last update are updated in the queues.
+        
+        for item in self.changed_items:
+            if item in self.items_to_exit and not self.items_to_exit[item] and item!=None: # TRUE means that the item needs to be exited
+                position = self.find_item_location(item)
+                station = self.nearest_station(position)
+                distance = self.slot_cost(position, station)
+                if position[1] > station[1]:
+                    self.distances_left.remove(item)
+                    self.distances_right.update(item,distance,self.exit_order[item])
+                else:
+                    self.distances_right.remove(item)
+                    self.distances_left.update(item,distance,self.exit_order[item])
+            else: # the item is taken by a robot, or isn't needed to be exited anymore
+                self.distances_left.remove(item)
+                self.distances_right.remove(item)
+        
+        self.changed_items = set()
+    
+    def slot_cost(self, location, station=None):
+        # the distance of the cell from its nearest I/O point (or from the given one), by which the items to exit are
+        # ranked: manhattan, or the robot moves of the retrieval with move costs
+        if self.move_costs is not None:
+            return int(self.move_costs[location])
+        station = self.nearest_station(location) if station is None else station
+        return location[0]+abs(location[1]-station[1])
+    
+    #########################################################################################################################
+    ############### SEARCH & DISTANCE CALCULATIONS
+    #########################################################################################################################
+    
+    #################################################################################
+    # 1. Find item location
+    #################################################################################
+    def find_item_location(self, item_number):
+        # retrieve item_number position with the format (x,y)
+        if item_number in self.item_locations: # a unique item - constant time lookup
+            return self.item_locations[item_number]
+        
+        # escorts and exited items aren't unique - find the first of them
+        criterion = self.item_plane == item_number
+        positions = [(int(i),int(j)) for i,j in np.argwhere(criterion)] # retrieve item location
+        return positions[0] # return the location
+    
+    #################################################################################
+    # 2. I/O points
+    #################################################################################
+    def nearest_station(self, location):
+        # The I/O point that an item in the location is brought to at the lowest cost (the first one of equal costs)
+        if len(self.stations) == 1:
+            return self.io
+        if self.station_costs is None:
+            return min(self.stations, key=lambda station: location[0]+abs(location[1]-station[1]))
+        return min(self.stations, key=lambda station: self.station_costs[station][location])
+    
+    def station_of_item(self, item_number):
+        # The I/O point of an item: the one it was given once a robot took it, otherwise its nearest one
+        if item_number in self.item_station:
+            return self.item_station[item_number]
+        return self.nearest_station(self.find_item_location(item_number))
+    
+    def station_of(self, robot_id):
+        # The I/O point of a robot: of the item it takes, otherwise the nearest one
+        if len(self.stations) == 1:
+            return self.io
+        robot_loc = self.robot_locations[robot_id]
+        robot = self.robot_at(robot_loc)
+        item = robot.currently_taking or robot.item_to_take
+        if item and item in self.item_locations:
+            return self.station_of_item(item)
+        return self.nearest_station(robot_loc)
+          
+    #########################################################################################################################
+    ############### EXACT JOURNEY PLANNER
+    #########################################################################################################################
+    
+    def exact_journey_to_item(self, robot_id, item):
+        # Plan the whole retrieval of the item - until it is in the I/O - with the exact planner.
+        # The plans ignore the traffic rules of the journeys, so they are used only once all the other robots
+        # have finished their items (and were sent to their final locations) - they are avoided like obstacles.
+        # FALSE if another robot is still working, or if the planner didn't find a plan in its time budget.
+        robot_loc = self.robot_positions[robot_id-1][0]
+        others = [self.robot_at(self.robot_locations[other]) for other in self.robots if other != robot_id]
+        if any(robot.path is None or robot.item_to_take or robot.currently_taking for robot in others):
+            return False
+        blocked = [self.escort_locations[robot.id] for robot in others] + [self.robot_locations[robot.id] for robot in others]
+        steps = self.planner.plan(self.config.at_station(self.station_of_item(item)), robot_loc,
+                                  self.escort_locations[robot_id], self.find_item_location(item), blocked=blocked)
+        if not steps:
+            return False
+        self.define_robot_path(robot_id, steps)
+        self.record_event(robot_id, 'exact_route', from_loc=robot_loc, item=item)
+        return True
+    
+    #########################################################################################################################
+    ############### MANHATTAN JOURNEY PLANNER
+    ######################################################################################################################### 
+    
+    def manhattan_journey_to_item(self, robot_id, item, overwrite=True, final=False, final_loc=0):
+        # calculate the path towards a location ((x,y) format)
+        
+        if self.planner and overwrite and not final and self.exact_journey_to_item(robot_id, item):
+            self.robot_at(self.robot_positions[robot_id-1][0]).item_to_take = item # the exact plan replaces the journey
+            return
+        
+        steps = []
+        
+        ### Locations
+        current_loc = self.robot_positions[robot_id-1][0]   # retrieve current robot's position
+        robot_loc = current_loc
+        target_loc = self.find_item_location(item)          # The location of the item
+        
+        ### Make sure we are with the escort
+        escort_loc = self.return_to_escort(current_loc,robot_id) # FALSE if the robot is with the escort
+        if escort_loc: # Have we received the location of the robot's escort?
+            steps.extend([(current_loc,escort_loc,False)])  # add one step to the escort
+            current_loc = escort_loc                        # Now the robot's location is the same as the escort's
+        
+        ## Scenarios:
+        ### 1. The target item's location is on the same row as the robot's
+        ### 2. The target item's location is on the same column as the robot's 
+        
+        if target_loc[0] == current_loc[0] or target_loc[0]<=1: # target is in the same row: apply columns steps first, then rows
+            decision = True
+        elif target_loc[1] == current_loc[1]:                   # target is in the same column: apply rows first, then columns
+            decision = False
+        else:                                                   # Otherwise, choose randomly
+            decision = self.rng.choice([True, False])
+            
+        if final:                                               # is this the last route for the robot?
+            decision = self.rng.choice([True, False])           # Choose randomly how to get over there
+            current_loc = final_loc                             
+
+        if decision:                                            # According to the decided way
+            if target_loc[0] == 0:                              # In case the target location is in row 0,
+                if 0 < target_loc[1] < self.last_column:        # Arrive one column left to the item, if possible
+                    target_loc = (target_loc[0],target_loc[1]-1)
+                elif target_loc[1] == 0:
+                    target_loc = (target_loc[0],1)
+                elif target_loc[1] == self.last_column:
+                    target_loc = (target_loc[0],self.last_column-1)
+                    
+            columns_steps = self.columns_steps(current_loc, target_loc[1])    # columns steps
+            middle_loc = (current_loc[0],target_loc[1])                       # we have arrived to the turn location
+            rows_steps = self.rows_steps(middle_loc,target_loc[0])            # now apply rows steps
+            
+            steps.extend(columns_steps)
+            steps.extend(rows_steps)
+
+        else: 
+            if target_loc[0] > 1:
+                target_loc = (target_loc[0]-1,target_loc[1]) # one row beneath the item
+                
+            rows_steps = self.rows_steps(current_loc,target_loc[0])           # rows steps
+            middle_loc = (target_loc[0],current_loc[1])                       # we have arrived to the turn location
+            columns_steps = self.columns_steps(middle_loc, target_loc[1])     # columns steps
+            
+            steps.extend(rows_steps)
+            steps.extend(columns_steps)
+        
+        if steps:                                                   # do we have planned steps?
+            if overwrite:
+                self.define_robot_path(robot_id, steps, overwrite)  # assign the relevant final planned steps and overwrite the exist path
+            else: # in case we want to add steps to the current robot's path
+                for step in reversed(steps): # adding the manhattan step like adding elements to a stack
+                    self.define_robot_path(robot_id, step, overwrite)
+        
+        else:                           # we haven't planned any steps
+            if not final:               # (a robot that is already in its final location has nothing to do)
+                robot = self.robot_at(robot_loc)
+                if not robot.item_to_take and not robot.currently_taking: # its first item is right next to it
+                    robot.item_to_take = item
+                self.three_step(robot_id) # we are ready to start 3 step
+            return True
+            
+            
+        if not final:                   # if it's not the final route of the robot
+            self.robot_at(robot_loc).item_to_take = item # assign the intended item to take
+        
+    #########################################################################################################################
+    ############### MOVEMENTS IN THE WAREHOUSE
+    #########################################################################################################################
+    
+    ################################
+    # 1. Movement along a line
+    ################################
+
+    def escort_steps(self, current_loc, target, axis):
+        # The steps that carry the item at current_loc to target on the same row/column (axis 0/1), generated lazily.
+        # Every cell costs three steps: robot to the escort ahead, back with the item, and around to the new escort.
+        start = current_loc[axis]
+        if start == target:
+            return
+        fixed = current_loc[1-axis]
+        loc = (lambda v: (v,fixed)) if axis == 0 else (lambda v: (fixed,v))
+        d = 1 if target > start else -1 # walking up/right or down/left
+        
+        yield (loc(start), loc(start+d), False)  # first movement - the item is next to the robot
+        yield (loc(start+d), loc(start), True)
+        for x in range(start+d, target, d):
+            yield (loc(x-d), loc(x), False)
+            yield (loc(x), loc(x+d), False)
+            yield (loc(x+d), loc(x), True)
+        yield (loc(target-d), loc(target), False) # last move to the escort
+    
+    ################################
+    # 2. Movement in rows
+    ################################
+
+    def rows_steps(self, current_loc, target):
+        return self.escort_steps(current_loc, target, 0)
+
+    ################################
+    # 3. Movement in columns
+    ################################
+
+    def columns_steps(self, current_loc, y_target):
+        return self.escort_steps(current_loc, y_target, 1)
+    
+    
+    #########################################################################################################################
+    ############### THREE STEP MOVEMENTS
+    #########################################################################################################################
+
+    ################################
+    # 1. Horizontal movements
+    ################################
+
+    def three_step_horizontal(self,current_loc,io=None):
+        # We assume here that the robot is with the escort. io is the I/O point of the item (the first one by default)
+        io = self.io if io is None else io
+        steps=[CHECK]           # a checkmark for the beginning of this series of steps
+        if current_loc[1] == io[1]: # if we are at the same column as the I/O point is, then no steps are needed.
+            return steps
+        else:
+            direction = 1 if current_loc[1]>io[1] else -1 # defines on which side we are at (column-wise)
+        
+        steps.extend(self.columns_steps(current_loc,current_loc[1]-direction)) # one step left/right
+        location_2 = (current_loc[0],current_loc[1]-direction)
+        
+        steps.extend(self.rows_steps(location_2,current_loc[0]-1)) # one step down
+        location_3 = (current_loc[0]-1,current_loc[1]-direction)
+        
+        steps.extend(self.columns_steps(location_3,current_loc[1])) # one step to the item
+        final_loc = steps[-1][1] # the location of the robot at the end
+
+        return final_loc,steps
+    
+    ################################
+    # 2. Vertical movements
+    ################################
+
+    def three_step_vertical(self,current_loc,io=None):
+        # assuming the robot is with the escort. io is the I/O point of the item (the first one by default)
+        io = self.io if io is None else io
+        steps=[CHECK]           # a checkmark for the beginning of this series of steps
+        if current_loc[1] == io[1]: # if we are at the same column as the I/O point is, no steps are needed.
+            return steps
+        else:
+            direction = 1 if current_loc[1]>io[1] else -1 # defines on which side we are at (column-wise)
+        
+        # locations during the steps:
+        location_2 = (current_loc[0]-1,current_loc[1])
+        location_3 = (current_loc[0]-1,current_loc[1]-direction)
+        
+        # apply steps:
+        steps.extend(self.rows_steps(current_loc,current_loc[0]-1))             # one step down
+        steps.extend(self.columns_steps(location_2,current_loc[1]-direction))   # one step left/right
+        steps.extend(self.rows_steps(location_3,current_loc[0]))                # one step up
+
+        final_loc = steps[-1][1] # the location of the robot at the end
+        
+        if final_loc[0] == 0: # we need to apply another final three step if we arrive the I/O
+            steps.extend(self.rows_steps(final_loc,1))                                              # one step towards the item
+            steps.extend(self.columns_steps((final_loc[0]+1,final_loc[1]),final_loc[1]-direction))  # one step left/right
+            steps.extend(self.rows_steps((final_loc[0]+1,final_loc[1]-direction),0))                # one step down
+            final_loc = (0,final_loc[1]-direction)
+
+        return final_loc,steps
+    
+    #########################################################################################################################
+    ############### MAIN THREE STEP JOURNEY PLANNER
+    #########################################################################################################################
+    
+    def three_step(self,robot_id):
+        # by a given current_loc, calculate the needed three steps until we reach either column 7 or row 1 (in relation to the relevant side of the warehouse)
+        last_valid_loc = self.robot_positions[robot_id-1][0]
+        steps = []
+        item_above, item_below, item_right, item_left = False,False,False,False
+        
+        # Determine the items around the robot location, including the position of the robot
+        items = [self.item_at((last_valid_loc))]
+        if last_valid_loc[0] < self.last_row: # item above
+            item_above = True
+            items.append(self.item_at((last_valid_loc[0]+1,last_valid_loc[1])))
+        if last_valid_loc[0] > 0: # item below
+            item_below = True
+            items.append(self.item_at((last_valid_loc[0]-1,last_valid_loc[1])))
+        if last_valid_loc[1] < self.last_column: # item right
+            item_right = True
+            items.append(self.item_at((last_valid_loc[0],last_valid_loc[1]+1)))
+        if last_valid_loc[1] > 0: # item left
+            item_left = True
+            items.append(self.item_at((last_valid_loc[0],last_valid_loc[1]-1)))
+
+        
+        # Does the item that the robot is currently taking was found in the items around him?
+        if self.robot_at(last_valid_loc).item_to_take not in items and self.robot_at(last_valid_loc).currently_taking not in items:
+            # If so, apply reroute to the item.
+            self.reroute(robot_id)
+            return False
+        else:
+            # Otherwise we can start the three steps - horizontal then vertical.
+            first_time = True
+            
+            # Let's make sure that the robot is with the escort.
+            escort_loc = self.return_to_escort(last_valid_loc,robot_id)
+            if escort_loc: # if the robot is not with the escort,
+                steps.extend([(last_valid_loc,escort_loc,False)]) # apply one step to the escort
+                last_valid_loc = escort_loc                       # and save the current location.
+            
+            io = self.station_of(robot_id) # the I/O point of the item
+            while last_valid_loc[1]!=io[1] and last_valid_loc[0]>0: # until we reach the column where the I/O point is, or until row is 1
+                # one step towards the item if its the first movement
+                if first_time and item_above: # make sure we can go to the row above
+                    steps.append(CHECK)
+                    steps.extend(self.rows_steps(last_valid_loc,last_valid_loc[0]+1))
+                    last_valid_loc = steps[-1][1] # update last valid location
+                    first_time = False
+                
+                # Now apply three steps until we reach the relevant position
+                new_loc, current_steps = self.three_step_horizontal(last_valid_loc, io)
+                last_valid_loc = new_loc # update last valid location
+                steps.extend(current_steps)
+                if last_valid_loc[0]>0: # maybe we are finished here, and only one vertical movement is needed?
+                    new_loc, current_steps = self.three_step_vertical(last_valid_loc, io)
+                    last_valid_loc = new_loc # update last valid location
+                    steps.extend(current_steps)
+                    
+        if steps: # Have we planned steps? if so, save them according to the relevant robot.
+            self.define_robot_path(robot_id,steps)
+
+        else:     # If no 3 steps are needed but only 5 steps:
+            # Now the robot is currently taking the item.
+            item_to_take = self.robot_at(self.robot_positions[robot_id-1][0]).item_to_take
+            self.robot_at(self.robot_positions[robot_id-1][0]).currently_taking = item_to_take
+            self.robot_at(self.robot_positions[robot_id-1][0]).item_to_take = None
+            self.five_step(robot_id) # do the necessary 5 steps towards the IO
+            return False
+        return True
+
+    #########################################################################################################################
+    ############### FIVE STEP MOVEMENTS
+    #########################################################################################################################
+    
+    ################################
+    # 1. Horizontal movements
+    ################################
+
+    def five_step_horizontal(self,current_loc,io=None):
+        # assuming that the item is closer to the I/O in comparison to the robot. io is the I/O point of the item
+        io = self.io if io is None else io
+        last_valid_loc = current_loc
+        steps = [CHECK]            # a checkmark for the beginning of this series of steps
+        if current_loc[1] - io[1] > 0: #we are at the right side of the I/O
+            steps.extend(self.rows_steps(current_loc,current_loc[0]+1)) #step up, first step
+            steps.extend(self.columns_steps((current_loc[0]+1,current_loc[1]),current_loc[1]-2)) #two steps left
+            steps.extend(self.rows_steps((current_loc[0]+1,current_loc[1]-2),current_loc[0])) #step down
+            steps.extend(self.columns_steps((current_loc[0],current_loc[1]-2),current_loc[1]-1))#step to the item
+        elif current_loc[1] - io[1] < 0: #we are on the left side of the I/O
+            steps.extend(self.rows_steps(current_loc,current_loc[0]+1)) #step up, first step
+            steps.extend(self.columns_steps((current_loc[0]+1,current_loc[1]),current_loc[1]+2)) #two steps right
+            steps.extend(self.rows_steps((current_loc[0]+1,current_loc[1]+2),current_loc[0])) #step down
+            steps.extend(self.columns_steps((current_loc[0],current_loc[1]+2),current_loc[1]+1))#step to the item
+        
+        if steps: # any steps were created?
+            final_loc = steps[-1][1] # the location of the robot at the end of the steps
+        else: # no steps were created
+            final_loc = current_loc
+            
+        return final_loc,steps
+    
+    ################################
+    # 2. Vertical movements
+    ################################
+    
+    def five_step_vertical(self,current_loc,side):
+        # assuming that the item is closer to the I/O in comparison to the robot
+        last_valid_loc = current_loc
+        steps = [CHECK]           # a checkmark for the beginning of this series of steps
+        
+        if current_loc[0] > 1:#we are above the I/O on the I/O column
+            if side == 1: # we are on the left side of the warehouse
+                steps.extend(self.columns_steps(current_loc,current_loc[1]-1)) #step aside,, first step
+                steps.extend(self.rows_steps((current_loc[0],current_loc[1]-1),current_loc[0]-2))#two steps down
+                steps.extend(self.columns_steps((current_loc[0]-2,current_loc[1]-1),current_loc[1]))#back to the right wall
+                steps.extend(self.rows_steps((current_loc[0]-2,current_loc[1]),current_loc[0]-1))#step to the item
+            
+            elif side == 2 or side == 3: # we are on the right side of the warehouse
+                steps.extend(self.columns_steps(current_loc,current_loc[1]+1))#step aside, first step
+                steps.extend(self.rows_steps((current_loc[0],current_loc[1]+1),current_loc[0]-2))#two steps down
+                steps.extend(self.columns_steps((current_loc[0]-2,current_loc[1]+1),current_loc[1]))#back to left wall
+                steps.extend(self.rows_steps((current_loc[0]-2,current_loc[1]),current_loc[0]-1))#step to the item
+                
+        if steps:
+            final_loc = steps[-1][1] # the location of the robot at the end of the steps
+        else: # no steps were created
+            final_loc = current_loc
+            
+        return final_loc,steps
+    
+    #########################################################################################################################
+    ############### FIVE STEP JOURNEY PLANNER
+    #########################################################################################################################
+    
+    def five_step(self,robot_id):
+        # By a given robot id, this function calculates the needed path towards the I/O point.
+        last_valid_loc = self.robot_positions[robot_id-1][0]
+        
+        steps = []
+        
+        # Determine the information about the item
+        currently_taking = self.robot_at(last_valid_loc).currently_taking
+        side = self.side_at(self.find_item_location(currently_taking))
+        
+        ## Let's check if we are already at row 0 and column 7:
+        station = self.station_of(robot_id) # the I/O point of the item
+        io = station[1] # the I/O column
+        if last_valid_loc == station: # are we in the IO?
+            loc = self.around_IO(station) # find if there are items around the IO that can be exited
+            if loc: # Is there an item to exit around the IO point?
+                # Apply the relevant step towards the item.
+                if loc == (0,io-1): # one step left
+                    steps.extend(self.columns_steps(station,io-1))
+                elif loc == (0,io+1): # one step right
+                    steps.extend(self.columns_steps(station,io+1))
+                elif loc == (1,io): # one step down
+                    steps.extend(self.rows_steps((1,io),0))
+                self.robot_at(last_valid_loc).path = RobotPath(steps)
+
+                # Maybe the item is allocated to another robot - let's reset the other robot plans.
+                item = self.item_at(loc)
+                self.robot_at(last_valid_loc).currently_taking = item
+                if self.items_to_exit[item] not in (False, robot_id): # another robot takes the item
+                    other_robot = self.items_to_exit[item]      # retrieve the robot_id who should have taken the item
+                    other_robot_loc = self.robot_positions[other_robot-1][0]
+                    self.assign_item(item,robot_id)
+                    if not self.new_route(other_robot):         # redefine the route of the other robot
+                        self.final(other_robot)                 # no items left for it - it leaves the item
+                else: # no robot takes the item
+                    self.assign_item(item,robot_id)
+                
+                    
+                return False
+
+        #### Possible cases:
+        if last_valid_loc[1] == io: # case 1: the robot is in the same column as the I/O
+            # Here we do vertical five steps until we reach the I/O point.
+            item_above = self.item_at((last_valid_loc[0]+1,last_valid_loc[1])) if last_valid_loc[0] < self.last_row else None
+            item_below = self.item_at((last_valid_loc[0]-1,last_valid_loc[1]))
+            if item_above != currently_taking and item_below != currently_taking:
+                self.reroute(robot_id)
+                return False
+            
+            
+            # At first, apply only one step towards the item, if the item is above the robot
+            if item_above == currently_taking:
+                steps.append(CHECK)
+                side = self.side_at((last_valid_loc[0]+1,last_valid_loc[1]))
+                steps.extend(self.rows_steps(last_valid_loc,last_valid_loc[0]+1))
+                last_valid_loc = steps[-1][1] # update last valid location
+            else: # item below
+                side = self.side_at((last_valid_loc[0]-1,last_valid_loc[1]))
+            
+            # all is set; now start the needed vertical five steps.
+        
+            while int(last_valid_loc[0])>1: # until the robot is only 1 row above the I/O
+                last_valid_loc, current_steps = self.five_step_vertical(last_valid_loc, side) # movements according to the item's side!
+                steps.extend(current_steps)
+                
+        
+        elif last_valid_loc[0]<=1: # case 2: the robot is in row 1 or 0 (one row above the IO)
+            item_left = self.item_at((last_valid_loc[0],last_valid_loc[1]-1))
+            item_right = self.item_at((last_valid_loc[0],last_valid_loc[1]+1))
+            currently_taking = self.robot_at(last_valid_loc).currently_taking
+
+            if last_valid_loc[1]>io and item_right == currently_taking: # one step right is needed towards the item
+                steps.extend(self.columns_steps(last_valid_loc,last_valid_loc[1]+1))
+                last_valid_loc = steps[-1][1] # update last valid location
+
+            elif last_valid_loc[1]<io and item_left == currently_taking: # one step left is needed towards the item
+                steps.extend(self.columns_steps(last_valid_loc,last_valid_loc[1]-1))
+                last_valid_loc = steps[-1][1] # update last valid location
+
+
+
+            elif item_left != currently_taking and item_right != currently_taking: # there is a problem, the robot missed the item.
+                self.reroute(robot_id)
+                return False
+                    
+            # all is set; start the horizontal five steps.
+            while last_valid_loc[1]<io-1 or last_valid_loc[1]>io+1: # until the robot is only 1 row above the I/O
+                new_loc, current_steps = self.five_step_horizontal(last_valid_loc, station) # movements according to the item's side!
+                last_valid_loc = new_loc
+                steps.extend(current_steps)
+            
+            #now, at the end, we need one vertical five-step to (0,7) if the robot is two rows above the I/O
+            if last_valid_loc == (2,io):
+                side = self.side_at((2,io))
+                steps.extend(self.rows_steps(last_valid_loc,last_valid_loc[0]+1)) # one step above
+                last_valid_loc, current_steps = self.five_step_vertical(last_valid_loc, side) # movements according to the item's side!
+                steps.extend(current_steps)
+        
+        # define the planned steps
+        self.define_robot_path(robot_id,steps)
+        
+    
+    #########################################################################################################################
+    ############### TO THE NEXT ITEM JOURNEY PLANNER
+    #########################################################################################################################
+    
+    def to_next_item(self,robot_id,item_number):
+        # If the robot has turned over the item to the I/O point & is in the location: (1,7) (0,6) or (0,8),
+        # plan his next steps to the next item.
+        item_location = self.find_item_location(item_number) # retrieve the item that the robot is going to take
+        robot_loc = self.robot_positions[robot_id-1][0]      # retrieve current robot's position
+        side = 1 if item_location[1] <= self.nearest_station(item_location)[1] else 2    # determine the item's side
+        
+        if self.planner and self.exact_journey_to_item(robot_id, item_number): # the exact plan replaces the journey
+            self.robot_at(robot_loc).robot_will_take(item_number)
+            self.assign_item(item_number,robot_id)
+            return
+        
+        steps = []
+        if self.item_at(robot_loc) != 0:        # if the robot is not with the escort,
+            escort_loc = self.return_to_escort(robot_loc,robot_id) # find the escort
+            steps.extend([(robot_loc,escort_loc,False)])           # and save the needed step towards it
+            old_robot_loc = robot_loc
+            robot_loc = escort_loc
+        else:
+            old_robot_loc = robot_loc
+            
+
+        if robot_loc[0]>0: # Going back from the escort
+            steps.extend(self.rows_steps(robot_loc,0)) #robot goes to row 0 so it can start his journey to the next item
+        
+        row_below_item = 0 if item_location[0] == 0 else item_location[0]-1 # the target is one row below the item
+        
+        p = 1 if self.robot_side[robot_id]==1 else -1                       # determine the robot side
+        
+        if item_location[1] == 0 or item_location[1] == self.last_column:
+            item_location = (item_location[0],item_location[1]+p)
+        
+        if side == 1: # next item is at the left side of the warehouse
+            steps.extend(self.columns_steps((0,robot_loc[1]),0))              # go to the left wall of the warehouse: (0,0)
+            steps.extend(self.rows_steps((0,0),row_below_item))                    # go to one row below the item (if possible)
+            steps.extend(self.columns_steps((row_below_item,0),item_location[1]))  # go to the item's column
+            
+        else: # next item is at the right side of the warehouse
+            right_wall = self.last_column
+            steps.extend(self.columns_steps((0,robot_loc[1]),right_wall))          # go to the right wall of the warehouse
+            steps.extend(self.rows_steps((0,right_wall),row_below_item))           # go to one row below the item (if possible)
+            steps.extend(self.columns_steps((row_below_item,right_wall),item_location[1])) # go to the item's column
+        
+        # Save the information about the robot
+        self.robot_at(old_robot_loc).item_to_take = item_number
+        self.robot_at(old_robot_loc).currently_taking = None
+        self.assign_item(item_number,robot_id) # now this robot is assigned to this item
+        self.define_robot_path(robot_id,steps)     # define the needed steps
+    
+    #########################################################################################################################
+    ############### PUT-AWAY JOURNEY PLANNER
+    #########################################################################################################################
+    
+    def shortest_route(self, start, target, blocked):
+        # The cells from start to target (both included) on a shortest route that avoids the blocked cells.
+        # None if there isn't any route.
+        previous = {start: None} # cell: the cell before it on the route
+        queue = deque([start])
+        while queue and target not in previous:
+            loc = queue.popleft()
+            for next_loc in ((loc[0]+1,loc[1]),(loc[0]-1,loc[1]),(loc[0],loc[1]+1),(loc[0],loc[1]-1)):
+                if 0 <= next_loc[0] <= self.last_row and 0 <= next_loc[1] <= self.last_column and \
+                   next_loc not in previous and next_loc not in blocked:
+                    previous[next_loc] = loc
+                    queue.append(next_loc)
+        if target not in previous:
+            return None
+        route = [target]
+        while previous[route[-1]] is not None:
+            route.append(previous[route[-1]])
+        route.reverse()
+        return route
+    
+    def escort_route(self, start, target, blocked):
+        # The steps that move the robot's escort from start to target on a shortest route that avoids the blocked cells,
+        # as straight rows/columns steps. None if there isn't any route.
+        if start == target:
+            return []
+        route = self.shortest_route(start, target, blocked)
+        if route is None:
+            return None
+        
+        steps = []
+        corner = start # the beginning of the current straight part of the route
+        for k in range(1, len(route)):
+            if k == len(route)-1 or (route[k+1][0] != corner[0] and route[k+1][1] != corner[1]): # the route turns here
+                if route[k][1] == corner[1]:
+                    steps.extend(self.rows_steps(corner, route[k][0]))
+                else:
+                    steps.extend(self.columns_steps(corner, route[k][1]))
+                corner = route[k]
+        return steps
+    
+    def carry_journey(self, robot_id):
+        # Plan the carry of the robot's item (inbound or re-slotted) to its slot. The item moves one cell at a time, on a
+        # shortest route around the escorts of the other robots (the robots that have stopped on their final locations
+        # stay there): the escort goes around the item to its next cell, and the robot pulls the item into the escort
+        # (like the three and five steps, away from the I/O). The plan stops where the escort can't get around the item -
+        # the carry is planned again once the robot gets there. If nothing can be planned, the robot waits.
+        robot_loc = self.robot_positions[robot_id-1][0]
+        item_number = self.robot_at(robot_loc).putting_away
+        item_loc = self.find_item_location(item_number)
+        slot = self.carry_slot(item_number)
+        others = set(loc for other, loc in self.escort_locations.items() if other != robot_id) # escorts of other robots
+        
+        steps = []
+        escort_loc = self.return_to_escort(robot_loc,robot_id) # FALSE if the robot is with the escort
+        if escort_loc:
+            steps.append((robot_loc,escort_loc,False))
+        else:
+            escort_loc = robot_loc
+        
+        for next_loc in (self.shortest_route(item_loc, slot, others) or [item_loc])[1:]: # the next cells of the item
+            route = self.escort_route(escort_loc, next_loc, others | {item_loc})
+            if route is None: # the way is blocked
+                break
+            steps.extend(route)
+            axis = 0 if next_loc[1] == item_loc[1] else 1
+            steps.extend(self.escort_steps(next_loc, item_loc[axis], axis)) # the robot pulls the item into the escort
+            escort_loc, item_loc = item_loc, next_loc
+        
+        if not steps: # wait a time unit, and plan again
+            steps = [(robot_loc,robot_loc,False)]
+        self.define_robot_path(robot_id,steps)
+    
+    #########################################################################################################################
+    ############### APPLYING ROBOT STEPS
+    #########################################################################################################################
+    
+    ######################################
+    # 1. New route - to a different item
+    ######################################
+
+    def new_route(self, robot_id):
+        # in case we want to set a new route for a specific robot towards a *different* item than what it takes now
+        if self.robots[robot_id].putting_away: # a robot that stores an item plans its carry again, around the escort
+            self.carry_journey(robot_id)
+            return True
+        if self.items_to_exit: # are there still items to exit?
+            next_item = self.dispatcher.other_item(self, robot_id) # choose another item
+            # another robot has taken it, or it has exited, in this time unit (the queues aren't updated yet) - the robot
+            # would be left with an item that isn't its own. It chooses again from the updated queues.
+            if next_item is not None and self.items_to_exit.get(next_item, True):
+                self.calculate_distance_from_IO()
+                next_item = self.dispatcher.other_item(self, robot_id)
+            if next_item is None:
+                return False # no items left
+
+            robot_loc = self.robot_positions[robot_id-1][0]
+            self.record_event(robot_id, 'new_route', from_loc=robot_loc, item=next_item)
+
+            # reset the information for the items to exit dictionary; the robot is going to take another item.
+            previous = self.robot_at(robot_loc).item_to_take or self.robot_at(robot_loc).currently_taking
+            if previous and self.items_to_exit.get(previous) in (robot_id, False): # (unless another robot has taken it)
+                self.assign_item(previous,False)
+            # the previous item is left - a robot right next to the new item starts it (three step), not the previous one
+            self.robot_at(robot_loc).item_to_take = None
+            self.robot_at(robot_loc).currently_taking = None
+            
+            self.manhattan_journey_to_item(robot_id,next_item) # calculate the journey to the item
+            # if the robot is exactly in the place to start 3 or 5 steps:
+            if self.robot_at(robot_loc).path.at_check():
+                # the robot doesn't need to go to the item; so it can start directly to take it to the IO
+                self.robot_at(robot_loc).item_to_take = None
+                self.robot_at(robot_loc).currently_taking = next_item 
+            else: # the robot will attend the item
+                self.robot_at(robot_loc).item_to_take = next_item
+                self.robot_at(robot_loc).currently_taking = None
+            self.assign_item(next_item,robot_id)
+            return True
+        
+        return False # no items left
+    
+    ######################################
+    # 2. Escort in target check
+    ######################################
+
+    def escort_in_target(self, location, robot_id):
+        # find if there is an escort in the robot's target location.
+        if self.item_at(location) == 0 and self.escort_at(location) != robot_id: # Escort is indeed in target
+            new_route = self.new_route(robot_id) # define a new route for the robot
+            if new_route:
+                return new_route # it's TRUE if we successfully planned the steps for the robot.
+            else:
+                return True
+        else:
+            return False
+
+    ################################################
+    # 3. Apply robot steps - plans vs. actual state
+    ################################################
+
+    def wait_for_location(self, robot_id, location):
+        # With a reservation table: plan the robot to wait until the location is released by the robot or escort
+        # that takes it (the robot doesn't move in this time unit either).
+        # FALSE if there is no reservation table, or if the location isn't released in its horizon.
+        if not self.reservations:
+            return False
+        robot_loc = self.robot_positions[robot_id-1][0]
+        wait = self.reservations.waiting_time(robot_loc, location, robot_id)
+        if wait is None:
+            return False
+        for i in range(wait):
+            self.define_robot_path(robot_id,(robot_loc, robot_loc, False),overwrite=False)
+        self.record_event(robot_id, 'yield', robot_loc, location)
+        return True
+    
+    def record_move(self, robot_id, from_loc, to_loc, with_item=False, moved=True):
+        # save a move in the robot's history: (with_item, from, to) for a real move, (from, to, False) otherwise,
+        # and in the trajectory records
+        if from_loc != to_loc and moved:
+            self.robots_moves[robot_id].append((with_item, from_loc, to_loc))
+        else:
+            self.robots_moves[robot_id].append((from_loc, to_loc, False))
+        if self.energy:
+            self.energy.spend(robot_id, self.robots_moves[robot_id][-1])
+        self.trajectory.append(self.time, robot_id, from_loc, to_loc, with_item, moved and from_loc != to_loc)
+
+    def apply_robot_step(self, robot_id, fictitious=False):
+        # apply the given step to a robot_id 
+        robot_loc = self.robot_positions[robot_id-1][0]
+
+        if fictitious: # if the applied step is fictitious
+            self.record_move(robot_id, robot_loc, robot_loc) # add a fictitious move
+            if self.tracing:
+                self.record_event(robot_id, 'wait', robot_loc, robot_loc)
+
+        else: 
+            if self.robot_at(robot_loc).path.at_check(): # if it's part of a 3 or 5 steps
+                if not self.location_check(robot_id):
+                    return False # stop here if the robot isn't located in the right place for 3/5 steps
+                else:
+                    self.robot_at(robot_loc).path.pop_front() # delete the CHECK so we can receive the planned step
+                    
+            current_loc, to_loc, with_item = self.robot_at(robot_loc).path.peek()
+        
+            current_cell, to_cell = self.cell(current_loc), self.cell(to_loc)
+            
+            if current_loc == to_loc: # in case origin location equals to destination location
+                self.record_move(robot_id, current_loc, current_loc) # apply fictitious move
+                if self.tracing:
+                    self.record_event(robot_id, 'wait', current_loc, current_loc)
+                
+            elif self.robot_at(to_loc) != '': # is there a robot in the destination?
+                # Apply escape
+                self.escape(robot_id,to_loc)
+                
+                ######!!!!!!!!!!!#########
+                new_loc,next_new_loc,with_item = self.robot_at(current_loc).path.peek()
+                ######!!!!!!!!!!!#########
+                
+                self.record_move(robot_id, new_loc, next_new_loc, moved=False) # the escape step is applied next time
+                return False
+                
+            elif self.escort_in_target(to_loc, robot_id): # is there an escort of another robot in target?
+                # then we freeze at the location for 3 time units.
+                for i in range(2):
+                    self.define_robot_path(robot_id,(current_loc, current_loc, False),overwrite=False)
+                self.record_move(robot_id, current_loc, current_loc) # add a fictitious move
+                if self.tracing:
+                    self.record_event(robot_id, 'wait', current_loc, current_loc)
+                return False
+                
+            else: # the destination is free from robot/escort
+                to_cell.assignRobot(current_cell.robot)                             # assign the robot to the destination cell
+                current_cell.assignRobot('')                                        # empty the current cell from the robot
+                self.record_move(robot_id, current_loc, to_loc, with_item)
+                if with_item: # robot is moving to the new location with the item
+                    if self.item_at(to_loc) == 0: # if the destination is the escort of this current robot,
+                        escort = to_cell.item                                       # save the escort
+                        to_cell.assignItem(current_cell.item)                       # assign the item to the destination cell
+                        current_cell.assignItem(escort)                             # now the current cell has an escort
+                if self.tracing:
+                    self.record_event(robot_id, 'step', current_loc, to_loc,
+                                      self.item_at(to_loc) if with_item else None)
+                
+            self.robot_at(to_loc).path.pop_front() # delete the planned step for the robot that it is
+                                                          # not at to_loc, so we can move to the next one.
+            
+            
+    
+    #########################################################################################################################
+    ############### MAIN PROGRAM FUNCTIONS
+    #########################################################################################################################
+
+    ################################################
+    # 1. Running first time
+    ################################################
+
+    def running_first_time(self):
+        # We use this function only at the beginning of the program.
+        for robot_id in self.robots:                    # for each robot,
+            item = self.dispatcher.first_item(self, robot_id) # choose its first item
+            if item is None:                            # no items to exit for this robot
+                self.final(robot_id)
+                continue
+
+            self.manhattan_journey_to_item(robot_id,item)
+            robot = self.robots[robot_id]
+            if robot.path and robot.path.at_check(): # the item is right next to the robot - it starts taking it
+                robot.robot_is_taking(item)
+            self.assign_item(item,robot_id)
+        self.calculate_distance_from_IO() # the assigned items are out of the queues before the first time unit
+    
+    ################################################
+    # 2. Can the robot proceed function
+    ################################################
+
+    def can_proceed(self, robot_id):
+        # Can the robot, that is taking an item, enter the restricted zone around the I/O?
+        # Only the loaded robot with the minimum item distance towards the I/O in the area of 6X7 around it can proceed.
+        return self.zones[self.station_of(robot_id)].request(self, robot_id)
+            
+    ################################################
+    # 3. Escape function - Collision handling
+    ################################################
+    
+    def escape(self, robot_id, other_robot_next_loc):
+        # Calculate an escape route to a robot, in accordance to the other robot next location,
+        # in order to avoid collision between robots.
+        robot_loc = self.robot_positions[robot_id-1][0]
+        if robot_id == self.robot_at(other_robot_next_loc).id: # if it's somehow the same robot, like in a fictitious step,
+            return False # then abort.
+        
+        # define direction
+        if robot_loc[0] == 0 or robot_loc[1] == 0:
+            direction = 1
+        elif robot_loc[0] == self.last_row or robot_loc[1] == self.last_column:
+            direction = -1
+        else:
+            direction = self.rng.choice([1,-1])
+
+        steps = []
+        
+        if robot_loc[1] - other_robot_next_loc[1] == 0: # on the same column, so move to another column
+            if not 0 <= robot_loc[1]+direction <= self.last_column: # (not out of the warehouse)
+                direction = -direction
+            temporary_location = (robot_loc[0],robot_loc[1]+direction)
+            steps.extend(self.columns_steps(robot_loc,robot_loc[1]+direction)) # move one column
+            steps.extend([(temporary_location, temporary_location, False) for i in range(3)]) # freeze for 3 time units
+            steps.extend(self.columns_steps(temporary_location,robot_loc[1])) # return to column
+        elif robot_loc[0] - other_robot_next_loc[0] == 0: # on the same row, so move by rows
+            if not 0 <= robot_loc[0]+direction <= self.last_row: # (not out of the warehouse)
+                direction = -direction
+            temporary_location = (robot_loc[0]+direction,robot_loc[1])
+            steps.extend(self.rows_steps(robot_loc,robot_loc[0]+direction))
+            steps.extend([(temporary_location, temporary_location, False) for i in range(3)]) # freeze for 3 time units
+            steps.extend(self.rows_steps(temporary_location, robot_loc[0]))
+        
+        
+        for step in reversed(steps): # define robot path inserts the steps like a stack
+            self.define_robot_path(robot_id,step,overwrite=False)
+        
+        self.record_event(robot_id, 'escape', robot_loc, other_robot_next_loc)
+        return True
+    
+    ################################################
+    # 4. Escape function - Collision handling
+    ################################################
+
+    def reroute(self,robot_id):
+        # when needed, this function will reset the robot's planned steps,
+        # and will figure out the relevant route back to it.
+        robot_loc = self.robot_positions[robot_id-1][0]
+        currently_taking = self.robot_at(robot_loc).currently_taking
+        item_to_take = self.robot_at(robot_loc).item_to_take
+        self.record_event(robot_id, 'reroute', from_loc=robot_loc, item=currently_taking or item_to_take)
+        
+        if currently_taking: # is it an item that the robot is currently taking?
+            self.manhattan_journey_to_item(robot_id,currently_taking)
+            self.robot_at(robot_loc).currently_taking = None
+            self.robot_at(robot_loc).item_to_take = currently_taking
+        else: # is it a robot that is going to take the item?
+            self.manhattan_journey_to_item(robot_id,item_to_take)
+    
+    ################################################
+    # 5. Location check - Items around the robot
+    ################################################
+
+    def location_check(self,robot_id):
+        # check if the robot is near the item for 3 step or 5 step
+        location = self.robot_positions[robot_id-1][0]
+        above = self.last_row if location[0] == self.last_row else location[0]+1
+        below = 0 if location[0] == 0 else location[0]-1
+        left = 0 if location[1] == 0 else location[1]-1
+        right = self.last_column if location[1] == self.last_column else location[1]+1
+        
+        item_location = self.find_item_location(self.robot_at(location).currently_taking)
+        
+        if item_location[0] in [above,below] or item_location[1] in [left,right]:
+            return True
+        else:
+            self.reroute(robot_id)
+            return False
+        
+    ################################################
+    # 6. Escort search around the robot
+    ################################################
+
+    def return_to_escort(self, location, robot_id):
+        above = (self.last_row,location[1]) if location[0] == self.last_row else (location[0]+1,location[1])
+        below = (0,location[1]) if location[0] == 0 else (location[0]-1,location[1])
+        left = (location[0],0) if location[1] == 0 else (location[0],location[1]-1)
+        right = (location[0],self.last_column) if location[1] == self.last_column else (location[0],location[1]+1)
+        
+        escort_loc = self.escort_locations[robot_id] # where is the escort that belongs to this robot?
+        if escort_loc in [above,below,left,right]:
+            return escort_loc
+        
+        return False # the escort is with the robot
+        
+    ################################################
+    # 7. Robot search around the robot
+    ################################################
+
+    def around_robot(self, robot_id):
+        location = self.robot_positions[robot_id-1][0]
+        above = (self.last_row,location[1]) if location[0] == self.last_row else (location[0]+1,location[1])
+        below = (0,location[1]) if location[0] == 0 else (location[0]-1,location[1])
+        left = (location[0],0) if location[1] == 0 else (location[0],location[1]-1)
+        right = (location[0],self.last_column) if location[1] == self.last_column else (location[0],location[1]+1)
+        
+        robots_around = []
+        
+        for loc in [above,below,left,right]:
+            if self.robot_at(loc) != '': # robot around the IO?
+                return loc # return the location of the robot
+        
+        return False
+
+    ################################################
+    # 8. Items to exit around the IO
+    ################################################
+
+    def around_IO(self, station=None):
+        # this function checks if there is an item to exit around the IO (or around the given station)
+        
+        io = (self.io if station is None else station)[1]
+        for loc in [(0,io-1),(0,io+1),(1,io)]:
+            if loc in self.items_to_exit_positions:
+                return loc
+        
+        return False
+
+    ################################################
+    # 9. Final route calculation for a robot that has finished its tasks
+    ################################################
+    
+    def final(self,robot_id):
+        
+        robot_loc = self.robot_positions[robot_id-1][0]
+        self.robot_at(robot_loc).currently_taking = None
+        self.robot_at(robot_loc).item_to_take = None
+
+        if self.item_at(robot_loc) != 0: # let's make sure the robot is with the escort
+            escort_loc = self.return_to_escort(robot_loc,robot_id)
+            step = (robot_loc,escort_loc,False)
+            old_robot_loc = robot_loc
+            robot_loc = escort_loc
+        else:
+            old_robot_loc = robot_loc
+
+        
+        charger = self.energy.charger(self, robot_id, old_robot_loc) if self.energy and self.energy.capacity else None
+        if charger: # the robot rests - and charges - on the nearest free charging cell
+            loc = charger
+            self.robots[robot_id].path = None
+            if old_robot_loc != loc:
+                self.manhattan_journey_to_item(robot_id,self.item_at(loc),final=True,final_loc=robot_loc)
+            path = self.robots[robot_id].path
+            end = path.steps[-1][1] if path else old_robot_loc # where the journey ends - next to the charging cell
+            steps = list(path) if path else []
+            steps.append((end,loc,False) if abs(end[0]-loc[0])+abs(end[1]-loc[1]) == 1 else (end,end,False))
+            self.define_robot_path(robot_id,steps)
+        elif self.robot_side[robot_id] == 1:  # the robot is allocated to the left side of the warehouse
+            loc = self.robot_final_positions_left[0]
+            item = self.item_at(loc)
+            self.manhattan_journey_to_item(robot_id,item,final=True,final_loc=robot_loc) # route to the location where the robot will rest
+            # allow the next planned location for the robot to rest (this one is used again after all the others)
+            self.robot_final_positions_left.append(self.robot_final_positions_left.pop(0))
+        else:                               # the robot is allocated to the right side of the warehouse
+            loc = self.robot_final_positions_right[0]
+            item = self.item_at(loc)
+            self.manhattan_journey_to_item(robot_id,item,final=True,final_loc=robot_loc) # route to the location where the robot will rest
+            # allow the next planned location for the robot to rest (this one is used again after all the others)
+            self.robot_final_positions_right.append(self.robot_final_positions_right.pop(0))
+        
+        self.record_event(robot_id, 'final', robot_loc, loc)
+        return True
+        
+
+#########################################################################################################################
+############### THE MAIN PROGRAM
+#########################################################################################################################
+
+def main_program(wh, max_time=None, checkpoints=None, checkpoint_every=100, verbose=True):
+    # Run the warehouse until all items are exited, or until max_time time units have passed (if given).
+    # A restored warehouse (see restore_warehouse) continues from its next time unit.
+    # checkpoints is an optional dictionary that receives a snapshot every checkpoint_every time units (time: snapshot).
+    # verbose=False doesn't print the result of the run.
+    # A warehouse with an order stream runs until all its orders are closed (or until max_time).
+    time = wh.time+1
+    beginning = wh.time == 0
+    # as long as we have items to exit (or orders to wait for)
+    while (wh.items_to_exit or (wh.orders and wh.orders.is_open())) and (max_time is None or time <= max_time):
+        wh.time = time
+        if wh.profiler and not beginning: # the first pass only plans the routes - it doesn't advance the time
+            wh.profiler.tick_start(wh)
+        if wh.orders: # the orders that have arrived
+            wh.take_orders()
+        
+        #### RUNNING FIRST TIME ####
+        if beginning: # initiating the program
+            wh.running_first_time()
+            beginning=False
+            
+        else:         # let's get the warehouse to work
+            
+            steps_to_apply = {robot_id: False for robot_id in wh.robots}
+            
+            ##############################################################
+            ################## Check if an item to exit is in the I/O
+            ##############################################################
+            for station in wh.stations:
+                if wh.item_at(station) in wh.items_to_exit: # An item to exit is in the I/O?
+                    robot_id = wh.items_to_exit[wh.item_at(station)] # retrieve the robot id
+                    robot_loc = wh.robot_positions[robot_id-1][0]                     # retrieve the robot location
+                    wh.exit_item(robot_id,time,station)                               # Exit the item
+                    if robot_id and wh.item_at(station) in wh.waiting_putaways(): # an inbound item has entered instead
+                        wh.put_away(robot_id, wh.item_at(station)) # the robot stores it on its way back
+                        steps_to_apply[robot_id] = True
+                    elif robot_id and (wh.items_to_exit or wh.orders): # there are still items to exit (or there may be)
+                        next_item = wh.dispatcher.next_item(wh, robot_id) # the chosen item
+                        if next_item is not None:
+                            wh.to_next_item(robot_id,next_item)  # calculate the path to this item
+                            wh.robot_at(robot_loc).item_to_take = next_item
+                            wh.robot_at(robot_loc).currently_taking = None
+                            wh.assign_item(next_item,robot_id)
+                            steps_to_apply[robot_id] = True
+                        else:
+                            steps_to_apply[robot_id] = wh.final(robot_id)
+            
+            # the robots that have finished their items take the new orders (or re-slot, or come back from charging)
+            if wh.orders or wh.reslotter or (wh.energy and wh.energy.capacity):
+                wh.dispatch_idle()
+
+            if wh.reservations: # reserve the planned paths of this time unit
+                wh.reservations.update(wh)
+            for zone in wh.zones.values():
+                zone.tick(wh)
+            
+            ##############################################################
+            ################## Going over each robot in this time unit
+            ##############################################################
+            for robot_id in wh.robots: # let's go over each robot
+                
+                robot_loc = wh.robot_positions[robot_id-1][0]
+                if wh.energy and wh.energy.is_stalled(robot_id): # the battery is empty - the robot can't move
+                    continue
+                
+                if wh.robot_at(robot_loc).path: # the robot has some steps to do?
+                    if wh.robot_at(robot_loc).path.at_check(): # is it a 3-step or a 5-step?
+                        if wh.location_check(robot_id): # TRUE if the location is correct
+                            wh.robot_at(robot_loc).path.pop_front()
+                        else:
+                            if wh.tracing:
+                                wh.record_event(robot_id, 'check_failed', robot_loc)
+                            continue # continue to the next robot if the robot isn't located in the right place for 3/5 steps
+                            
+                    step = wh.robot_at(robot_loc).path.peek() # retrieve the planned step of this robot
+                    next_loc = step[1] # retrieve its next location
+                    
+                    if robot_loc == next_loc: # if the robot's location equal to the next location
+                        # planned fictitious move
+                        steps_to_apply[robot_id] = True
+                        
+                    elif wh.robot_at(next_loc) != '': # is there a robot in target?
+                        # rescue from collision
+                        if wh.wait_for_location(robot_id, next_loc): # that robot is leaving - wait for it
+                            pass
+                        elif wh.robot_at(next_loc).path: # the robot in destination has steps to do?
+                            other_robot_next_loc = wh.robot_at(next_loc).path.next_location()
+                            if next_loc == other_robot_next_loc: # the target of that robot is the same as this robot?
+                                wh.escape(robot_id,other_robot_next_loc) # apply escape
+                                steps_to_apply[robot_id] = True
+                            else:
+                                # just freeze for 3 time units
+                                for i in range(3):
+                                    wh.define_robot_path(robot_id,(robot_loc, robot_loc, False),overwrite=False)
+                        elif wh.robots[robot_id].putting_away: # that robot has stopped (e.g. on its final location)
+                            wh.carry_journey(robot_id) # carry the item around it
+                     
+                    elif wh.reservations and wh.item_at(next_loc) == 0 and wh.escort_at(next_loc) != robot_id and \
+                         wh.wait_for_location(robot_id, next_loc):
+                        pass # someone else's escort is leaving - wait for it
+                        
+                    else: # maybe there is an escort in target?
+                        if wh.escort_in_target(next_loc, robot_id): # is there an escort in target?
+                            belongs_to = wh.escort_at(next_loc) # find out the robot id that the escort belongs to
+                        
+                            if robot_id == belongs_to: # the escort belongs to the robot, safely proceed
+                                steps_to_apply[robot_id] = True
+
+                            else: # this is someone else's escort!
+                                if not wh.robot_at(next_loc) == '': # we make sure that in the next location there isn't a robot
+                                    other_robot_next_loc = wh.robot_at(next_loc).path.next_location()
+                                    wh.escape(robot_id,other_robot_next_loc) # apply escape
+                                steps_to_apply[robot_id] = True
+                                
+                        else: # in case there is neither robot nor escort is in target
+                            currently_taking = wh.robot_at(robot_loc).currently_taking
+                            if currently_taking and wh.config.in_restricted_zone(next_loc, wh.station_of(robot_id)): # are we in the restricted zone?
+                                # entering the 'restricted zone'
+                                if wh.can_proceed(robot_id):
+                                    steps_to_apply[robot_id] = True # robot can proceed
+                                else: # robot cannot proceed
+                                    loc = wh.around_robot(robot_id)
+                                    if loc: # if there is another robot, escape!!!
+                                        if wh.item_at(loc) == 0: # we make sure we do the escape when the robot is with the escort
+                                            if wh.robot_at(robot_loc).currently_taking: # rerouting the robot to the item
+                                                item = wh.robot_at(robot_loc).currently_taking
+                                                wh.robot_at(robot_loc).currently_taking = None
+                                                wh.robot_at(robot_loc).item_to_take = item
+                                            else:
+                                                item = wh.robot_at(robot_loc).item_to_take
+                                            
+                                            if wh.manhattan_journey_to_item(robot_id,item): # maybe manhattan journey is not needed?
+                                                if wh.robot_at(robot_loc).item_to_take: # the robot is in item to take mode?
+                                                    wh.robot_at(robot_loc).currently_taking = wh.robot_at(robot_loc).item_to_take
+                                                    wh.robot_at(robot_loc).item_to_take = None
+                                            
+                                            to_loc = wh.robot_at(robot_loc).path.next_location()
+                                            if to_loc: # the robot isn't waiting at a CHECK
+                                                if wh.robot_at(to_loc) != '': # is there a robot in the new next planned location?
+                                                    wh.escape(robot_id,loc)
+                                        
+                            else:
+                                steps_to_apply[robot_id] = True
+                                
+                    
+               
+                else: # the robot doesn't have some steps to do?
+                            
+                    
+                    if wh.robot_at(robot_loc).item_to_take: # the robot finished the manhattan trip
+                        # now we are at three step
+                        if not wh.three_step(robot_id): # if we have failed to plan three-step movements
+                            steps_to_apply[robot_id] = True
+                            continue # The needed steps before three step are planned; continue to the next robot
+
+                        item_number = wh.robot_at(robot_loc).item_to_take
+                        wh.robot_at(robot_loc).robot_is_taking(item_number) # now the robot is currently taking the item
+                        steps_to_apply[robot_id] = True
+
+                    elif wh.robot_at(robot_loc).currently_taking: # check if the item's attended the IO
+                        # now we are at five step
+                        wh.five_step(robot_id)
+                        # apply the steps now
+                        steps_to_apply[robot_id] = True
+                    
+                    elif wh.robot_at(robot_loc).putting_away: # the robot has carried its item (inbound or re-slotted)
+                        steps_to_apply[robot_id] = wh.carry_on(robot_id) # store it, or carry it again
+                        
+
+            for robot_id in steps_to_apply:
+                if steps_to_apply[robot_id]: # apply the step here 
+                    wh.apply_robot_step(robot_id)
+                else: # apply fictitious step here
+                    wh.apply_robot_step(robot_id,fictitious=True)
+            
+            
+            ## Update positions
+            wh.calculate_positions()
+            wh.calculate_distance_from_IO()
+            
+            if checkpoints is not None and time % checkpoint_every == 0:
+                checkpoints[time] = wh.snapshot()
+            
+            if wh.profiler:
+                wh.profiler.tick_end(wh)
+            
+            ## To the next time unit
+            time += 1
+            
+    
+    wh.time_units = time # the time units that the program has run
+    if wh.events:
+        wh.events.flush()
+    if verbose:
+        if wh.items_to_exit:
+            print ("Stopped after %s time units, %s items remaining."%(time,len(wh.items_to_exit)))
+        else:
+            print ("It took %s time units to exit all items."%(time))
+    return wh
+
+
+#########################################################################################################################
+############### CHECKPOINTS
+#########################################################################################################################
+
+def restore_warehouse(snapshot, events=None, profiler=None, arrivals=None):
+    # A new warehouse in the state of the snapshot (see Warehouse.snapshot), that main_program continues from the next
+    # time unit. Restoring the snapshot of a run on the global random generator sets the global random state.
+    # The arrivals of an order stream aren't a part of the snapshot - the ones after its time unit are given again.
+    state = p.loads(zlib.decompress(snapshot))
+    if arrivals is not None and state.get('orders'):
+        state['orders'].arrivals = iter(arrivals)
+        state['orders'].upcoming = None
+        state['orders'].exhausted = False
+    if isinstance(state['rng'], tuple):
+        random.setstate(state['rng'][1])
+        state['rng'] = random
+    wh = Warehouse.__new__(Warehouse)
+    wh.__dict__.update(state)
+    wh.observe(events, profiler)
+    return wh
+
+def save_checkpoint(wh, filename):
+    # write the snapshot of the warehouse to a file
+    with open(filename,'wb') as outfile:
+        outfile.write(wh.snapshot())
+
+def load_checkpoint(filename, events=None, profiler=None, arrivals=None):
+    # restore the warehouse that was saved by save_checkpoint (see restore_warehouse for the arguments)
+    with open(filename,'rb') as infile:
+        return restore_warehouse(infile.read(), events, profiler, arrivals)
+
+
+#########################################################################################################################
+############### EXPORT TO PICKLE FILES
+#########################################################################################################################
+
+def run_and_export_to_pickle(wh, items='items_list.p', seed=None, max_time=None, events=None, trajectory=None,
+                             planner=None, config=None, dispatcher=None, reservations=None, checkpoint_every=None,
+                             profiler=None):
+    # Run the warehouse file with the items list file, and export the robot moves and the extractions to pickle files.
+    # seed=None uses the global random generator. events is an optional EventLog of the run.
+    # trajectory='npz' (compressed) or 'npy' (memory-mappable) also exports the moves as records (see Trajectory).
+    # planner is an optional RetrievalPlanner of the run, config an optional WarehouseConfig and dispatcher an optional
+    # dispatcher (SideDispatcher or MatchingDispatcher). reservations is an optional ReservationTable of the run.
+    # checkpoint_every also exports a snapshot of the run every this number of time units (see restore_warehouse).
+    # profiler is an optional Profiler of the run.
+    current = Warehouse(wh, items, config, None if seed is None else random.Random(seed), events, planner, dispatcher,
+                        reservations, profiler)
+    example_number = os.path.splitext(os.path.basename(wh))[0] # retrieves the "whX" name where X is the number of the warehouse set example
+    checkpoints = None if checkpoint_every is None else {}
+    current = main_program(current, max_time, checkpoints, checkpoint_every)
+    export_to_pickle(current, example_number, trajectory)
+    
+    if checkpoints is not None:
+        with open('checkpoints_%s.p'%(example_number),'wb') as infile:
+            p.dump(checkpoints,infile) # save as checkpoints_(wh).p - time: snapshot
+        print("\n\n %s checkpoints were exported to pickle successfully"%(len(checkpoints)))
+
+def resume_and_export_to_pickle(checkpoints_filename, at, max_time=None, events=None, trajectory=None):
+    # Continue a run from its checkpoint at the given time unit (from a checkpoints_(wh).p file),
+    # and export the robot moves and the extractions of the whole run to pickle files.
+    checkpoints = load_pickle(checkpoints_filename)
+    if at not in checkpoints:
+        raise ValueError("There is no checkpoint at %s, the checkpoints are at %s"%(at, sorted(checkpoints)))
+    example_number = os.path.splitext(os.path.basename(checkpoints_filename))[0].replace('checkpoints_','',1)
+    current = main_program(restore_warehouse(checkpoints[at], events), max_time)
+    export_to_pickle(current, example_number, trajectory)
+
+def export_to_pickle(current, example_number, trajectory=None):
+    # Export the robot moves and the extractions of the warehouse (after its run) to pickle files
+    
+    ## Robot moves
+    steps = []
+    for i in current.robots_moves:
+        steps.append(current.robots_moves[i])
+        
+    # write the pickle file
+    with open('robots_moves_%s.p'%(example_number),'wb') as infile:
+        p.dump(steps,infile) # save as robot_moves_(wh).p
+    
+    print("\n\n Robot moves were exported to pickle successfully")
+    
+    if trajectory:
+        current.trajectory.save('trajectory_%s.%s'%(example_number, trajectory)) # save as trajectory_(wh).npz/npy
+        print("\n\n Trajectory was exported to %s successfully"%(trajectory))
+    
+    ## Extractions
+    extractions = current.exited_items.items()
+    extractions = sorted(extractions, key=lambda x: x[1])
+    
+
+    # write the pickle file
+    with open('extractions_%s.p'%(example_number),'wb') as infile:
+        p.dump(extractions,infile) # save as extractions_(wh).p
+        
+    print("\n\n Extractions were exported to pickle successfully")
+
+#########################################################################################################################
+############### SCALING BENCHMARK
+#########################################################################################################################
+
+def random_layout(rows, columns, robots, items_to_exit, seed=0, skew=0.0):
+    # A random warehouse layout: the robots (escorts) are scattered randomly, and the items are numbered from 1000
+    # (so they never collide with the escort number 0 or the exited item placeholder 999).
+    # skew makes the items to exit far from the I/O (skew > 0) or close to it (skew < 0): the weight of an item is
+    # exp(skew * its manhattan distance from the I/O / the largest distance). skew=0 draws them uniformly.
+    # Returns the layout (list of rows) and a random list of items to exit.
+    if not 0 < robots < rows*columns:
+        raise ValueError("A %sX%s warehouse can't have %s robots"%(rows,columns,robots))
+    if items_to_exit > rows*columns-robots:
+        raise ValueError("A %sX%s warehouse with %s robots has less than %s items"%(rows,columns,robots,items_to_exit))
+    rng = random.Random(seed)
+    numbers = list(range(1000, 1000+rows*columns-robots)) + [0]*robots
+    rng.shuffle(numbers)
+    layout = [numbers[i*columns:(i+1)*columns] for i in range(rows)]
+    if not skew:
+        items = rng.sample([number for number in numbers if number != 0], items_to_exit)
+        return layout, items
+    io = columns//2
+    largest = max(rows-1 + max(io, columns-1-io), 1)
+    keys = [] # weighted sampling without replacement: the items with the largest random**(1/weight)
+    for i in range(rows):
+        for j in range(columns):
+            if layout[i][j]:
+                weight = np.exp(skew*(i+abs(j-io))/largest)
+                keys.append((rng.random()**(1/weight), layout[i][j]))
+    items = [number for key, number in heapq.nlargest(items_to_exit, keys)]
+    return layout, items
+
+
+def scaling_benchmark(sizes=((9,15),(20,30),(50,50),(100,100)), robots=(5,10,20), items_per_robot=4,
+                      max_time=500, seed=666, output='scaling_benchmark.p'):
+    # Run random warehouses of growing sizes and numbers of robots, and record for each one
+    # the ticks (time units) per second of the simulation and the peak memory of the run.
+    import tracemalloc
+    results = []
+    for rows, columns in sizes:
+        for robots_count in robots:
+            layout, items = random_layout(rows, columns, robots_count, robots_count*items_per_robot, seed)
+            config = WarehouseConfig(rows, columns)
+            result = {'rows': rows, 'columns': columns, 'robots': robots_count, 'items': len(items)}
+            # 1. Speed
+            start = timeit.default_timer()
+            wh = main_program(Warehouse(layout, items, config, random.Random(seed)), max_time=max_time)
+            seconds = timeit.default_timer() - start
+            
+            # 2. Memory - tracing slows the run down, so it is measured on a second, identical run
+            tracemalloc.start()
+            main_program(Warehouse(layout, items, config, random.Random(seed)), max_time=max_time)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            
+            result.update({'time_units': wh.time_units, 'seconds': seconds,
+                           'ticks_per_second': wh.time_units/seconds, 'peak_memory_kb': peak_memory/1024,
+                           'items_exited': len(wh.exited_items)})
+            results.append(result)
+    
+    print("\n%8s %8s %8s %10s %12s %15s %8s"%('size','robots','items','time units','ticks/sec','peak memory KB','exited'))
+    for result in results:
+        print("%8s %8s %8s %10s %12.0f %15.0f %8s"%("%sX%s"%(result['rows'],result['columns']),result['robots'],
+                                                  result['items'],result['time_units'],result['ticks_per_second'],
+                                                  result['peak_memory_kb'],result['items_exited']))
+    
+    if output: # write the pickle file
+        with open(output,'wb') as infile:
+            p.dump(results,infile)
+    return results
+
+
+#########################################################################################################################
+############### LAYOUT BENCHMARK - SOLUTION QUALITY AND TIME OF EACH PHASE
+#########################################################################################################################
+
+# The phases of a time unit, and the warehouse (or dispatcher) functions that belong to each one of them
+PHASES = (('dispatch', 'dispatcher', ('first_item','next_item','other_item')),
+          ('planning', 'warehouse', ('manhattan_journey_to_item','exact_journey_to_item','three_step','five_step',
+                                     'to_next_item','final')),
+          ('conflicts', 'warehouse', ('escape','reroute','new_route','around_robot','can_proceed','wait_for_location')),
+          ('steps', 'warehouse', ('apply_robot_step',)),
+          ('positions', 'warehouse', ('calculate_positions','calculate_distance_from_IO')))
+
+class PhaseTimer:
+    # Measures the wall-clock time of each phase of a warehouse's run, by wrapping the functions of the phases on the
+    # warehouse (and its dispatcher) instance. The time of a function that is called from another phase's function
+    # is charged only to its own phase, so the phases add up to no more than the run's time.
+    def __init__(self):
+        self.seconds = {phase: 0.0 for phase, owner, names in PHASES}
+        self.calls = {phase: 0 for phase, owner, names in PHASES}
+        self.stack = []          # [phase, start] of the running functions
+    
+    def attach(self, wh):
+        for phase, owner, names in PHASES:
+            target = wh.dispatcher if owner == 'dispatcher' else wh
+            for name in names:
+                setattr(target, name, self.timed(phase, getattr(target, name)))
+        return wh
+    
+    def detach(self, wh):
+        # remove the wrappers (e.g. before a snapshot of the warehouse)
+        for phase, owner, names in PHASES:
+            target = wh.dispatcher if owner == 'dispatcher' else wh
+            for name in names:
+                target.__dict__.pop(name, None)
+    
+    def timed(self, phase, function):
+        def wrapper(*args, **kwargs):
+            now = timeit.default_timer()
+            if self.stack: # pause the calling phase
+                self.seconds[self.stack[-1][0]] += now - self.stack[-1][1]
+            self.stack.append([phase, now])
+            self.calls[phase] += 1
+            try:
+                return function(*args, **kwargs)
+            finally:
+                now = timeit.default_timer()
+                self.seconds[phase] += now - self.stack.pop()[1]
+                if self.stack: # resume the calling phase
+                    self.stack[-1][1] = now
+        return wrapper
+
+def run_metrics(wh):
+    # The solution quality of a finished (or stopped) run
+    moves = [move for robot_moves in wh.robots_moves.values() for move in robot_moves]
+    fictitious = sum(1 for move in moves if not isinstance(move[0], bool)) # (from, to, False) - see record_move
+    return {'time_units': wh.time_units,
+            'finished': not wh.items_to_exit,
+            'items_exited': len(wh.exited_items),
+            'extraction_times': sorted(wh.exited_items.values()),
+            'fictitious_ratio': fictitious/len(moves) if moves else 0.0}
+
+def layout_benchmark(layouts=tuple('wh%s.p'%(i) for i in range(1,10)), items='items_list.p', seed=666, max_time=3000,
+                     repeats=3, output='layout_benchmark.json', baseline=None, tolerance=None):
+    # Run every layout with the items list and record its solution quality (run_metrics), and the wall-clock time of
+    # the run and of each phase (PHASES; 'other' is the rest of the main program), from the fastest of the repeats.
+    # The results are written as JSON, so they can be the baseline of later runs: given a baseline file, every layout
+    # whose solution changed is reported as a regression. The seconds depend on the machine, so a time growth of more
+    # than tolerance is a regression only if a tolerance is given (compare with a baseline of the same machine).
+    import json
+    results = []
+    for layout in layouts:
+        result = {'layout': layout, 'items': items, 'seed': seed, 'max_time': max_time}
+        best = None
+        for repeat in range(repeats):
+            timer = PhaseTimer()
+            wh = timer.attach(Warehouse(layout, items, rng=random.Random(seed)))
+            start = timeit.default_timer()
+            main_program(wh, max_time=max_time, verbose=False)
+            seconds = timeit.default_timer() - start
+            if best is None or seconds < best[0]:
+                best = (seconds, timer)
+        seconds, timer = best
+        phases = dict(timer.seconds)
+        phases['other'] = seconds - sum(timer.seconds.values())
+        result.update(run_metrics(wh))
+        result.update({'seconds': seconds, 'ticks_per_second': wh.time_units/seconds, 'phases': phases,
+                       'calls': timer.calls})
+        results.append(result)
+    
+    ## Compare to the baseline
+    regressions = []
+    if baseline:
+        with open(baseline) as infile:
+            previous = {(result['layout'], result['items'], result['seed'], result['max_time']): result
+                        for result in json.load(infile)['results']}
+        for result in results:
+            old = previous.get((result['layout'], result['items'], result['seed'], result['max_time']))
+            if old is None:
+                continue
+            for metric in ('time_units','finished','items_exited','extraction_times'):
+                if result.get(metric) != old.get(metric):
+                    regressions.append((result['layout'], metric, old.get(metric), result.get(metric)))
+            if tolerance is not None and result['seconds'] > old['seconds']*(1+tolerance):
+                regressions.append((result['layout'], 'seconds', old['seconds'], result['seconds']))
+    
+    phase_names = [phase for phase, owner, names in PHASES] + ['other']
+    print("\n%-8s %10s %8s %8s %11s %9s "%('layout','time units','exited','fict.','ticks/sec','seconds') +
+          ' '.join('%10s'%(phase) for phase in phase_names))
+    for result in results:
+        print("%-8s %10s %8s %8.3f %11.0f %9.3f "%(result['layout'],result['time_units'],result['items_exited'],
+                                                  result['fictitious_ratio'],result['ticks_per_second'],
+                                                  result['seconds']) +
+              ' '.join('%10.3f'%(result['phases'][phase]) for phase in phase_names))
+    for layout, metric, old, new in regressions:
+        print("REGRESSION %s %s: %s -> %s"%(layout, metric, old, new))
+    
+    if output: # write the JSON file
+        with open(output,'w') as outfile:
+            json.dump({'results': results}, outfile, indent=1)
+    return results, regressions
+
+
+#########################################################################################################################
+############### RETRIEVAL GAP - JOURNEYS VS. EXACT PLANS
+#########################################################################################################################
+
+def retrieval_gap(layout='wh1.p', items='items_list.p', seed=666, max_time=500, time_budget=None,
+                  output='retrieval_gap.p'):
+    # How far the manhattan/three step/five step journeys are from the optimal retrieval: each item to exit is retrieved
+    # alone by each robot alone (the other escorts are replaced by items), once by the journeys of the simulation
+    # and once by the exact planner, and the numbers of moves are compared.
+    import contextlib, io
+    layout, items = load_pickle(layout), load_pickle(items)
+    rows, columns = len(layout), len(layout[0])
+    io_column = WarehouseConfig(rows, columns).io[1]
+    escorts = [(i,j) for i in range(rows) for j in range(columns) if layout[i][j] == 0]
+    planner = RetrievalPlanner(time_budget)
+    results = []
+    for item in items:
+        item_loc = next(((i,j) for i in range(rows) for j in range(columns) if layout[i][j] == item), None)
+        if item_loc is None: # not in this layout
+            continue
+        config = WarehouseConfig(rows, columns, robot_sides=[2 if item_loc[1] > io_column else 1])
+        for escort in escorts:
+            single = [[10**6+i*columns+j if layout[i][j] == 0 and (i,j) != escort else layout[i][j]
+                       for j in range(columns)] for i in range(rows)] # only one escort (and robot) is left
+            plan = planner.plan(config, escort, escort, item_loc)
+            with contextlib.redirect_stdout(io.StringIO()):
+                wh = main_program(Warehouse(single, [item], config, random.Random(seed)), max_time=max_time)
+            # one step is applied every time unit, and the exit time is one time unit after the item reached the I/O
+            journey = wh.exited_items[item]-2 if item in wh.exited_items else None
+            results.append({'item': item, 'item_location': item_loc, 'robot_location': escort,
+                            'optimal': len(plan) if plan else None, 'journey': journey})
+    
+    compared = [result for result in results if result['optimal'] and result['journey'] is not None]
+    print("%s retrievals, %s compared (the rest didn't fit in the time budget or in max_time)"%(len(results),len(compared)))
+    if compared:
+        optimal = sum(result['optimal'] for result in compared)
+        journey = sum(result['journey'] for result in compared)
+        print("moves: optimal %s, journeys %s - %.1f%% more than optimal"%(optimal, journey, 100.0*(journey-optimal)/optimal))
+    
+    if output: # write the pickle file
+        with open(output,'wb') as infile:
+            p.dump(results,infile)
+    return results
+
+
+#########################################################################################################################
+############### BATCH RUNS
+#########################################################################################################################
+
+# The configurations of the heuristic that can be compared: name -> settings
+# (costs - see WarehouseConfig, dispatch - 'side'/'matching'/'matching-cross-side', reservations - a horizon or None,
+#  exact_budget - the time budget of the exact planner or None)
+VARIANTS = {'baseline': {},
+            'moves': {'costs': 'moves'},
+            'matching': {'dispatch': 'matching'},
+            'reservations': {'reservations': 3},
+            'exact': {'exact_budget': 0.05}}
+
+def variant_warehouse(layout, items, rng, variant='baseline', profiler=None):
+    # A warehouse of the layout and items, with the settings of the variant (a name of VARIANTS or a settings dictionary)
+    settings = VARIANTS[variant] if isinstance(variant, str) else variant
+    config = None
+    if settings.get('costs', 'manhattan') != 'manhattan':
+        rows_of_layout = load_pickle(layout)
+        config = WarehouseConfig(len(rows_of_layout), len(rows_of_layout[0]), costs=settings['costs'])
+    dispatch = settings.get('dispatch', 'side')
+    dispatcher = None if dispatch == 'side' else MatchingDispatcher(cross_side=dispatch == 'matching-cross-side')
+    planner = None if settings.get('exact_budget') is None else RetrievalPlanner(settings['exact_budget'])
+    reservations = None if settings.get('reservations') is None else ReservationTable(settings['reservations'])
+    return Warehouse(layout, items, config, rng, planner=planner, dispatcher=dispatcher, reservations=reservations,
+                     profiler=profiler)
+
+def run_scenario(layout, items, seed, max_time=5000, variant='baseline'):
+    # Run one scenario: a warehouse layout with a list of items to exit, and its own random generator.
+    # Returns a dictionary with the results of the run.
+    result = {'layout': layout, 'items': items, 'seed': seed, 'variant': variant}
+    wh = main_program(variant_warehouse(layout, items, random.Random(seed), variant), max_time=max_time, verbose=False)
+    result.update({'time_units': wh.time_units,                   # the makespan, if all items were exited
+                   'finished': not wh.items_to_exit,              # FALSE if the run was stopped at max_time
+                   'items_exited': len(wh.exited_items)})
+    return result
+
+
+def run_batch(layouts=tuple('wh%s.p'%(i) for i in range(1,10)), items_files=('items_list.p',), seeds=range(10),
+              max_time=5000, workers=None, output='batch_results.p'):
+    # Run every (layout, items list, seed) scenario in a pool of processes, and aggregate the makespans of each
+    # (layout, items list) into one results table. workers=None uses all the CPUs.
+    import statistics
+    from concurrent.futures import ProcessPoolExecutor
+    jobs = [(layout, items, seed) for layout in layouts for items in items_files for seed in seeds]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        runs = list(executor.map(run_scenario, *zip(*jobs), [max_time]*len(jobs)))
+    
+    ## Aggregate the runs
+    table = []
+    for layout in layouts:
+        for items in items_files:
+            scenario_runs = [run for run in runs if run['layout'] == layout and run['items'] == items]
+            makespans = [run['time_units'] for run in scenario_runs if run['finished']]
+            row = {'layout': layout, 'items': items,
+                   'runs': len(scenario_runs),
+                   'finished': len(makespans),
+                   'mean': statistics.mean(makespans) if makespans else None,
+                   'std': statistics.stdev(makespans) if len(makespans) > 1 else None,
+                   'min': min(makespans) if makespans else None,
+                   'max': max(makespans) if makespans else None}
+            table.append(row)
+    
+    print("\n%-8s %-14s %6s %9s %9s %9s %7s %7s"%('layout','items','runs','finished','mean','std','min','max'))
+    for row in table:
+        print("%-8s %-14s %6s %9s %9s %9s %7s %7s"%(row['layout'],row['items'],row['runs'],row['finished'],
+                                                   '-' if row['mean'] is None else '%.1f'%(row['mean']),
+                                                   '-' if row['std'] is None else '%.1f'%(row['std']),
+                                                   '-' if row['min'] is None else row['min'],
+                                                   '-' if row['max'] is None else row['max']))
+    
+    if output: # write the pickle file
+        with open(output,'wb') as infile:
+            p.dump({'runs': runs, 'table': table},infile)
+    return table
+
+
+#########################################################################################################################
+############### MONTE CARLO EVALUATION
+#########################################################################################################################
+
+def t_quantile(df, confidence=0.95):
+    # The two-sided quantile of Student's t distribution with df degrees of freedom (Cornish-Fisher expansion of the
+    # normal quantile - within 1% from 3 degrees of freedom, and within 0.2% from 5)
+    import statistics
+    z = statistics.NormalDist().inv_cdf((1+confidence)/2)
+    return z + (z**3+z)/(4*df) + (5*z**5+16*z**3+3*z)/(96*df**2) + (3*z**7+19*z**5+17*z**3-15*z)/(384*df**3)
+
+def sample_summary(values, confidence=0.95):
+    # mean, percentiles and the confidence interval of the mean of a sample (None for what can't be estimated)
+    summary = {'n': len(values), 'mean': None, 'p10': None, 'p50': None, 'p90': None, 'half_width': None}
+    if not values:
+        return summary
+    values = np.asarray(values, dtype=float)
+    summary['mean'] = values.mean()
+    summary['p10'], summary['p50'], summary['p90'] = np.percentile(values, [10, 50, 90])
+    if len(values) > 1:
+        summary['half_width'] = t_quantile(len(values)-1, confidence) * values.std(ddof=1) / np.sqrt(len(values))
+    return summary
+
+def evaluate(layouts=tuple('wh%s.p'%(i) for i in range(1,10)), items='items_list.p', variants=('baseline','matching'),
+             min_seeds=10, max_seeds=100, round_size=10, precision=0.05, confidence=0.95, max_time=3000, workers=None,
+             output='evaluation_results.p'):
+    # Compare variants of the heuristic (names of VARIANTS) by the time units to exit all items, over random seeds.
+    # Every variant runs with the same seeds (common random numbers), so the paired differences from the first variant
+    # are measured with much less noise than the separate means. The seeds of a layout are sampled in rounds, until
+    # the confidence interval of every variant's mean is within precision (relative to the mean), and at least
+    # min_seeds and at most max_seeds seeds.
+    # Runs that don't finish by max_time have no makespan - they are counted, and left out of the statistics.
+    from concurrent.futures import ProcessPoolExecutor
+    runs = []
+    sampled = {layout: 0 for layout in layouts}   # number of seeds of each layout so far
+    active = list(layouts)                        # the layouts that are still sampled
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while active:
+            jobs = [(layout, seed, variant) for layout in active
+                    for seed in range(sampled[layout], min(sampled[layout]+round_size, max_seeds)) for variant in variants]
+            futures = [executor.submit(run_scenario, layout, items, seed, max_time, variant) for layout, seed, variant in jobs]
+            runs.extend(future.result() for future in futures)
+            for layout in active:
+                sampled[layout] = min(sampled[layout]+round_size, max_seeds)
+            
+            ## Stop sampling the layouts whose intervals are tight enough
+            still_active = []
+            for layout in active:
+                tight = True
+                for variant in variants:
+                    summary = sample_summary([run['time_units'] for run in runs
+                                              if run['layout'] == layout and run['variant'] == variant and run['finished']],
+                                             confidence)
+                    if summary['half_width'] is None or summary['half_width'] > precision*summary['mean']:
+                        tight = False
+                if sampled[layout] < max_seeds and (sampled[layout] < min_seeds or not tight):
+                    still_active.append(layout)
+            active = still_active
+    
+    ## Summarize each layout and variant
+    table = []
+    for layout in layouts:
+        makespans = {}
+        for variant in variants:
+            variant_runs = [run for run in runs if run['layout'] == layout and run['variant'] == variant]
+            makespans[variant] = {run['seed']: run['time_units'] for run in variant_runs if run['finished']}
+            row = {'layout': layout, 'variant': variant, 'seeds': len(variant_runs), 'finished': len(makespans[variant])}
+            row.update(sample_summary(list(makespans[variant].values()), confidence))
+            # the paired difference from the first variant, on the seeds that both finished
+            common = [seed for seed in makespans[variants[0]] if seed in makespans[variant]]
+            difference = sample_summary([makespans[variant][seed]-makespans[variants[0]][seed] for seed in common], confidence)
+            row['difference'], row['difference_half_width'] = difference['mean'], difference['half_width']
+            table.append(row)
+    
+    number = lambda x: '-' if x is None else '%.1f'%(x)
+    print("\n%-8s %-14s %6s %9s %9s %9s %7s %7s %7s %11s %9s"%('layout','variant','seeds','finished','mean','+-',
+                                                              'p10','p50','p90','vs. first','+-'))
+    for row in table:
+        print("%-8s %-14s %6s %9s %9s %9s %7s %7s %7s %11s %9s"%(row['layout'],row['variant'],row['seeds'],row['finished'],
+                                                               number(row['mean']),number(row['half_width']),
+                                                               number(row['p10']),number(row['p50']),number(row['p90']),
+                                                               number(row['difference']),
+                                                               number(row['difference_half_width'])))
+    
+    if output: # write the pickle file
+        with open(output,'wb') as infile:
+            p.dump({'runs': runs, 'table': table, 'confidence': confidence},infile)
+    return table
+
+
+#########################################################################################################################
+############### STRESS TESTS - RANDOM LAYOUTS AND ORDERS
+#########################################################################################################################
+
+def random_scenarios(count, sizes=((9,15),), robots=(5,), densities=None, items_to_exit=(20,), skews=(0.0,), seed=0):
+    # Generate count random scenarios (without writing them to files). Each one draws a size, a number of robots,
+    # a number of items to exit and a skew (see random_layout) from the given choices. densities (shares of the cells
+    # that hold items) can be given instead of robots - the rest of the cells are the escorts of the robots.
+    rng = random.Random(seed)
+    for k in range(count):
+        rows, columns = rng.choice(sizes)
+        if densities is None:
+            robots_count = rng.choice(robots)
+        else:
+            robots_count = max(1, int(round(rows*columns*(1-rng.choice(densities)))))
+        items_count = min(rng.choice(items_to_exit), rows*columns-robots_count)
+        skew = rng.choice(skews)
+        layout_seed = rng.randrange(2**32)
+        layout, items = random_layout(rows, columns, robots_count, items_count, layout_seed, skew)
+        yield {'name': 'random_%s'%(k), 'rows': rows, 'columns': columns, 'robots': robots_count, 'items_count': items_count,
+               'skew': skew, 'layout_seed': layout_seed, 'layout': layout, 'items': items}
+
+def run_random_scenario(scenario, seed, max_time=3000, variant='baseline'):
+    # Run a generated scenario with its own random generator, and count its reroutes and escapes.
+    # Returns a dictionary with the results of the run (without the layout).
+    result = {key: value for key, value in scenario.items() if key not in ('layout','items')}
+    result.update({'seed': seed, 'variant': variant})
+    profiler = Profiler(steps=False)
+    wh = main_program(variant_warehouse(scenario['layout'], scenario['items'], random.Random(seed), variant, profiler),
+                      max_time=max_time, verbose=False)
+    result.update({'time_units': wh.time_units, 'finished': not wh.items_to_exit, 'items_exited': len(wh.exited_items)})
+    result['reroutes'] = profiler.counts.get('reroute', 0)
+    result['escapes'] = profiler.counts.get('escape', 0)
+    return result
+
+def stress_batch(scenarios, seeds=range(3), max_time=3000, variant='baseline', workers=None, window=None,
+                 loop_threshold=10.0, output='stress_results.p'):
+    # Run the scenarios (e.g. from random_scenarios) with every seed in a pool of processes. The scenarios are consumed
+    # as they are needed - at most window runs (default: 4 per worker) are waiting at a time, so a generator of any
+    # length can be streamed. A run is pathological if it had more than loop_threshold reroutes and escapes per item
+    # to exit - its scenario is kept in the results, so it can be replayed.
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    window = window or 4*(workers or os.cpu_count() or 1)
+    runs, pathological, pending = [], {}, {}
+    
+    def collect(done):
+        for future in done:
+            scenario = pending.pop(future)
+            run = future.result()
+            run['pathological'] = run['reroutes']+run['escapes'] > loop_threshold*scenario['items_count']
+            if run['pathological']:
+                pathological[scenario['name']] = scenario
+            runs.append(run)
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for scenario in scenarios:
+            for seed in seeds:
+                if len(pending) >= window:
+                    done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending[executor.submit(run_random_scenario, scenario, seed, max_time, variant)] = scenario
+        collect(list(pending))
+    runs.sort(key=lambda run: (int(run['name'].split('_')[-1]) if run['name'].startswith('random_') else 0,
+                               run['name'], run['seed']))
+    
+    ## Aggregate the runs of each kind of scenario
+    table = []
+    for kind in sorted(set((run['rows'], run['columns'], run['robots'], run['skew']) for run in runs)):
+        kind_runs = [run for run in runs if (run['rows'], run['columns'], run['robots'], run['skew']) == kind]
+        makespans = [run['time_units'] for run in kind_runs if run['finished']]
+        table.append({'rows': kind[0], 'columns': kind[1], 'robots': kind[2], 'skew': kind[3],
+                      'runs': len(kind_runs), 'finished': len(makespans),
+                      'mean': float(np.mean(makespans)) if makespans else None,
+                      'reroutes': float(np.mean([run['reroutes'] for run in kind_runs])),
+                      'escapes': float(np.mean([run['escapes'] for run in kind_runs])),
+                      'pathological': len([run for run in kind_runs if run['pathological']])})
+    
+    print("\n%8s %7s %6s %6s %9s %9s %9s %8s %13s"%('size','robots','skew','runs','finished','mean',
+                                                   'reroutes','escapes','pathological'))
+    for row in table:
+        print("%8s %7s %6s %6s %9s %9s %9.1f %8.1f %13s"%("%sX%s"%(row['rows'],row['columns']),row['robots'],row['skew'],
+                                                      row['runs'],row['finished'],
+                                                          '-' if row['mean'] is None else '%.1f'%(row['mean']),
+                                                          row['reroutes'],row['escapes'],row['pathological']))
+    
+    if output: # write the pickle file
+        with open(output,'wb') as infile:
+            p.dump({'runs': runs, 'table': table, 'pathological': pathological},infile)
+    return table, pathological
+
+
+#########################################################################################################################
+############### ONLINE ORDERS - THROUGHPUT AND LATENCY
+#########################################################################################################################
+
+def poisson_orders(wh, rate, count=None, seed=0, skew=0.0, putaway_share=0.0):
+    # A generator of (time unit, item number) orders of the warehouse (see OrderStream), with a Poisson process of rate
+    # orders per time unit (several orders may arrive in the same time unit). count=None generates orders forever.
+    # Each order is of a random stored item that isn't ordered yet when the order is drawn - including the new items
+    # of the restocks and the put-aways. skew weights the items by their distance from the I/O like random_layout
+    # (> 0 far from the I/O, < 0 close to it).
+    # A putaway_share of the orders are (time unit, new item number, slot) put-aways instead, to random slots.
+    rng = random.Random(seed)
+    largest = max(wh.last_row + wh.last_column, 1)
+    slots = [(i,j) for i in range(wh.last_row+1) for j in range(wh.last_column+1) if (i,j) not in wh.stations]
+    time, k = 0.0, 0
+    while count is None or k < count:
+        time += rng.expovariate(rate)
+        if putaway_share and rng.random() < putaway_share:
+            yield max(int(np.ceil(time)), 1), wh.orders.new_item(wh), rng.choice(slots)
+            k += 1
+            continue
+        items = [item for item in wh.item_locations if item not in wh.items_to_exit and item not in wh.orders.putaways]
+        if not items:
+            return
+        if skew:
+            locations = [wh.item_locations[item] for item in items]
+            weights = [np.exp(skew*(i+abs(j-wh.nearest_station((i,j))[1]))/largest) for i, j in locations]
+            item = rng.choices(items, weights)[0]
+        else:
+            item = rng.choice(items)
+        yield max(int(np.ceil(time)), 1), item
+        k += 1
+
+def run_online(layout='wh1.p', rate=0.02, orders=200, seed=666, max_time=20000, warmup=None, variant='baseline',
+               restock=True, items=(), skew=0.0, putaway_share=0.0, output='online_results.p'):
+    # Run the warehouse with a stream of Poisson orders (see poisson_orders) instead of a closed list of items to exit,
+    # until all the orders are closed or max_time. items are optional items to exit at the beginning.
+    # putaway_share of the orders are put-aways, that are scheduled together with the retrievals.
+    # Reports the steady-state throughput and the latency percentiles after the warmup (default: the time units of the
+    # first 10% of the orders). Returns the summary (see OrderStream.summary).
+    wh = variant_warehouse(layout, list(items), random.Random(seed), variant)
+    wh.orders = OrderStream(poisson_orders(wh, rate, orders, seed, skew, putaway_share), restock)
+    main_program(wh, max_time, verbose=False)
+
+    if warmup is None:
+        warmup = int(np.ceil(orders/10/rate)) if orders else 0
+    summary = wh.orders.summary(wh, warmup)
+    summary.update({'layout': layout, 'rate': rate, 'skew': skew, 'putaway_share': putaway_share, 'seed': seed,
+                    'variant': variant})
+
+    percentiles = summary['latency_percentiles']
+    print("\n%s time units, %s orders (%s rejected), %s closed, backlog %s, %s new items stored"%(
+          summary['time_units'], summary['accepted'], summary['rejected'], summary['closed'], summary['backlog'],
+          summary['restocked']))
+    print("time units %s-%s: throughput %.4f items/time unit (offered %.4f)"%(warmup, summary['last_arrival'],
+                                                                          summary['throughput'], rate))
+    if summary['mean_latency'] is not None:
+        print("latency: mean %.1f, p50 %.0f, p90 %.0f, p95 %.0f, p99 %.0f, max %s"%(
+              summary['mean_latency'], percentiles[50], percentiles[90], percentiles[95], percentiles[99],
+              summary['max_latency']))
+    if summary['accepted_putaways']:
+        percentiles = summary['putaway_latency_percentiles']
+        print("%s put-aways, %s stored, backlog %s: throughput %.4f items/time unit, all the tasks %.4f"%(
+              summary['accepted_putaways'], summary['stored'], summary['putaway_backlog'],
+              summary['putaway_throughput'], summary['tasks_throughput']))
+        if summary['mean_putaway_latency'] is not None:
+            print("put-away latency: mean %.1f, p50 %.0f, p90 %.0f, p95 %.0f, p99 %.0f, max %s"%(
+                  summary['mean_putaway_latency'], percentiles[50], percentiles[90], percentiles[95], percentiles[99],
+                  summary['max_putaway_latency']))
+
+    if output: # write the pickle file
+        with open(output,'wb') as infile:
+            p.dump(summary,infile)
+    return summary
+
+
+#########################################################################################################################
+############### RE-SLOTTING - MAKESPAN OF THE LATER BATCHES
+#########################################################################################################################
+
+def zipf_demand(wh, exponent=1.0, seed=0):
+    # Demand frequencies of the stored items (item number: share of the orders) by Zipf's law: the k-th most popular
+    # item is ordered in proportion to 1/k**exponent. The popularity ranks are random - independent of the locations.
+    rng = random.Random(seed)
+    items = sorted(wh.item_locations)
+    rng.shuffle(items)
+    weights = np.arange(1, len(items)+1, dtype=float)**-exponent
+    weights /= weights.sum()
+    return {item: float(weight) for item, weight in zip(items, weights)}
+
+def batch_orders(demand, batches, size, gap, seed=0):
+    # (time unit, item number) orders in batches of size orders, released every gap time units from time unit 1.
+    # The items are drawn by their demand frequencies, without replacement (an exited item doesn't come back) - the
+    # orders are drawn in advance, so that runs with and without re-slotting receive the same batches.
+    rng = random.Random(seed)
+    keys = sorted(((rng.random()**(1.0/weight), item) for item, weight in demand.items() if weight > 0), reverse=True)
+    items = [item for key, item in keys[:batches*size]]
+    return [(1+(k//size)*gap, item) for k, item in enumerate(items)]
+
+def batch_makespans(orders):
+    # The makespan of every released batch of the order stream: time units from its release to the exit of its last
+    # item (None if it hasn't finished)
+    finished, unfinished = {}, set(orders.arrival_times.values())
+    for ordered, latency in orders.latencies:
+        finished[ordered] = max(finished.get(ordered, 0), ordered+latency)
+    return [None if release in unfinished else finished[release]-release
+            for release in sorted(set(finished) | unfinished)]
+
+def run_reslotting(layout='wh3.p', batches=4, size=15, gap=3000, exponent=1.0, seeds=range(5), max_time=20000,
+                   variant='baseline', min_gain=2, output='reslotting_results.p'):
+    # Run the same batches of orders (see batch_orders) of items with Zipf demands (see zipf_demand) twice for every
+    # seed: with the robots waiting on their final locations between the batches, and with the idle robots re-slotting
+    # the popular items closer to the I/O (see Reslotter). Reports the median makespan of every batch over the seeds in
+    # both runs, and the median cut of the seeds that have finished the batch in both - the first batch is the same
+    # (nothing is re-slotted before it), the later ones show the gain.
+    import statistics
+    runs = []
+    for seed in seeds:
+        for reslot in (False, True):
+            wh = variant_warehouse(layout, [], random.Random(seed), variant)
+            demand = zipf_demand(wh, exponent, seed)
+            wh.orders = OrderStream(batch_orders(demand, batches, size, gap, seed))
+            wh.reslotter = Reslotter(demand, min_gain) if reslot else None
+            main_program(wh, max_time, verbose=False)
+            makespans = batch_makespans(wh.orders)
+            runs.append({'seed': seed, 'reslotting': reslot, 'time_units': wh.time,
+                         'makespans': makespans + [None]*(batches-len(makespans)),
+                         'reslotter': wh.reslotter.summary() if reslot else None})
+
+    rows = []
+    print("\nbatch  release  median makespan  with re-slotting  median cut  finished (both)")
+    for k in range(batches):
+        before = [run['makespans'][k] for run in runs if not run['reslotting']]
+        after = [run['makespans'][k] for run in runs if run['reslotting']]
+        cuts = [1.0-with_/without for without, with_ in zip(before, after) if without and with_ is not None]
+        row = {'batch': k+1, 'release': 1+k*gap,
+               'without': statistics.median([m for m in before if m is not None]) if any(m is not None for m in before) else None,
+               'with': statistics.median([m for m in after if m is not None]) if any(m is not None for m in after) else None,
+               'cut': statistics.median(cuts) if cuts else None, 'finished_both': len(cuts)}
+        rows.append(row)
+        print("%5s  %7s  %15s  %16s  %10s  %s/%s"%(row['batch'], row['release'], row['without'], row['with'],
+              '-' if row['cut'] is None else '%.1f%%'%(100*row['cut']), row['finished_both'], len(before)))
+    for key in ('started', 'finished', 'cancelled', 'distance_cut'):
+        print("re-slotting %s: %s"%(key.replace('_', ' '), sum(run['reslotter'][key] for run in runs if run['reslotting'])))
+
+    summary = {'layout': layout, 'batches': batches, 'size': size, 'gap': gap, 'exponent': exponent,
+               'variant': variant, 'min_gain': min_gain, 'rows': rows, 'runs': runs}
+    if output: # write the pickle file
+        with open(output,'wb') as infile:
+            p.dump(summary,infile)
+    return summary
+
+
+#########################################################################################################################
+############### ENERGY - LONG SHIFTS
+#########################################################################################################################
+
+def run_energy(layout='wh3.p', rate=0.015, orders=300, seed=666, capacity=1000.0, empty=1.0, loaded=1.5, idle=0.1,
+               charge_rate=2.0, max_time=30000, variant='baseline', output='energy_results.p'):
+    # A long shift of Poisson orders (see run_online) three times: with the energy only accounted (the farthest-first
+    # heuristic as it is), with batteries of the given capacity, and with the batteries and energy-aware dispatch
+    # (see EnergyDispatcher). Reports the throughput, the energy by the kinds of moves and per exited item, and the
+    # time units that the robots were stalled without charge. Returns the results of the three runs.
+    modes = (('accounting', None, False), ('battery', capacity, False), ('energy-aware', capacity, True))
+    results = {}
+    for mode, battery, aware in modes:
+        wh = variant_warehouse(layout, [], random.Random(seed), variant)
+        wh.orders = OrderStream(poisson_orders(wh, rate, orders, seed))
+        wh.energy = EnergyModel(battery, empty, loaded, idle, charge_rate)
+        wh.energy.start(wh)
+        if aware:
+            wh.dispatcher = EnergyDispatcher(wh.dispatcher)
+        main_program(wh, max_time, verbose=False)
+        summary = wh.orders.summary(wh, int(np.ceil(orders/10/rate)) if orders else 0)
+        results[mode] = {'time_units': wh.time_units, 'closed': summary['closed'], 'backlog': summary['backlog'],
+                         'throughput': summary['throughput'], 'mean_latency': summary['mean_latency'],
+                         'energy': wh.energy.summary(wh)}
+
+    print("\nmode           time units  closed  backlog  throughput  energy/item  empty  loaded  idle  charged  stalled")
+    for mode, battery, aware in modes:
+        result, energy = results[mode], results[mode]['energy']
+        print("%-13s  %10s  %6s  %7s  %10.4f  %11s  %5.0f  %6.0f  %4.0f  %7.0f  %7s"%(
+              mode, result['time_units'], result['closed'], result['backlog'], result['throughput'],
+              '-' if energy['energy_per_item'] is None else '%.1f'%(energy['energy_per_item']),
+              energy['used']['empty'], energy['used']['loaded'], energy['used']['idle'], energy['charged'],
+              energy['stalled']))
+
+    summary = {'layout': layout, 'rate': rate, 'orders': orders, 'seed': seed, 'capacity': capacity,
+               'costs': {'empty': empty, 'loaded': loaded, 'idle': idle}, 'charge_rate': charge_rate,
+               'variant': variant, 'results': results}
+    if output: # write the pickle file
+        with open(output,'wb') as infile:
+            p.dump(summary,infile)
+    return summary
+
+
+#########################################################################################################################
+############### RUNNING THE PROGRAM
+#########################################################################################################################
+
+def main(args=None):
+    # The command line interface:
+    #   python facility_design_project.py simulate --layout wh3.p --items items_list.p --seed 7
+    #   python facility_design_project.py batch --layouts wh1.p wh2.p --seeds 20 --workers 4
+    #   python facility_design_project.py benchmark
+    #   python facility_design_project.py layouts --baseline benchmark_baseline.json
+    #   python facility_design_project.py gap --layout wh3.p
+    #   python facility_design_project.py evaluate --variants baseline matching reservations
+    #   python facility_design_project.py stress --count 50 --sizes 9x15 20x30 --robots 5 10 --skews 0 3
+    #   python facility_design_project.py online --layout wh3.p --rate 0.02 --orders 500
+    #   python facility_design_project.py reslot --layout wh3.p --batches 4 --size 15 --seeds 10
+    #   python facility_design_project.py energy --layout wh3.p --capacity 1000 --orders 300
+    #   python facility_design_project.py resume checkpoints_wh3.p --at 400
+    # Without a command, wh1.p is simulated with the global random seed 666, like the original script.
+    import argparse
+    parser = argparse.ArgumentParser(description="Puzzle-based warehouse simulation")
+    commands = parser.add_subparsers(dest='command')
+    
+    simulate = commands.add_parser('simulate', help="run one warehouse and export its robot moves and extractions")
+    simulate.add_argument('--layout', default='wh1.p', help="warehouse pickle file")
+    simulate.add_argument('--items', default='items_list.p', help="items to exit pickle file")
+    simulate.add_argument('--seed', type=int, default=666, help="random seed of the run")
+    simulate.add_argument('--max-time', type=int, default=None, help="stop after this number of time units")
+    simulate.add_argument('--events', default=None, help="write the events of the run to this file (JSON lines)")
+    simulate.add_argument('--trajectory', choices=['npz','npy'], default=None,
+                          help="also export the robot moves as records (npy can be memory-mapped)")
+    simulate.add_argument('--log-level', choices=['debug','info'], default='info',
+                          help="debug also records every step of every robot")
+    simulate.add_argument('--costs', choices=['manhattan','moves'], default='manhattan',
+                          help="rank the items to exit by manhattan distance or by the robot moves of their retrieval")
+    simulate.add_argument('--io-columns', nargs='+', type=int, default=None,
+                          help="columns of several I/O points on the first row (default: one I/O in the middle)")
+    simulate.add_argument('--dispatch', choices=['side','matching','matching-cross-side'], default='side',
+                          help="how the robots choose items: the side rules, or a minimum cost matching")
+    simulate.add_argument('--exact-budget', type=float, default=None,
+                          help="plan the retrievals with the exact planner, with this time budget (seconds) for each plan")
+    simulate.add_argument('--reservations', type=int, default=None, metavar='HORIZON',
+                          help="let blocked robots wait by a reservation table, up to this number of time units "
+                               "(the routes are planned without it)")
+    simulate.add_argument('--profile', default=None,
+                          help="export the counters and timers of the run (see Profiler) to this pickle file")
+    simulate.add_argument('--checkpoint-every', type=int, default=None,
+                          help="also export a snapshot of the run every this number of time units (checkpoints_whX.p)")
+    
+    resume = commands.add_parser('resume', help="continue a run from one of its checkpoints, and export it")
+    resume.add_argument('checkpoints', help="checkpoints pickle file of the run (checkpoints_whX.p)")
+    resume.add_argument('--at', type=int, required=True, help="the time unit of the checkpoint")
+    resume.add_argument('--max-time', type=int, default=None, help="stop after this number of time units")
+    resume.add_argument('--events', default=None, help="write the events from the checkpoint on to this file (JSON lines)")
+    resume.add_argument('--trajectory', choices=['npz','npy'], default=None,
+                        help="also export the robot moves as records (npy can be memory-mapped)")
+    
+    batch = commands.add_parser('batch', help="run layouts X items lists X seeds in parallel and aggregate the makespans")
+    batch.add_argument('--layouts', nargs='+', default=['wh%s.p'%(i) for i in range(1,10)], help="warehouse pickle files")
+    batch.add_argument('--items', nargs='+', default=['items_list.p'], help="items to exit pickle files")
+    batch.add_argument('--seeds', type=int, default=10, help="number of seeds for each scenario")
+    batch.add_argument('--max-time', type=int, default=5000, help="stop each run after this number of time units")
+    batch.add_argument('--workers', type=int, default=None, help="number of processes (default: all the CPUs)")
+    batch.add_argument('--output', default='batch_results.p', help="results pickle file")
+    
+    benchmark = commands.add_parser('benchmark', help="ticks per second and peak memory of growing warehouses")
+    benchmark.add_argument('--max-time', type=int, default=500, help="time units of each run")
+    benchmark.add_argument('--output', default='scaling_benchmark.p', help="results pickle file")
+    
+    evaluation = commands.add_parser('evaluate', help="compare variants of the heuristic over random seeds, with confidence "
+                                                      "intervals, until they are tight enough")
+    evaluation.add_argument('--layouts', nargs='+', default=['wh%s.p'%(i) for i in range(1,10)], help="warehouse pickle files")
+    evaluation.add_argument('--items', default='items_list.p', help="items to exit pickle file")
+    evaluation.add_argument('--variants', nargs='+', choices=sorted(VARIANTS), default=['baseline','matching'],
+                            help="the variants to compare - the differences are from the first one")
+    evaluation.add_argument('--min-seeds', type=int, default=10, help="minimum number of seeds for each layout")
+    evaluation.add_argument('--max-seeds', type=int, default=100, help="maximum number of seeds for each layout")
+    evaluation.add_argument('--round', type=int, default=10, help="number of seeds that are added in each round")
+    evaluation.add_argument('--precision', type=float, default=0.05,
+                            help="stop when the confidence intervals are within this share of the means")
+    evaluation.add_argument('--confidence', type=float, default=0.95, help="confidence level of the intervals")
+    evaluation.add_argument('--max-time', type=int, default=3000, help="stop each run after this number of time units")
+    evaluation.add_argument('--workers', type=int, default=None, help="number of processes (default: all the CPUs)")
+    evaluation.add_argument('--output', default='evaluation_results.p', help="results pickle file")
+    
+    layouts = commands.add_parser('layouts', help="solution quality and time of each phase of every layout, "
+                                                  "compared to a baseline")
+    layouts.add_argument('--layouts', nargs='+', default=['wh%s.p'%(i) for i in range(1,10)], help="warehouse pickle files")
+    layouts.add_argument('--items', default='items_list.p', help="items to exit pickle file")
+    layouts.add_argument('--seed', type=int, default=666, help="random seed of the runs")
+    layouts.add_argument('--max-time', type=int, default=3000, help="stop each run after this number of time units")
+    layouts.add_argument('--repeats', type=int, default=3, help="the times are of the fastest of this number of runs")
+    layouts.add_argument('--baseline', default=None, help="a previous results file - report the regressions from it")
+    layouts.add_argument('--tolerance', type=float, default=None,
+                         help="also report a time growth of more than this share from the baseline (same machine)")
+    layouts.add_argument('--output', default='layout_benchmark.json', help="results JSON file")
+    
+    stress = commands.add_parser('stress', help="run generated random layouts and orders, and find the pathological ones")
+    stress.add_argument('--count', type=int, default=20, help="number of generated scenarios")
+    stress.add_argument('--sizes', nargs='+', default=['9x15'], help="warehouse sizes to choose from (ROWSxCOLUMNS)")
+    stress.add_argument('--robots', nargs='+', type=int, default=[5], help="numbers of robots to choose from")
+    stress.add_argument('--densities', nargs='+', type=float, default=None,
+                        help="shares of the cells with items to choose from (instead of --robots)")
+    stress.add_argument('--items', nargs='+', type=int, default=[20], help="numbers of items to exit to choose from")
+    stress.add_argument('--skews', nargs='+', type=float, default=[0.0],
+                        help="skews of the items to exit to choose from (> 0 far from the I/O, < 0 close to it)")
+    stress.add_argument('--seed', type=int, default=0, help="random seed of the generator")
+    stress.add_argument('--seeds', type=int, default=3, help="number of seeds of the runs of each scenario")
+    stress.add_argument('--variant', choices=sorted(VARIANTS), default='baseline', help="the variant of the heuristic")
+    stress.add_argument('--max-time', type=int, default=3000, help="stop each run after this number of time units")
+    stress.add_argument('--workers', type=int, default=None, help="number of processes (default: all the CPUs)")
+    stress.add_argument('--output', default='stress_results.p', help="results pickle file")
+    
+    online = commands.add_parser('online', help="run a warehouse with a stream of arriving orders, and report its "
+                                                "throughput and latencies")
+    online.add_argument('--layout', default='wh1.p', help="warehouse pickle file")
+    online.add_argument('--rate', type=float, default=0.02, help="orders per time unit (Poisson arrivals)")
+    online.add_argument('--orders', type=int, default=200, help="number of orders")
+    online.add_argument('--skew', type=float, default=0.0,
+                        help="skew of the ordered items (> 0 far from the I/O, < 0 close to it)")
+    online.add_argument('--seed', type=int, default=666, help="random seed of the orders and the run")
+    online.add_argument('--max-time', type=int, default=20000, help="stop after this number of time units")
+    online.add_argument('--warmup', type=int, default=None,
+                        help="time units before the steady state (default: those of the first 10%% of the orders)")
+    online.add_argument('--variant', choices=sorted(VARIANTS), default='baseline', help="the variant of the heuristic")
+    online.add_argument('--putaways', type=float, default=0.0,
+                        help="share of the orders that are put-aways of new items (scheduled with the retrievals)")
+    online.add_argument('--no-restock', action='store_true',
+                        help="leave the \"999\" placeholder on the I/O instead of storing a new item")
+    online.add_argument('--output', default='online_results.p', help="results pickle file")
+    
+    reslot = commands.add_parser('reslot', help="makespans of batches of orders, with and without re-slotting the "
+                                                "popular items by the idle robots")
+    reslot.add_argument('--layout', default='wh3.p', help="warehouse pickle file")
+    reslot.add_argument('--batches', type=int, default=4, help="number of batches of orders")
+    reslot.add_argument('--size', type=int, default=15, help="orders in each batch")
+    reslot.add_argument('--gap', type=int, default=3000, help="time units between the releases of the batches")
+    reslot.add_argument('--zipf', type=float, default=1.0, help="exponent of the Zipf demands of the items")
+    reslot.add_argument('--seeds', type=int, default=5, help="number of seeds (demands, orders and runs)")
+    reslot.add_argument('--min-gain', type=int, default=2, help="the least distance cut of a re-slotted item")
+    reslot.add_argument('--max-time', type=int, default=20000, help="stop each run after this number of time units")
+    reslot.add_argument('--variant', choices=sorted(VARIANTS), default='baseline', help="the variant of the heuristic")
+    reslot.add_argument('--output', default='reslotting_results.p', help="results pickle file")
+    
+    energy = commands.add_parser('energy', help="energy of a long shift of orders: accounted only, with batteries, and "
+                                                "with energy-aware dispatch")
+    energy.add_argument('--layout', default='wh3.p', help="warehouse pickle file")
+    energy.add_argument('--rate', type=float, default=0.015, help="orders per time unit (Poisson arrivals)")
+    energy.add_argument('--orders', type=int, default=300, help="number of orders")
+    energy.add_argument('--seed', type=int, default=666, help="random seed of the orders and the runs")
+    energy.add_argument('--capacity', type=float, default=1000.0, help="energy of a full battery")
+    energy.add_argument('--costs', nargs=3, type=float, default=[1.0, 1.5, 0.1], metavar=('EMPTY', 'LOADED', 'IDLE'),
+                        help="energy of an empty move, a loaded move and an idle time unit")
+    energy.add_argument('--charge-rate', type=float, default=2.0, help="energy gained in a time unit on a charging cell")
+    energy.add_argument('--max-time', type=int, default=30000, help="stop each run after this number of time units")
+    energy.add_argument('--variant', choices=sorted(VARIANTS), default='baseline', help="the variant of the heuristic")
+    energy.add_argument('--output', default='energy_results.p', help="results pickle file")
+    
+    gap = commands.add_parser('gap', help="moves of the journeys vs. the exact planner, for single item retrievals")
+    gap.add_argument('--layout', default='wh1.p', help="warehouse pickle file")
+    gap.add_argument('--items', default='items_list.p', help="items to exit pickle file")
+    gap.add_argument('--seed', type=int, default=666, help="random seed of the journeys")
+    gap.add_argument('--budget', type=float, default=None, help="time budget (seconds) of each exact plan")
+    gap.add_argument('--output', default='retrieval_gap.p', help="results pickle file")
+    
+    args = parser.parse_args(args)
+    
+    if args.command == 'simulate':
+        events = None
+        if args.events:
+            events = EventLog(EventLog.DEBUG if args.log_level == 'debug' else EventLog.INFO, args.events)
+        planner = None if args.exact_budget is None else RetrievalPlanner(args.exact_budget)
+        layout = load_pickle(args.layout) # the size of the warehouse
+        config = WarehouseConfig(len(layout), len(layout[0]), costs=args.costs, io_columns=args.io_columns)
+        dispatcher = None if args.dispatch == 'side' else MatchingDispatcher(cross_side=args.dispatch == 'matching-cross-side')
+        reservations = None if args.reservations is None else ReservationTable(args.reservations)
+        profiler = Profiler() if args.profile else None
+        run_and_export_to_pickle(args.layout, args.items, args.seed, args.max_time, events, args.trajectory, planner, config,
+                                 dispatcher, reservations, args.checkpoint_every, profiler)
+        if profiler:
+            profiler.save(args.profile)
+            print("\n\n Profile was exported to pickle successfully")
+    elif args.command == 'resume':
+        events = EventLog(EventLog.INFO, args.events) if args.events else None
+        resume_and_export_to_pickle(args.checkpoints, args.at, args.max_time, events, args.trajectory)
+    elif args.command == 'batch':
+        run_batch(args.layouts, args.items, range(args.seeds), args.max_time, args.workers, args.output)
+    elif args.command == 'benchmark':
+        scaling_benchmark(max_time=args.max_time, output=args.output)
+    elif args.command == 'evaluate':
+        evaluate(args.layouts, args.items, args.variants, args.min_seeds, args.max_seeds, args.round, args.precision,
+                 args.confidence, args.max_time, args.workers, args.output)
+    elif args.command == 'layouts':
+        results, regressions = layout_benchmark(args.layouts, args.items, args.seed, args.max_time, args.repeats,
+                                                args.output, args.baseline, args.tolerance)
+        if regressions:
+            parser.exit(1)
+    elif args.command == 'stress':
+        sizes = [tuple(int(number) for number in size.lower().split('x')) for size in args.sizes]
+        scenarios = random_scenarios(args.count, sizes, args.robots, args.densities, args.items, args.skews, args.seed)
+        stress_batch(scenarios, range(args.seeds), args.max_time, args.variant, args.workers, output=args.output)
+    elif args.command == 'online':
+        run_online(args.layout, args.rate, args.orders, args.seed, args.max_time, args.warmup, args.variant,
+                   not args.no_restock, skew=args.skew, putaway_share=args.putaways, output=args.output)
+    elif args.command == 'reslot':
+        run_reslotting(args.layout, args.batches, args.size, args.gap, args.zipf, range(args.seeds), args.max_time,
+                       args.variant, args.min_gain, args.output)
+    elif args.command == 'energy':
+        run_energy(args.layout, args.rate, args.orders, args.seed, args.capacity, *args.costs, args.charge_rate,
+                   args.max_time, args.variant, args.output)
+    elif args.command == 'gap':
+        retrieval_gap(args.layout, args.items, args.seed, time_budget=args.budget, output=args.output)
+    else:
+        random.seed(666)
+        run_and_export_to_pickle('wh1.p')
+
+
+if __name__ == '__main__':
+    main()
+
+
@@ -0,0 +1,49 @@
+import random
+
+import facility_design_project as fdp
+
+
+def test_sorted_by_distance_then_order():
+    queue = fdp.DistanceQueue()
+    queue.update(7, 4, 0)
+    queue.update(3, 2, 1)
+    queue.update(5, 4, 2)
+    queue.update(9, 2, 3)
+    assert list(queue) == [(3,2), (9,2), (7,4), (5,4)]
+    assert queue.farthest() == 5
+
+
+def test_update_moves_an_item():
+    queue = fdp.DistanceQueue()
+    for order, (item, distance) in enumerate([(1,5), (2,3), (3,8)]):
+        queue.update(item, distance, order)
+    queue.update(3, 1, 2)
+    assert list(queue) == [(3,1), (2,3), (1,5)]
+    assert len(queue) == 3
+    assert queue.farthest() == 1
+
+
+def test_remove():
+    queue = fdp.DistanceQueue()
+    queue.update(1, 5, 0)
+    queue.update(2, 5, 1)
+    queue.remove(1)
+    queue.remove(4) # not in the queue
+    assert 1 not in queue and 2 in queue
+    assert list(queue) == [(2,5)]
+
+
+def test_same_as_sorting():
+    rng = random.Random(0)
+    queue = fdp.DistanceQueue()
+    distances = {}
+    for order in range(300):
+        item = rng.randrange(40)
+        if rng.random() < 0.2:
+            queue.remove(item)
+            distances.pop(item, None)
+        else:
+            distances[item] = (rng.randrange(20), order)
+            queue.update(item, *distances[item])
+    expected = sorted(distances.items(), key=lambda pair: pair[1])
+    assert list(queue) == [(item, distance) for item, (distance, order) in expected]
@@ -0,0 +1,54 @@
+import os
+import random
+
+import pytest
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_energy_of_a_move_sequence():
+    model = fdp.EnergyModel(10.0, empty=1.0, loaded=1.5, idle=0.1, charge_rate=2.0, charging=[(0,0)])
+    model.reset([1])
+    for move in [(False, (1,1), (1,2)),   # empty: 1.0
+                 (True, (1,2), (1,1)),    # loaded: 1.5
+                 ((1,1), (1,1), False),   # idle: 0.1
+                 (False, (1,1), (0,1)),   # empty: 1.0
+                 (False, (0,1), (0,0))]:  # empty: 1.0
+        model.spend(1, move)
+    assert model.used[1] == pytest.approx({'empty': 3.0, 'loaded': 1.5, 'idle': 0.1})
+    assert model.moves[1] == {'empty': 3, 'loaded': 1, 'idle': 1}
+    assert model.charge[1] == pytest.approx(5.4) and model.lowest[1] == pytest.approx(5.4)
+    for k in range(3): # idle on the charging cell: +2.0, +2.0, and +0.6 up to the capacity
+        model.spend(1, ((0,0), (0,0), False))
+    assert model.charge[1] == pytest.approx(10.0) and model.charged[1] == pytest.approx(4.6)
+    assert model.used[1]['idle'] == pytest.approx(0.1) and model.moves[1]['idle'] == 4
+
+
+def test_stalled_without_charge():
+    model = fdp.EnergyModel(2.0, empty=1.0, loaded=1.5, charging=[(0,0)])
+    model.reset([1])
+    model.spend(1, (True, (1,2), (1,1)))
+    model.spend(1, (False, (1,1), (1,2))) # only 0.5 is left
+    model.spend(1, (False, (1,2), (1,3)))
+    assert model.charge[1] == 0 and model.used[1]['empty'] == pytest.approx(0.5)
+    assert model.stalled[1] == 1 and model.is_stalled(1)
+    assert fdp.energy_of_moves({1: [(True, (1,2), (1,1)), (False, (1,1), (1,2))]})['energy'] == pytest.approx(2.5)
+
+
+def test_low_charge_robot_goes_to_charge():
+    profiler = fdp.Profiler(steps=False)
+    charged = []
+    profiler.on('charge', lambda wh, time, robot_id, event, from_loc, to_loc, item: charged.append((robot_id, item)))
+    energy = fdp.EnergyModel(300.0)
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), os.path.join(ROOT, 'items_list.p'), rng=random.Random(0),
+                       dispatcher=fdp.EnergyDispatcher(), profiler=profiler, energy=energy)
+    energy.charge[1] = 20.0
+    fdp.main_program(wh, max_time=150, verbose=False)
+    assert charged and charged[0][0] == 1
+    item = charged[0][1]
+    assert wh.items_to_exit.get(item) != 1 # its item was given up
+    assert energy.resting[1] in energy.charging # sent to a charger
+    assert energy.charged[1] >= energy.resume*energy.capacity-20.0 # charged there before it went back to work
+    assert not energy.is_charging(wh, 1) and energy.stalled[1] == 0
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_t_quantile():
+    # from the tables of Student's t distribution
+    for df, quantile in ((5, 2.5706), (10, 2.2281), (30, 2.0423)):
+        assert fdp.t_quantile(df) == pytest.approx(quantile, rel=0.002)
+    assert fdp.t_quantile(10, 0.99) == pytest.approx(3.1693, rel=0.002)
+
+
+def test_sample_summary():
+    summary = fdp.sample_summary([10, 12, 14, 16, 18, 20])
+    assert summary['n'] == 6
+    assert summary['mean'] == 15
+    assert summary['p50'] == 15
+    assert summary['half_width'] == pytest.approx(2.5706*3.7417/6**0.5, rel=0.002)
+    assert fdp.sample_summary([7])['half_width'] is None
+    assert fdp.sample_summary([])['mean'] is None
+
+
+def test_common_random_numbers():
+    # a run depends only on its seed, so every variant sees the same scenarios
+    layout, items = os.path.join(ROOT, 'wh3.p'), os.path.join(ROOT, 'items_list.p')
+    first = fdp.run_scenario(layout, items, 4, max_time=300)
+    assert first['items_exited'] > 0
+    assert fdp.run_scenario(layout, items, 4, max_time=300) == first
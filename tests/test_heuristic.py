@@ -0,0 +1,84 @@
+import os
+import random
+
+import pytest
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def not_own_items(wh):
+    # (robot, item) of the items that the robots go to or take, but that aren't theirs to exit (exited, or another's)
+    return [(robot_id, item) for robot_id, robot in wh.robots.items()
+            for item in (robot.item_to_take, robot.currently_taking) if item and wh.items_to_exit.get(item) != robot_id]
+
+
+def checked_run(layout, seed, max_time=2000):
+    # run the layout, checking at the end of every time unit (while there are items to exit) that every robot takes
+    # only its own items. Returns the warehouse and the (time unit, robot, item) of the wrong ones.
+    profiler = fdp.Profiler(steps=False)
+    wrong = []
+    def check(wh, time, *event):
+        if wh.items_to_exit:
+            wrong.extend((time, robot_id, item) for robot_id, item in not_own_items(wh))
+    profiler.on('tick_end', check)
+    wh = fdp.Warehouse(os.path.join(ROOT, layout), os.path.join(ROOT, 'items_list.p'), rng=random.Random(seed),
+                       profiler=profiler)
+    fdp.main_program(wh, max_time=max_time, verbose=False)
+    return wh, wrong
+
+
+@pytest.mark.parametrize('layout, seed', [('wh6.p', 2), ('wh8.p', 8)])
+def test_robot_released_when_its_item_is_taken_at_the_io(layout, seed):
+    # a robot on the I/O takes the item next to it from another robot, that has no other item: the other robot
+    # used to keep the item, and failed once it was exited
+    wh, wrong = checked_run(layout, seed)
+    assert wrong == []
+
+
+def test_robot_keeps_its_own_item_at_the_io():
+    # the robot on the I/O takes the item next to it, that is already its own: it used to be sent to its final
+    # location as if another robot had lost the item, and wh2 was stuck with 3 items left
+    wh, wrong = checked_run('wh2.p', 666, max_time=3000)
+    assert not wh.items_to_exit
+    assert wh.time_units == 1331
+    assert wrong == []
+
+
+@pytest.mark.parametrize('layout, seed', [('wh8.p', 3), ('wh3.p', 1), ('wh9.p', 0)])
+def test_item_taken_in_the_same_time_unit_is_chosen_again(layout, seed):
+    # a robot that chooses a new item from a queue that isn't updated yet used to take an item that another robot
+    # had just taken (both robots took it, and one was left with an exited item)
+    wh, wrong = checked_run(layout, seed)
+    assert wrong == []
+
+
+def test_item_exited_in_the_same_time_unit_is_chosen_again():
+    # the only item to exit of the left side has just exited on the I/O, but it is still in the queue of the side
+    layout = [[11, 12, 13, 14, 15],
+              [16,  0, 17,  0, 18],
+              [19, 20, 21, 22, 23]]
+    wh = fdp.Warehouse(layout, [13, 15], rng=random.Random(0))
+    wh.exit_item(False, 1)
+    assert 13 in wh.distances_left
+    assert not wh.new_route(1) # no items left for the robot of the left side
+    assert wh.robots[1].item_to_take is None and wh.robots[1].currently_taking is None
+
+
+def test_new_route_leaves_the_previous_item():
+    # a robot that was given a new item right next to it kept its previous item to take (the journey sets the item
+    # only for a robot without one), planned the three steps of the previous item, and failed once it was exited
+    wh, wrong = checked_run('wh7.p', 5)
+    assert wrong == []
+
+
+def test_first_items_are_out_of_the_queues():
+    # the queues weren't updated after the first items were given, so a robot that exited an item on the I/O in the
+    # first time unit could choose an item that another robot was already taking (it crashed once it was exited)
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), os.path.join(ROOT, 'items_list.p'), rng=random.Random(0))
+    wh.running_first_time()
+    queued = [queue[i][0] for queue in (wh.distances_left, wh.distances_right) for i in range(len(queue))]
+    assert queued
+    assert all(wh.items_to_exit[item] is False for item in queued)
+    assert set(queued) == {item for item, robot_id in wh.items_to_exit.items() if not robot_id}
@@ -0,0 +1,29 @@
+import itertools
+import random
+
+import numpy as np
+
+import facility_design_project as fdp
+
+
+def brute_force(cost):
+    # the minimum total cost over every matching of all the rows (or all the columns)
+    rows, columns = cost.shape
+    if rows <= columns:
+        return min(sum(cost[i,j] for i, j in enumerate(perm)) for perm in itertools.permutations(range(columns), rows))
+    return brute_force(cost.T)
+
+
+def test_against_brute_force():
+    rng = random.Random(0)
+    for trial in range(200):
+        rows, columns = rng.randint(1,5), rng.randint(1,5)
+        cost = np.array([[rng.randint(0,20) for j in range(columns)] for i in range(rows)], dtype=float)
+        pairs = fdp.min_cost_matching(cost)
+        assert len(pairs) == min(rows, columns)
+        assert len(set(i for i, j in pairs)) == len(pairs) == len(set(j for i, j in pairs))
+        assert sum(cost[i,j] for i, j in pairs) == brute_force(cost)
+
+
+def test_sorted_pairs():
+    assert fdp.min_cost_matching([[4, 1], [2, 8], [3, 3]]) == [(0,1), (1,0)]
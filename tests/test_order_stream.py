@@ -0,0 +1,50 @@
+import os
+import random
+from types import SimpleNamespace
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_arrivals_by_time():
+    orders = fdp.OrderStream([(1, 5), (1, 6), (3, 7, (2,2)), (8, 9)])
+    assert orders.arrive(0) == []
+    assert orders.arrive(2) == [(5,), (6,)]
+    assert orders.arrive(7) == [(7, (2,2))]
+    assert orders.last_arrival == 3 and not orders.exhausted
+    assert orders.arrive(10) == [(9,)]
+    assert orders.exhausted
+
+
+def test_latencies():
+    orders = fdp.OrderStream([(2, 5), (4, 6), (30, 7)])
+    for time in range(1, 31):
+        for item, in orders.arrive(time):
+            orders.arrival_times[item] = time
+    orders.arrive(31)
+    orders.close(5, 12)
+    orders.close(6, 24)
+    orders.close(8, 25) # not an order
+    assert orders.latencies == [(2, 10), (4, 20)]
+    assert orders.is_open() # 7 is still open
+    wh = SimpleNamespace(time=40, time_units=40, exited_items={5: 12, 6: 24, 8: 25})
+    summary = orders.summary(wh, warmup=3)
+    assert summary['closed'] == 2 and summary['backlog'] == 1
+    assert summary['mean_latency'] == 20 and summary['max_latency'] == 20 # the order before the warmup isn't counted
+    assert summary['throughput'] == 3/27 # the exits in time units 4-30
+
+
+def test_online_run():
+    # every order that was accepted is closed, with the time units from its arrival to the exit of its item
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), [], rng=random.Random(0))
+    items = sorted(wh.item_locations)[:6]
+    arrivals = [(10*k+1, item) for k, item in enumerate(items)] + [(70, items[0]), (71, 10**6)]
+    wh.orders = fdp.OrderStream(arrivals, restock=False)
+    fdp.main_program(wh, max_time=3000, verbose=False)
+    assert wh.orders.accepted == 6 and wh.orders.rejected == 2 # the item ordered again, and the unknown item
+    assert not wh.orders.is_open()
+    ordered_items = {ordered: item for ordered, item in arrivals[:6]}
+    assert sorted(ordered for ordered, latency in wh.orders.latencies) == sorted(ordered_items)
+    for ordered, latency in wh.orders.latencies:
+        assert latency == wh.exited_items[ordered_items[ordered]] - ordered > 0
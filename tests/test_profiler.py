@@ -0,0 +1,44 @@
+import os
+import random
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_one_tick_per_time_unit():
+    profiler = fdp.Profiler()
+    started, ended = [], []
+    profiler.on('tick_start', lambda wh, time, *event: started.append(time))
+    profiler.on('tick_end', lambda wh, time, *event: ended.append(time))
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), os.path.join(ROOT, 'items_list.p'), rng=random.Random(0),
+                       profiler=profiler)
+    fdp.main_program(wh, max_time=100, verbose=False)
+    assert started == ended == list(range(1, 101))
+    assert len(profiler.tick_seconds) == 100
+    assert profiler.summary()['ticks'] == 100
+
+
+def test_counts_events():
+    profiler = fdp.Profiler()
+    escapes = []
+    profiler.on('escape', lambda wh, time, robot_id, *event: escapes.append(robot_id))
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), os.path.join(ROOT, 'items_list.p'), rng=random.Random(0),
+                       profiler=profiler)
+    fdp.main_program(wh, max_time=300, verbose=False)
+    assert profiler.counts.get('escape', 0) == len(escapes)
+    summary = profiler.summary()
+    assert sum(summary['frozen'].values()) == profiler.counts.get('wait', 0)
+
+
+def test_on_as_a_decorator():
+    profiler = fdp.Profiler()
+    exits = []
+    @profiler.on('exit')
+    def exited(wh, time, robot_id, event, from_loc, to_loc, item):
+        exits.append(item)
+    assert callable(exited) and profiler.hooks['exit'] == [exited]
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), os.path.join(ROOT, 'items_list.p'), rng=random.Random(0),
+                       profiler=profiler)
+    fdp.main_program(wh, max_time=300, verbose=False)
+    assert exits == list(wh.exited_items) and exits
@@ -0,0 +1,56 @@
+import os
+import random
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAYOUT = [[11, 12, 13, 14, 15],
+          [16,  0, 17,  0, 18],
+          [19, 20, 21, 22, 23]]
+
+
+def test_inbound_item_carried_to_its_slot():
+    # the exit of the ordered item frees the I/O for the inbound item, and a robot carries it to its slot
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), [], rng=random.Random(0))
+    item = sorted(wh.item_locations)[0]
+    wh.orders = fdp.OrderStream([(1, item), (1, 10**6, (4,2))], restock=False)
+    fdp.main_program(wh, max_time=3000, verbose=False)
+    assert item in wh.exited_items
+    assert wh.find_item_location(10**6) == (4,2)
+    assert wh.orders.accepted_putaways == 1 and len(wh.orders.stored) == 1
+    assert not wh.orders.putaways and not wh.orders.is_open()
+    assert not any(robot.putting_away for robot in wh.robots.values())
+
+
+def test_escort_route_avoids_the_item():
+    wh = fdp.Warehouse(LAYOUT, [13], rng=random.Random(0))
+    steps = wh.escort_route((1,0), (1,4), {(1,2)})
+    escort = [from_loc for from_loc, to_loc, with_item in steps if with_item] # the robot pulls the next cell's item
+    assert escort[-1] == (1,4)
+    assert len(escort) == 6 # around the item - the shortest way
+    assert all(abs(a[0]-b[0])+abs(a[1]-b[1]) == 1 for a, b in zip([(1,0)]+escort, escort))
+    assert (1,2) not in [loc for step in steps for loc in step[:2]] # neither the escort nor the robot pass the item
+    assert wh.escort_route((1,0), (1,4), {(0,2), (1,2), (2,2)}) is None
+
+
+def test_inbound_item_enters_instead_of_a_restock():
+    wh = fdp.Warehouse(LAYOUT, [13], rng=random.Random(0))
+    wh.orders = fdp.OrderStream([], restock=True)
+    wh.orders.inbound.append((10**6, (2,4), 0))
+    wh.exit_item(False, 1)
+    assert wh.item_at(wh.io) == 10**6 and 10**6 in wh.waiting_putaways()
+    assert wh.orders.restocked == 0
+
+
+def test_restock_without_inbound_items():
+    wh = fdp.Warehouse(LAYOUT, [13], rng=random.Random(0))
+    wh.orders = fdp.OrderStream([], restock=True)
+    wh.exit_item(False, 1)
+    assert wh.item_at(wh.io) not in (13, 999) and wh.orders.restocked == 1
+    assert not wh.waiting_putaways()
+
+    wh = fdp.Warehouse(LAYOUT, [13], rng=random.Random(0))
+    wh.orders = fdp.OrderStream([], restock=False)
+    wh.exit_item(False, 1)
+    assert wh.item_at(wh.io) == 999
@@ -0,0 +1,46 @@
+import facility_design_project as fdp
+
+
+def test_free_location_no_wait():
+    table = fdp.ReservationTable(horizon=3)
+    table.take(1, (2,2), (2,3), 0)
+    assert table.waiting_time((2,2), (2,1), 1) == 0
+
+
+def test_wait_until_released():
+    # the escort of robot 1 leaves (2,1) after three time units - robot 2 waits for it
+    table = fdp.ReservationTable(horizon=3)
+    for k in range(4):
+        table.take(1, (1,1), (2,1), k)
+    assert table.waiting_time((2,2), (2,1), 2) == 2
+
+
+def test_every_wait_in_horizon():
+    for horizon in (1, 3, 5):
+        for wait in range(horizon):
+            table = fdp.ReservationTable(horizon=horizon)
+            for k in range(wait+2):
+                table.take(1, (1,1), (2,1), k)
+            assert table.waiting_time((2,2), (2,1), 2) == wait
+
+
+def test_not_released_in_horizon():
+    table = fdp.ReservationTable(horizon=3)
+    for k in range(6):
+        table.take(1, (1,1), (2,1), k)
+    assert table.waiting_time((2,2), (2,1), 2) is None
+
+
+def test_no_wait_for_larger_id():
+    table = fdp.ReservationTable(horizon=3)
+    table.take(2, (1,1), (2,1), 0)
+    table.take(2, (1,1), (2,1), 1)
+    assert table.waiting_time((2,2), (2,1), 1) is None
+
+
+def test_own_location_taken_meanwhile():
+    table = fdp.ReservationTable(horizon=3)
+    for k in range(4):
+        table.take(1, (1,1), (2,1), k)
+    table.take(1, (2,2), (2,2), 1)
+    assert table.waiting_time((2,2), (2,1), 2) is None
@@ -0,0 +1,36 @@
+import os
+import random
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_slots_ranked_by_the_queue_distance():
+    # the re-slotter ranks the cells by the distance that the queues of the items to exit use - from the nearest of
+    # the two stations here, not from the first one
+    config = fdp.WarehouseConfig(9, 15, io_columns=[3, 11])
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), os.path.join(ROOT, 'items_list.p'), config, random.Random(0))
+    for queue in (wh.distances_left, wh.distances_right):
+        for k in range(len(queue)):
+            item, distance = queue[k]
+            assert wh.slot_cost(wh.find_item_location(item)) == distance
+
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), [], config, random.Random(0))
+    far = max(wh.item_locations, key=lambda item: wh.slot_cost(wh.item_locations[item]))
+    item, slot = fdp.Reslotter({far: 1.0}).plan(wh)
+    free = [wh.slot_cost((i,j)) for i in range(wh.last_row+1) for j in range(wh.last_column+1)
+            if not config.in_restricted_zone((i,j), wh.nearest_station((i,j)))]
+    assert item == far and wh.slot_cost(slot) == min(free)
+
+
+def test_popular_item_moved_closer():
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), [], rng=random.Random(0))
+    far = max(wh.item_locations, key=lambda item: wh.slot_cost(wh.item_locations[item]))
+    distance = wh.slot_cost(wh.item_locations[far])
+    wh.orders = fdp.OrderStream([(1000, min(wh.item_locations))], restock=False) # nothing to exit until then
+    wh.reslotter = fdp.Reslotter({far: 1.0}, min_gain=2)
+    fdp.main_program(wh, max_time=999, verbose=False)
+    assert wh.reslotter.finished == 1 and not wh.reslotter.moves
+    assert wh.slot_cost(wh.item_locations[far]) <= distance-2
+    assert wh.reslotter.distance_cut == distance-wh.slot_cost(wh.item_locations[far])
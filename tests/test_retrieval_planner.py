@@ -0,0 +1,73 @@
+from collections import deque
+
+import facility_design_project as fdp
+
+
+def breadth_first(config, robot_loc, escort_loc, item_loc):
+    # the minimum number of moves, by searching all the (robot, escort, item) states
+    rows, columns = config.rows, config.columns
+    def neighbours(loc):
+        i, j = loc
+        return [(a,b) for a, b in ((i+1,j),(i-1,j),(i,j+1),(i,j-1)) if 0 <= a < rows and 0 <= b < columns]
+    start = (robot_loc, escort_loc, item_loc)
+    moves = {start: 0}
+    queue = deque([start])
+    while queue:
+        r, e, t = state = queue.popleft()
+        if t == config.io:
+            return moves[state]
+        successors = [(m, e, t) for m in neighbours(r)]
+        if e in neighbours(r):
+            successors.append((e, r, e if t == r else t))
+        for next_state in successors:
+            if next_state not in moves:
+                moves[next_state] = moves[state]+1
+                queue.append(next_state)
+
+
+def replay(plan, robot_loc, escort_loc, item_loc):
+    # apply the steps of the plan and return the final location of the item
+    for from_loc, to_loc, with_item in plan:
+        assert from_loc == robot_loc
+        assert abs(from_loc[0]-to_loc[0]) + abs(from_loc[1]-to_loc[1]) == 1
+        if with_item:
+            assert to_loc == escort_loc
+            escort_loc = from_loc
+            if item_loc == from_loc:
+                item_loc = to_loc
+        robot_loc = to_loc
+    return item_loc
+
+
+def test_minimum_moves():
+    config = fdp.WarehouseConfig(rows=4, columns=5)
+    planner = fdp.RetrievalPlanner(time_budget=None)
+    for robot_loc, escort_loc, item_loc in [((3,4),(3,3),(3,4)), ((2,0),(2,1),(2,0)), ((1,2),(3,2),(3,0)),
+                                            ((0,0),(3,4),(2,3))]:
+        plan = planner.plan(config, robot_loc, escort_loc, item_loc)
+        assert len(plan) == breadth_first(config, robot_loc, escort_loc, item_loc)
+        assert replay(plan, robot_loc, escort_loc, item_loc) == config.io
+
+
+def test_too_large_falls_back():
+    planner = fdp.RetrievalPlanner(max_cells=10)
+    assert planner.plan(fdp.WarehouseConfig(rows=4, columns=5), (3,4), (3,3), (3,4)) is None
+    assert planner.fallbacks == 1
+
+
+def test_move_costs_are_the_planner_moves(tmp_path):
+    # the move costs table gives the moves of the minimum-moves plan, with the robot on the item
+    config = fdp.WarehouseConfig(4, 5, cost_cache_dir=str(tmp_path))
+    costs = fdp.move_cost_table(config)
+    planner = fdp.RetrievalPlanner(time_budget=None)
+    for i in range(4):
+        for j in range(5):
+            for a, (di, dj) in enumerate(fdp.APPROACHES):
+                escort_loc = (i+di, j+dj)
+                if not (0 <= escort_loc[0] < 4 and 0 <= escort_loc[1] < 5):
+                    assert costs[i,j,a] == -1
+                    continue
+                assert costs[i,j,a] == len(planner.plan(config, (i,j), escort_loc, (i,j)))
+    assert [path.name for path in tmp_path.iterdir()] == ['move_costs_v%s_4X5_io0_2.npy'%(fdp.MOVE_COSTS_VERSION)]
+    assert (fdp.move_cost_table(config) == costs).all() # loaded from the saved table
+    assert fdp.WarehouseConfig(4, 5).cost_cache_dir is None
@@ -0,0 +1,29 @@
+import facility_design_project as fdp
+
+
+def test_steps_in_order():
+    path = fdp.RobotPath([((0,0),(0,1),False), ((0,1),(0,2),True)])
+    assert len(path) == 2
+    assert path.next_location() == (0,1)
+    assert path.pop_front() == ((0,0),(0,1),False)
+    assert path.next_location() == (0,2)
+
+
+def test_push_front():
+    path = fdp.RobotPath([((0,1),(0,2),True)])
+    path.push_front(((0,1),(0,1),False))
+    assert path.peek() == ((0,1),(0,1),False)
+    assert len(path) == 2
+
+
+def test_check_barrier():
+    path = fdp.RobotPath([fdp.CHECK, ((1,1),(1,2),True), fdp.CHECK, ((1,2),(1,3),True)])
+    assert path.at_check()
+    assert path.next_location() is None # waiting at the barrier
+    assert path.pop_front() is fdp.CHECK
+    assert not path.at_check()
+    assert path.next_location() == (1,2)
+    path.pop_front()
+    assert path.at_check()
+    assert repr(path.peek()) == "CHECK"
+    assert list(path)[1] == ((1,2),(1,3),True)
@@ -0,0 +1,46 @@
+import os
+import pickle
+import random
+import zlib
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def warehouse(seed=0):
+    return fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), os.path.join(ROOT, 'items_list.p'), rng=random.Random(seed))
+
+
+def state(wh):
+    # every attribute of the snapshot, pickled on its own (the objects shared between attributes may be pickled in
+    # another order, so the snapshots themselves aren't compared)
+    return {name: pickle.dumps(value) for name, value in pickle.loads(zlib.decompress(wh.snapshot())).items()}
+
+
+def test_restore_is_the_same_state():
+    wh = fdp.main_program(warehouse(), max_time=150, verbose=False)
+    assert state(fdp.restore_warehouse(wh.snapshot())) == state(wh)
+
+
+def test_resume_same_as_straight_run():
+    straight = fdp.main_program(warehouse(), max_time=400, verbose=False)
+    checkpoints = {}
+    fdp.main_program(warehouse(), max_time=400, checkpoints=checkpoints, checkpoint_every=100, verbose=False)
+    assert sorted(checkpoints) == [100, 200, 300, 400]
+    resumed = fdp.main_program(fdp.restore_warehouse(checkpoints[200]), max_time=400, verbose=False)
+    assert resumed.time == straight.time
+    assert resumed.robots_moves == straight.robots_moves
+    assert resumed.exited_items == straight.exited_items
+    assert resumed.items_to_exit == straight.items_to_exit
+    assert state(resumed) == state(straight)
+
+
+def test_load_checkpoint_with_profiler(tmp_path):
+    wh = fdp.main_program(warehouse(), max_time=100, verbose=False)
+    fdp.save_checkpoint(wh, tmp_path / 'checkpoint.bin')
+    profiler = fdp.Profiler()
+    restored = fdp.load_checkpoint(tmp_path / 'checkpoint.bin', profiler=profiler)
+    assert restored.profiler is profiler
+    fdp.main_program(restored, max_time=150, verbose=False)
+    assert len(profiler.tick_seconds) == 50
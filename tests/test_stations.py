@@ -0,0 +1,75 @@
+import os
+import random
+
+import pytest
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def two_stations(max_time=None, profiler=None):
+    config = fdp.WarehouseConfig(9, 15, io_columns=[3, 11])
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh3.p'), os.path.join(ROOT, 'items_list.p'), config, random.Random(0),
+                       profiler=profiler)
+    if max_time is not None:
+        fdp.main_program(wh, max_time=max_time, verbose=False)
+    return wh
+
+
+def test_stations_at_least_4_columns_apart():
+    for io_columns in ([3, 6], [7, 4], [0, 15]):
+        with pytest.raises(ValueError):
+            fdp.WarehouseConfig(9, 15, io_columns=io_columns)
+    assert fdp.WarehouseConfig(9, 15, io_columns=[3, 7, 11]).stations == [(0, 3), (0, 7), (0, 11)]
+
+
+def test_distances_from_the_nearest_station():
+    wh = two_stations()
+    stations = {}
+    for queue, left in ((wh.distances_left, True), (wh.distances_right, False)):
+        for k in range(len(queue)):
+            item, distance = queue[k]
+            i, j = wh.find_item_location(item)
+            station = min(wh.stations, key=lambda station: i+abs(j-station[1]))
+            assert distance == i+abs(j-station[1])
+            assert left == (j <= station[1]) # the side is of the nearest station
+            stations[station] = stations.get(station, 0) + 1
+    assert set(stations) == set(wh.stations)
+
+
+def test_zone_of_every_station():
+    # a loaded robot that holds the lane of one station doesn't keep the robots of the other station out of theirs
+    layout = [[100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114],
+              [115, 116, 117, 118, 119, 120, 121, 122, 123, 124, 125, 126, 127, 128, 129],
+              [130, 131, 132,   0, 133, 134, 135, 136, 137, 138, 139,   0, 140, 141, 142],
+              [143, 144, 145, 146, 147, 148, 149, 150, 151, 152, 153, 154, 155, 156, 157],
+              [158, 159, 160, 161, 162, 163, 164, 165, 166, 167, 168, 169, 170, 171, 172],
+              [173, 174, 175, 176, 177, 178, 179,   0, 180, 181, 182, 183, 184, 185, 186]]
+    config = fdp.WarehouseConfig(6, 15, io_columns=[3, 11])
+    wh = fdp.Warehouse(layout, [118, 126, 165], config, random.Random(0))
+    assert sorted(wh.zones) == wh.stations
+    assert all(zone.io == station for station, zone in wh.zones.items())
+    robots = {location: robot_id for robot_id, location in wh.robot_locations.items()}
+    for location, item in (((2,3), 118), ((2,11), 126), ((5,7), 165)):
+        wh.robots[robots[location]].currently_taking = item
+        wh.assign_item(item, robots[location])
+    for zone in wh.zones.values():
+        zone.tick(wh)
+    assert wh.can_proceed(robots[(2,3)]) and wh.zones[(0,3)].holder == robots[(2,3)]
+    assert wh.can_proceed(robots[(2,11)]) and wh.zones[(0,11)].holder == robots[(2,11)]
+    assert wh.station_of(robots[(5,7)]) == (0,3)
+    assert not wh.can_proceed(robots[(5,7)]) # the lane of its station is held
+
+
+def test_item_exits_at_its_robots_station():
+    profiler = fdp.Profiler(steps=False)
+    given, exits = {}, []
+    def assigned(wh, time, robot_id, event, from_loc, to_loc, item):
+        given[item] = wh.item_station[item]
+    profiler.on('assign', assigned)
+    profiler.on('exit', lambda wh, time, robot_id, event, from_loc, to_loc, item: exits.append((item, to_loc)))
+    wh = two_stations(1000, profiler)
+    assert len(exits) == len(wh.exited_items) > 0
+    assert all(station == given[item] for item, station in exits)
+    assert all(wh.station_exits[station] > 0 for station in wh.stations)
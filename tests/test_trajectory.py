@@ -0,0 +1,52 @@
+import os
+import pickle
+import random
+
+import numpy as np
+
+import facility_design_project as fdp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def as_robot_move(record):
+    # a record as the move of Warehouse.robots_moves
+    from_loc = (int(record['from_row']), int(record['from_col']))
+    to_loc = (int(record['to_row']), int(record['to_col']))
+    if record['moved']:
+        return (bool(record['with_item']), from_loc, to_loc)
+    return (from_loc, to_loc, False)
+
+
+def test_append_grows_the_records():
+    trajectory = fdp.Trajectory(capacity=2)
+    for tick in range(5):
+        trajectory.append(tick, 1, (tick,0), (tick+1,0), with_item=tick%2 == 0)
+    assert len(trajectory.moves) == 8 and trajectory.size == 5
+    assert list(trajectory.array()['tick']) == [0, 1, 2, 3, 4]
+    assert list(trajectory.array()['with_item']) == [True, False, True, False, True]
+    copy = pickle.loads(pickle.dumps(trajectory)) # only the records are pickled
+    assert (copy.array() == trajectory.array()).all()
+    copy.append(5, 2, (0,0), (0,0), moved=False)
+    assert copy.size == 6 and copy.array()[-1]['robot'] == 2
+
+
+def test_saved_trajectory_is_the_robots_moves(tmp_path):
+    wh = fdp.Warehouse(os.path.join(ROOT, 'wh1.p'), os.path.join(ROOT, 'items_list.p'), rng=random.Random(0))
+    fdp.main_program(wh, max_time=300, verbose=False)
+    moves = wh.trajectory.array()
+    assert len(moves) > 1024 # it has grown
+    assert (np.diff(moves['tick']) >= 0).all()
+    for robot_id in wh.robots_moves:
+        assert [as_robot_move(record) for record in fdp.trajectory_of_robot(moves, robot_id)] == wh.robots_moves[robot_id]
+    
+    for extension in ('npz', 'npy'):
+        filename = str(tmp_path / ('trajectory.%s'%(extension)))
+        wh.trajectory.save(filename)
+        loaded = fdp.load_trajectory(filename)
+        assert loaded.dtype == fdp.TRAJECTORY_DTYPE and (loaded == moves).all()
+        assert isinstance(loaded, np.memmap) == (extension == 'npy')
+        between = fdp.trajectory_between(loaded, 100, 199)
+        assert (between == moves[(moves['tick'] >= 100) & (moves['tick'] <= 199)]).all()
+        if extension == 'npy':
+            assert isinstance(between, np.memmap) # a slice, not a copy
@@ -0,0 +1,44 @@
+import random
+
+import facility_design_project as fdp
+
+LAYOUT = [[100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114],
+          [115, 116, 117, 118, 119, 120, 121, 122, 123, 124, 125, 126, 127, 128, 129],
+          [130, 131, 132, 133, 134, 135, 136, 137, 138, 139, 140, 141, 142, 143, 144],
+          [145, 146, 147, 148, 149,   0, 150, 151, 152, 153, 154, 155, 156, 157, 158],
+          [  0, 159, 160, 161, 162, 163, 164,   0, 165, 166, 167, 168, 169, 170, 171],
+          [172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 185, 186]]
+
+
+def loaded_robots():
+    # a loaded robot in the restricted zone of the I/O (0,7), and a nearer one just outside it
+    wh = fdp.Warehouse(LAYOUT, [150, 179], fdp.WarehouseConfig(6, 15), random.Random(0))
+    robots = {location: robot_id for robot_id, location in wh.robot_locations.items()}
+    inside, outside = robots[(3,5)], robots[(4,7)]
+    for robot_id, item in ((inside, 150), (outside, 179)):
+        wh.robots[robot_id].currently_taking = item
+        wh.assign_item(item, robot_id)
+    return wh, wh.zones[wh.io], inside, outside
+
+
+def test_token_gates_the_lane():
+    wh, zone, inside, outside = loaded_robots()
+    zone.tick(wh)
+    assert [robot_id for distance, order, robot_id in zone.heap][0] == outside # the head of the queue
+    assert zone.holder == inside # it's already in the lane
+    assert not wh.can_proceed(outside) and wh.can_proceed(inside)
+    assert (zone.grants, zone.denials) == (1, 1)
+    wh.robots[inside].currently_taking = None # it has left its item
+    zone.tick(wh)
+    assert zone.holder is None and wh.can_proceed(outside)
+    assert zone.holder == outside and zone.handovers == 1
+
+
+def test_stuck_holder_gives_the_token_up():
+    wh, zone, inside, outside = loaded_robots()
+    for k in range(zone.patience+1):
+        zone.tick(wh)
+        assert zone.holder == inside
+    zone.tick(wh) # it hasn't got closer to the I/O for longer than the patience
+    assert zone.holder is None and wh.can_proceed(outside)
+    assert zone.holder == outside and zone.busy == zone.patience+1